@@ -16,12 +16,15 @@ from soar_sdk.app import App
 from .create_folder import create_folder
 from .delete_file import delete_file
 from .delete_folder import delete_folder
+from .delete_items import DeleteItemsSummary, delete_items
 from .get_file import GetFileSummary, get_file
+from .get_files import GetFilesSummary, get_files
 from .list_drive import ListDriveSummary, list_drive
 from .list_items import ListItemsSummary, list_items
 from .make_request import make_request
 from .search_file import SearchFileSummary, search_file
 from .upload_file import upload_file
+from .upload_files import UploadFilesSummary, upload_files
 from ..views.list_items import display_view as display_list_items_view
 
 
@@ -44,6 +47,13 @@ def register_actions(app: App) -> App:
         render_as="table",
         summary_type=GetFileSummary,
     )
+    app.register_action(
+        action=get_files,
+        description="Download multiple files from server and add them to the vault",
+        action_type="investigate",
+        render_as="table",
+        summary_type=GetFilesSummary,
+    )
     app.register_action(
         action=list_items,
         description="List of items",
@@ -73,6 +83,14 @@ def register_actions(app: App) -> App:
         read_only=False,
         render_as="table",
     )
+    app.register_action(
+        action=upload_files,
+        description="Upload multiple vault files to a folder",
+        action_type="generic",
+        read_only=False,
+        render_as="table",
+        summary_type=UploadFilesSummary,
+    )
     app.register_action(
         action=delete_file,
         description="Delete file",
@@ -87,6 +105,14 @@ def register_actions(app: App) -> App:
         read_only=False,
         render_as="table",
     )
+    app.register_action(
+        action=delete_items,
+        description="Delete multiple files or folders",
+        action_type="generic",
+        read_only=False,
+        render_as="table",
+        summary_type=DeleteItemsSummary,
+    )
     app.register_action(
         action=create_folder,
         description="Create a folder",
@@ -0,0 +1,193 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import httpx
+from soar_sdk import logging
+from soar_sdk.abstract import SOARClient
+from soar_sdk.action_results import ActionOutput, OutputField
+from soar_sdk.auth.client import OAuthClientError
+from soar_sdk.exceptions import ActionFailure
+from soar_sdk.params import Param, Params
+
+from ..asset import Asset
+from ..batch import BatchRequest, BatchResponse, send_batch_requests
+from ..graph import get_graph_client
+from ..list_param import split_list_param
+from ..target_user import target_user_id_param
+from .delete_file import DeleteFileParams, _get_delete_file_endpoint
+
+
+AUTHORIZATION_REQUIRED_MESSAGE = (
+    "Token not available. Please run Test Connectivity first."
+)
+MANDATORY_ITEM_IDS_OR_PATHS_MESSAGE = "Either Item IDs or Item Paths is mandatory"
+DELETE_ITEMS_MESSAGE = "Deleted {total_deleted} of {total_items} item(s)"
+DELETE_ITEM_SUCCESS_STATUS = "success"
+DELETE_ITEM_FAILED_STATUS = "failed"
+ITEM_TYPE_ID = "id"
+ITEM_TYPE_PATH = "path"
+
+
+class DeleteItemsParams(Params):
+    item_ids: str | None = Param(
+        description="Comma-separated list of file or folder IDs",
+        primary=True,
+        cef_types=["msonedrive file id", "msonedrive folder id"],
+        allow_list=True,
+        column_name="Item IDs",
+    )
+    item_paths: str | None = Param(
+        description="Comma-separated list of file or folder paths",
+        primary=True,
+        cef_types=["file path", "msonedrive folder path"],
+        allow_list=True,
+        column_name="Item Paths",
+    )
+    drive_id: str | None = Param(
+        description="Drive ID",
+        primary=True,
+        cef_types=["msonedrive drive id"],
+        column_name="Drive ID",
+    )
+    target_user_id: str | None = target_user_id_param()
+
+
+class DeleteItemsOutput(ActionOutput):
+    item: str = OutputField(
+        column_name="Item",
+        cef_types=["msonedrive file id", "msonedrive folder id", "file path"],
+        example_values=["01TEST123TEST123TEST123U3KTTEST123"],
+    )
+    item_type: str = OutputField(
+        column_name="Item Type",
+        example_values=[ITEM_TYPE_ID, ITEM_TYPE_PATH],
+    )
+    status: str = OutputField(
+        column_name="Status",
+        example_values=[DELETE_ITEM_SUCCESS_STATUS, DELETE_ITEM_FAILED_STATUS],
+    )
+    status_code: int = OutputField(column_name="Status Code", example_values=[204])
+    message: str | None = OutputField(
+        column_name="Message",
+        example_values=["The resource could not be found."],
+    )
+
+
+class DeleteItemsSummary(ActionOutput):
+    total_deleted: int = OutputField(example_values=[2])
+    total_failed: int = OutputField(example_values=[0])
+
+
+def _get_invalid_item_response(request_id: str, message: str) -> BatchResponse:
+    return BatchResponse(
+        id=request_id,
+        status=httpx.codes.BAD_REQUEST,
+        body={"error": {"message": message}},
+    )
+
+
+def _get_delete_items_requests(
+    params: DeleteItemsParams, asset: Asset
+) -> list[tuple[str, str, BatchRequest | BatchResponse]]:
+    """Return (item, item type, batch request) for every requested item.
+
+    Endpoints come from the delete file endpoint builder, which resolves the
+    same item URLs as delete folder for both files and folders. Items whose
+    endpoint cannot be built get a 400 response in place of a request, so
+    they are reported as failed without being sent.
+    """
+    items = [(item_id, ITEM_TYPE_ID) for item_id in split_list_param(params.item_ids)]
+    items.extend(
+        (item_path, ITEM_TYPE_PATH) for item_path in split_list_param(params.item_paths)
+    )
+    if not items:
+        raise ActionFailure(MANDATORY_ITEM_IDS_OR_PATHS_MESSAGE)
+
+    delete_requests: list[tuple[str, str, BatchRequest | BatchResponse]] = []
+    for index, (item, item_type) in enumerate(items):
+        try:
+            endpoint = _get_delete_file_endpoint(
+                DeleteFileParams(
+                    file_id=item if item_type == ITEM_TYPE_ID else None,
+                    file_path=item if item_type == ITEM_TYPE_PATH else None,
+                    drive_id=params.drive_id,
+                    target_user_id=params.target_user_id,
+                ),
+                asset,
+            )
+        except ActionFailure as e:
+            delete_requests.append(
+                (item, item_type, _get_invalid_item_response(str(index), e.message))
+            )
+            continue
+
+        batch_request = BatchRequest(id=str(index), method="DELETE", url=endpoint)
+        delete_requests.append((item, item_type, batch_request))
+    return delete_requests
+
+
+def delete_items(
+    params: DeleteItemsParams, soar: SOARClient, asset: Asset
+) -> list[DeleteItemsOutput]:
+    logging.info("In action handler for: delete_items")
+    delete_requests = _get_delete_items_requests(params, asset)
+    batch_requests = [
+        request
+        for _, _, request in delete_requests
+        if isinstance(request, BatchRequest)
+    ]
+    logging.info(f"Deleting {len(batch_requests)} item(s) through Microsoft Graph")
+
+    responses: dict[str, BatchResponse] = {}
+    if batch_requests:
+        try:
+            with get_graph_client(asset, str(soar.get_asset_id())) as graph_client:
+                responses = send_batch_requests(graph_client, batch_requests)
+        except OAuthClientError as e:
+            raise ActionFailure(AUTHORIZATION_REQUIRED_MESSAGE) from e
+
+    outputs: list[DeleteItemsOutput] = []
+    for item, item_type, request in delete_requests:
+        response = (
+            request if isinstance(request, BatchResponse) else responses[request.id]
+        )
+        outputs.append(
+            DeleteItemsOutput(
+                item=item,
+                item_type=item_type,
+                status=(
+                    DELETE_ITEM_SUCCESS_STATUS
+                    if response.ok
+                    else DELETE_ITEM_FAILED_STATUS
+                ),
+                status_code=response.status,
+                message=None if response.ok else response.error_message,
+            )
+        )
+
+    total_deleted = sum(
+        output.status == DELETE_ITEM_SUCCESS_STATUS for output in outputs
+    )
+    soar.set_summary(
+        DeleteItemsSummary(
+            total_deleted=total_deleted,
+            total_failed=len(outputs) - total_deleted,
+        )
+    )
+    soar.set_message(
+        DELETE_ITEMS_MESSAGE.format(
+            total_deleted=total_deleted,
+            total_items=len(outputs),
+        )
+    )
+    return outputs
@@ -0,0 +1,475 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import fnmatch
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+import httpx
+from soar_sdk import logging
+from soar_sdk.abstract import SOARClient
+from soar_sdk.action_results import ActionOutput, OutputField
+from soar_sdk.auth.client import OAuthClientError
+from soar_sdk.exceptions import ActionFailure, SoarAPIError
+from soar_sdk.params import Param, Params
+
+from ..asset import Asset
+from ..batch import BatchRequest, send_batch_requests
+from ..download import (
+    FILE_HAS_NO_CONTENT_MESSAGE,
+    FILE_NOT_FOUND_MESSAGE,
+    FILE_SIZE_FIELD,
+    QUICK_XOR_HASH_FIELD,
+    SHA1_HASH_FIELD,
+    SHA256_HASH_FIELD,
+    DownloadedFile,
+    add_downloaded_file_to_vault,
+    download_item_to_tmp,
+    get_download_tmp_dir,
+    get_existing_vault_id,
+    get_metadata_hashes,
+)
+from ..graph import get_graph_client
+from ..list_param import split_list_param
+from ..target_user import target_user_id_param
+from .get_file import GetFileParams, _get_file_content_endpoint, _get_file_endpoint
+from .list_items import ListItemsParams, _get_list_items_endpoint, _get_list_response
+
+
+AUTHORIZATION_REQUIRED_MESSAGE = (
+    "Token not available. Please run Test Connectivity first."
+)
+MANDATORY_FILES_OR_FOLDER_MESSAGE = (
+    "Either File IDs, File Paths, Folder ID or Folder Path is mandatory"
+)
+INVALID_MAX_CONCURRENCY_MESSAGE = "Max Concurrency must be greater than zero"
+GET_FILES_MESSAGE = "Retrieved {total_retrieved} of {total_files} file(s)"
+GET_FILE_SUCCESS_STATUS = "success"
+GET_FILE_FAILED_STATUS = "failed"
+ITEM_TYPE_ID = "id"
+ITEM_TYPE_PATH = "path"
+ITEM_ID_FIELD = "id"
+ITEM_NAME_FIELD = "name"
+ITEM_FILE_FIELD = "file"
+FOLDER_LIST_SELECT = "id,name,file"
+DEFAULT_MAX_CONCURRENCY = 4
+MAX_CONCURRENCY_LIMIT = 8
+
+
+class GetFilesParams(Params):
+    file_ids: str | None = Param(
+        description="Comma-separated list of file IDs",
+        primary=True,
+        cef_types=["msonedrive file id"],
+        allow_list=True,
+        column_name="File IDs",
+    )
+    file_paths: str | None = Param(
+        description="Comma-separated list of file paths",
+        primary=True,
+        cef_types=["file path"],
+        allow_list=True,
+        column_name="File Paths",
+    )
+    folder_id: str | None = Param(
+        description="ID of a folder whose files to get",
+        primary=True,
+        cef_types=["msonedrive folder id"],
+        column_name="Folder ID",
+    )
+    folder_path: str | None = Param(
+        description="Path of a folder whose files to get",
+        primary=True,
+        cef_types=["msonedrive folder path"],
+        column_name="Folder Path",
+    )
+    name_filter: str | None = Param(
+        description=(
+            "Shell-style pattern that folder file names must match, such as "
+            "*.docx. Leave empty to get every file in the folder"
+        ),
+        column_name="Name Filter",
+    )
+    drive_id: str | None = Param(
+        description="Drive ID",
+        primary=True,
+        cef_types=["msonedrive drive id"],
+        column_name="Drive ID",
+    )
+    force_infected_download: bool | None = Param(
+        description=(
+            "Download files that Microsoft has flagged as infected by sending "
+            "the Prefer: forceInfectedDownload header"
+        ),
+        default=False,
+        column_name="Force Infected Download",
+    )
+    max_concurrency: int | None = Param(
+        description=(
+            "Maximum number of files downloaded at once, capped at "
+            f"{MAX_CONCURRENCY_LIMIT}"
+        ),
+        default=DEFAULT_MAX_CONCURRENCY,
+    )
+    target_user_id: str | None = target_user_id_param()
+
+
+class GetFilesOutput(ActionOutput):
+    item: str = OutputField(
+        column_name="Item",
+        cef_types=["msonedrive file id", "file path"],
+        example_values=["01TEST123TEST123TEST123U3KTTEST123"],
+    )
+    item_type: str = OutputField(
+        column_name="Item Type",
+        example_values=[ITEM_TYPE_ID, ITEM_TYPE_PATH],
+    )
+    status: str = OutputField(
+        column_name="Status",
+        example_values=[GET_FILE_SUCCESS_STATUS, GET_FILE_FAILED_STATUS],
+    )
+    file_name: str | None = OutputField(
+        column_name="File Name",
+        example_values=["filetxt.txt"],
+    )
+    vault_id: str | None = OutputField(
+        column_name="Vault ID",
+        cef_types=["vault id"],
+        example_values=["example-vault-id"],
+    )
+    size: float | None = OutputField(
+        column_name="Size (Bytes)",
+        cef_types=["file size"],
+        example_values=[4],
+    )
+    malware_flagged: bool | None = OutputField(
+        column_name="Malware Flagged",
+        example_values=[False],
+    )
+    quick_xor_hash: str | None = OutputField(
+        column_name="QuickXorHash",
+        example_values=["fio2VWDQgVGaX34LXedeos6Y6/s="],
+    )
+    sha256: str | None = OutputField(
+        column_name="SHA-256",
+        cef_types=["sha256"],
+        example_values=[
+            "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
+        ],
+    )
+    message: str | None = OutputField(
+        column_name="Message",
+        example_values=["The resource could not be found."],
+    )
+
+
+class GetFilesSummary(ActionOutput):
+    total_retrieved: int = OutputField(example_values=[2])
+    total_failed: int = OutputField(example_values=[0])
+
+
+def _get_max_concurrency(params: GetFilesParams) -> int:
+    max_concurrency = (
+        params.max_concurrency
+        if params.max_concurrency is not None
+        else DEFAULT_MAX_CONCURRENCY
+    )
+    if max_concurrency <= 0:
+        raise ActionFailure(INVALID_MAX_CONCURRENCY_MESSAGE)
+    return min(max_concurrency, MAX_CONCURRENCY_LIMIT)
+
+
+def _has_folder(params: GetFilesParams) -> bool:
+    return bool(params.folder_id or (params.folder_path or "").strip("/\\"))
+
+
+def _get_requested_files(params: GetFilesParams) -> list[tuple[str, str]]:
+    files = [(file_id, ITEM_TYPE_ID) for file_id in split_list_param(params.file_ids)]
+    files.extend(
+        (file_path, ITEM_TYPE_PATH) for file_path in split_list_param(params.file_paths)
+    )
+    return files
+
+
+def _get_folder_files(
+    graph_client: Any,
+    params: GetFilesParams,
+    asset: Asset,
+) -> list[tuple[str, str]]:
+    """Return the files directly in the requested folder that match the filter."""
+    endpoint = _get_list_items_endpoint(
+        ListItemsParams(
+            drive_id=params.drive_id,
+            folder_id=params.folder_id,
+            folder_path=params.folder_path,
+            target_user_id=params.target_user_id,
+        ),
+        asset,
+    )
+    logging.info(f"Listing folder files from Microsoft Graph endpoint: {endpoint}")
+    items = _get_list_response(graph_client, endpoint, select=FOLDER_LIST_SELECT)
+    return [
+        (item[ITEM_ID_FIELD], ITEM_TYPE_ID)
+        for item in items
+        if ITEM_FILE_FIELD in item
+        and (
+            not params.name_filter
+            or fnmatch.fnmatch(item.get(ITEM_NAME_FIELD) or "", params.name_filter)
+        )
+    ]
+
+
+def _get_file_params(
+    params: GetFilesParams, item: str, item_type: str
+) -> GetFileParams:
+    return GetFileParams(
+        file_id=item if item_type == ITEM_TYPE_ID else None,
+        file_path=item if item_type == ITEM_TYPE_PATH else None,
+        drive_id=params.drive_id,
+        force_infected_download=params.force_infected_download,
+        target_user_id=params.target_user_id,
+    )
+
+
+def _get_error_message(error: Exception) -> str:
+    # str() of an ActionFailure adds an "Action failure: " prefix.
+    return error.message if isinstance(error, ActionFailure) else str(error)
+
+
+def _get_failed_output(item: str, item_type: str, message: str) -> GetFilesOutput:
+    return GetFilesOutput(
+        item=item,
+        item_type=item_type,
+        status=GET_FILE_FAILED_STATUS,
+        message=message,
+    )
+
+
+def _get_success_output(
+    item: str,
+    item_type: str,
+    metadata: dict[str, Any],
+    *,
+    vault_id: str,
+    size: int,
+    quick_xor_hash: str | None,
+    sha256: str | None,
+) -> GetFilesOutput:
+    return GetFilesOutput(
+        item=item,
+        item_type=item_type,
+        status=GET_FILE_SUCCESS_STATUS,
+        file_name=metadata.get(ITEM_NAME_FIELD),
+        vault_id=vault_id,
+        size=size,
+        malware_flagged="malware" in metadata,
+        quick_xor_hash=quick_xor_hash,
+        sha256=sha256,
+    )
+
+
+def _get_existing_file_output(
+    soar: SOARClient,
+    item: str,
+    item_type: str,
+    metadata: dict[str, Any],
+) -> GetFilesOutput | None:
+    """Return an output for a file that is already in the vault, if it is."""
+    metadata_size = metadata.get(FILE_SIZE_FIELD)
+    if metadata_size is None:
+        return None
+
+    metadata_hashes = get_metadata_hashes(metadata)
+    vault_id = get_existing_vault_id(
+        soar,
+        file_name=metadata[ITEM_NAME_FIELD],
+        file_size=metadata_size,
+        sha1=metadata_hashes.get(SHA1_HASH_FIELD),
+    )
+    if vault_id is None:
+        return None
+
+    sha256 = metadata_hashes.get(SHA256_HASH_FIELD)
+    return _get_success_output(
+        item,
+        item_type,
+        metadata,
+        vault_id=vault_id,
+        size=metadata_size,
+        quick_xor_hash=metadata_hashes.get(QUICK_XOR_HASH_FIELD),
+        sha256=sha256.lower() if sha256 else None,
+    )
+
+
+def _discard_downloads(
+    downloads: dict[int, tuple[str, str, dict[str, Any], Future[DownloadedFile]]],
+) -> None:
+    """Cancel downloads that have not started and remove the others' temp files."""
+    for _, _, _, future in downloads.values():
+        future.cancel()
+        if not future.cancelled() and future.exception() is None:
+            future.result().temp_path.unlink(missing_ok=True)
+
+
+def _add_files_to_vault(
+    soar: SOARClient,
+    downloads: dict[int, tuple[str, str, dict[str, Any], Future[DownloadedFile]]],
+    outputs: dict[int, GetFilesOutput],
+) -> None:
+    """Add finished downloads to the vault one at a time, in request order.
+
+    Temp files of downloads that are not added, because an earlier file
+    raised an unexpected error, are removed before returning.
+    """
+    pending = dict(downloads)
+    try:
+        for index, (item, item_type, metadata, future) in downloads.items():
+            del pending[index]
+            try:
+                downloaded_file = future.result()
+            except (ActionFailure, httpx.HTTPError, OSError) as e:
+                outputs[index] = _get_failed_output(
+                    item, item_type, _get_error_message(e)
+                )
+                continue
+
+            try:
+                vault_id = add_downloaded_file_to_vault(
+                    soar,
+                    downloaded_file,
+                    file_name=metadata[ITEM_NAME_FIELD],
+                )
+            except (ActionFailure, SoarAPIError) as e:
+                outputs[index] = _get_failed_output(
+                    item, item_type, _get_error_message(e)
+                )
+                continue
+            finally:
+                downloaded_file.temp_path.unlink(missing_ok=True)
+
+            outputs[index] = _get_success_output(
+                item,
+                item_type,
+                metadata,
+                vault_id=vault_id,
+                size=downloaded_file.size,
+                quick_xor_hash=downloaded_file.quick_xor_hash,
+                sha256=downloaded_file.sha256,
+            )
+    finally:
+        _discard_downloads(pending)
+
+
+def get_files(
+    params: GetFilesParams, soar: SOARClient, asset: Asset
+) -> list[GetFilesOutput]:
+    logging.info("In action handler for: get_files")
+    max_concurrency = _get_max_concurrency(params)
+    files = _get_requested_files(params)
+    if not files and not _has_folder(params):
+        raise ActionFailure(MANDATORY_FILES_OR_FOLDER_MESSAGE)
+
+    outputs: dict[int, GetFilesOutput] = {}
+    try:
+        with get_graph_client(asset, str(soar.get_asset_id())) as graph_client:
+            if _has_folder(params):
+                files.extend(_get_folder_files(graph_client, params, asset))
+            # A requested file can also be in the folder; get it only once.
+            files = list(dict.fromkeys(files))
+            logging.info(f"Getting {len(files)} file(s) from Microsoft Graph")
+
+            file_params = [
+                _get_file_params(params, item, item_type) for item, item_type in files
+            ]
+            endpoints = [
+                _get_file_endpoint(get_file_params, asset)
+                for get_file_params in file_params
+            ]
+            responses = send_batch_requests(
+                graph_client,
+                [
+                    BatchRequest(id=str(index), method="GET", url=endpoint)
+                    for index, endpoint in enumerate(endpoints)
+                ],
+            )
+
+            temp_dir = get_download_tmp_dir(soar)
+            downloads: dict[
+                int, tuple[str, str, dict[str, Any], Future[DownloadedFile]]
+            ] = {}
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                try:
+                    for index, (item, item_type) in enumerate(files):
+                        response = responses[str(index)]
+                        metadata = (
+                            response.body if isinstance(response.body, dict) else {}
+                        )
+                        if not response.ok:
+                            outputs[index] = _get_failed_output(
+                                item, item_type, response.error_message
+                            )
+                        elif not metadata.get(ITEM_NAME_FIELD):
+                            outputs[index] = _get_failed_output(
+                                item, item_type, FILE_NOT_FOUND_MESSAGE
+                            )
+                        elif metadata.get(FILE_SIZE_FIELD) == 0:
+                            outputs[index] = _get_failed_output(
+                                item, item_type, FILE_HAS_NO_CONTENT_MESSAGE
+                            )
+                        elif (
+                            existing_output := _get_existing_file_output(
+                                soar, item, item_type, metadata
+                            )
+                        ) is not None:
+                            outputs[index] = existing_output
+                        else:
+                            content_endpoint = (
+                                _get_file_content_endpoint(file_params[index], asset)
+                                if params.force_infected_download
+                                else None
+                            )
+                            future = executor.submit(
+                                download_item_to_tmp,
+                                graph_client,
+                                metadata,
+                                endpoint=endpoints[index],
+                                content_endpoint=content_endpoint,
+                                temp_dir=temp_dir,
+                            )
+                            downloads[index] = (item, item_type, metadata, future)
+                except BaseException:
+                    # Downloads that already finished left temp files behind.
+                    _discard_downloads(downloads)
+                    raise
+
+                _add_files_to_vault(soar, downloads, outputs)
+    except OAuthClientError as e:
+        raise ActionFailure(AUTHORIZATION_REQUIRED_MESSAGE) from e
+
+    results = [outputs[index] for index in range(len(files))]
+    total_retrieved = sum(
+        output.status == GET_FILE_SUCCESS_STATUS for output in results
+    )
+    soar.set_summary(
+        GetFilesSummary(
+            total_retrieved=total_retrieved,
+            total_failed=len(results) - total_retrieved,
+        )
+    )
+    soar.set_message(
+        GET_FILES_MESSAGE.format(
+            total_retrieved=total_retrieved,
+            total_files=len(results),
+        )
+    )
+    return results
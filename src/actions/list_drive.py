@@ -15,14 +15,20 @@ from typing import Any
 
 from soar_sdk import logging
 from soar_sdk.abstract import SOARClient
-from soar_sdk.action_results import ActionOutput, OutputField
+from soar_sdk.action_results import ActionOutput, OutputField, PermissiveActionOutput
 from soar_sdk.auth.client import OAuthClientError
 from soar_sdk.exceptions import ActionFailure
-from soar_sdk.params import Params
+from soar_sdk.params import Param, Params
 
 from ..asset import Asset
 from ..auth import is_client_credentials_auth
-from ..graph import get_graph_client
+from ..graph import (
+    GRAPH_MAX_PAGE_SIZE,
+    get_graph_client,
+    get_graph_page,
+    get_select_fields,
+)
+from ..list_param import split_list_param
 from ..target_user import resolve_target_user_id, target_user_id_param
 
 
@@ -36,6 +42,13 @@ LIST_DRIVES_CLIENT_CREDENTIALS_ENDPOINT = "/users/{target_user_id}/drives"
 
 
 class ListDriveParams(Params):
+    extra_fields: str | None = Param(
+        description=(
+            "Comma-separated list of additional drive properties to request from "
+            "Microsoft Graph, such as sharePointIds or system"
+        ),
+        allow_list=True,
+    )
     target_user_id: str | None = target_user_id_param()
 
 
@@ -89,7 +102,7 @@ class QuotaOutput(ActionOutput):
     used: float = OutputField(example_values=[355597522])
 
 
-class ListDriveOutput(ActionOutput):
+class ListDriveOutput(PermissiveActionOutput):
     name: str = OutputField(column_name="Name", example_values=["OneDrive"])
     driveType: str = OutputField(
         column_name="Drive Type",
@@ -126,25 +139,41 @@ class ListDriveSummary(ActionOutput):
     total_drives: int = OutputField(example_values=[1])
 
 
-def _get_list_response(graph_client: Any, endpoint: str) -> list[dict[str, Any]]:
+def _get_list_response(
+    graph_client: Any,
+    endpoint: str,
+    *,
+    select: str | None = None,
+) -> list[dict[str, Any]]:
     """Return every drive from a paginated Microsoft Graph list response.
 
     Args:
         graph_client: Authenticated Microsoft Graph client.
         endpoint: First Graph endpoint or next-link URL to request.
+        select: "$select" projection for the first request; next links
+            already carry it.
+
+    Pages are requested at Graph's maximum page size, which is reduced when
+    Graph throttles the listing.
 
     Returns:
         Every drive object from the "value" arrays across all pages.
     """
     drives: list[dict[str, Any]] = []
     next_endpoint: str | None = endpoint
+    query_params: dict[str, Any] | None = {"$select": select} if select else None
+    page_size = GRAPH_MAX_PAGE_SIZE
 
     while next_endpoint:
-        response = graph_client.get(next_endpoint)
-        response.raise_for_status()
-        response_json = response.json()
+        response_json, page_size = get_graph_page(
+            graph_client,
+            next_endpoint,
+            params=query_params,
+            page_size=page_size,
+        )
         drives.extend(response_json.get(GRAPH_VALUE_FIELD, []))
         next_endpoint = response_json.get(GRAPH_NEXT_LINK_FIELD)
+        query_params = None
 
     return drives
 
@@ -171,6 +200,10 @@ def list_drive(
             drives = _get_list_response(
                 graph_client,
                 _get_list_drives_endpoint(params, asset),
+                select=get_select_fields(
+                    ListDriveOutput,
+                    extra_fields=split_list_param(params.extra_fields),
+                ),
             )
     except OAuthClientError as e:
         raise ActionFailure(AUTHORIZATION_REQUIRED_MESSAGE) from e
@@ -11,8 +11,14 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from collections.abc import Callable, Generator, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import partial
+from itertools import islice
 from typing import Any
 
+import httpx
 from soar_sdk import logging
 from soar_sdk.abstract import SOARClient
 from soar_sdk.action_results import ActionOutput, OutputField, PermissiveActionOutput
@@ -22,7 +28,14 @@ from soar_sdk.params import Param, Params
 
 from ..asset import Asset
 from ..auth import is_client_credentials_auth
-from ..graph import get_graph_client
+from ..consts import LIST_ITEMS_DELTA_LINKS_STATE_KEY
+from ..graph import (
+    GRAPH_MAX_PAGE_SIZE,
+    get_graph_client,
+    get_graph_page,
+    get_select_fields,
+)
+from ..list_param import split_list_param
 from ..target_user import resolve_target_user_id, target_user_id_param
 
 
@@ -31,13 +44,34 @@ AUTHORIZATION_REQUIRED_MESSAGE = (
 )
 GRAPH_VALUE_FIELD = "value"
 GRAPH_NEXT_LINK_FIELD = "@odata.nextLink"
+GRAPH_DELTA_LINK_FIELD = "@odata.deltaLink"
 ITEM_ID_FIELD = "id"
 ITEM_FILE_FIELD = "file"
+ITEM_ROOT_FIELD = "root"
+ITEM_FOLDER_FIELD = "folder"
+FOLDER_CHILD_COUNT_FIELD = "childCount"
+CHILDREN_ENDPOINT_SUFFIX = "/children"
+DELTA_ENDPOINT_SUFFIX = "/delta"
+DELTA_SELECT_FIELDS = ("deleted", ITEM_ROOT_FIELD)
+LOCATOR_OUTPUT_FIELDS = ("drive_id", "folder_id", "folder_path")
 PARENT_REFERENCE_FIELD = "parentReference"
 PARENT_PATH_FIELD = "path"
 PARENT_DRIVE_PATH_FIELD = "drivePath"
 PARENT_FOLDER_PATH_FIELD = "folderPath"
 ROOT_PATH_SPLIT = "root:/"
+DEFAULT_MAX_CONCURRENCY = 4
+MAX_CONCURRENCY_LIMIT = 16
+INVALID_MAX_CONCURRENCY_MESSAGE = "Max Concurrency must be greater than zero"
+INVALID_MAX_DEPTH_MESSAGE = "Max Depth must be greater than zero"
+INVALID_MAX_ITEMS_MESSAGE = "Max Items must be greater than zero"
+DELTA_QUERY_LIMITS_MESSAGE = (
+    "Max Depth and Max Items cannot be used with delta queries, since skipped "
+    "changes would not be returned by the next delta query"
+)
+DELTA_QUERY_FOLDER_MESSAGE = (
+    "Delta queries are only supported on the drive root. Leave Folder ID and "
+    "Folder Path empty"
+)
 LIST_ITEMS_DEFAULT_ENDPOINT = "/me/drive/root/children"
 LIST_ITEMS_DRIVE_ID_ENDPOINT = "/me/drives/{drive_id}/root/children"
 LIST_ITEMS_DRIVE_FOLDER_ID_ENDPOINT = "/me/drives/{drive_id}/items/{folder_id}/children"
@@ -74,6 +108,41 @@ class ListItemsParams(Params):
         primary=True,
         cef_types=["msonedrive folder path"],
     )
+    max_concurrency: int | None = Param(
+        description=(
+            "Maximum number of folder listings requested from Microsoft Graph at "
+            f"once, capped at {MAX_CONCURRENCY_LIMIT}"
+        ),
+        default=DEFAULT_MAX_CONCURRENCY,
+    )
+    extra_fields: str | None = Param(
+        description=(
+            "Comma-separated list of additional driveItem properties to request "
+            "from Microsoft Graph, such as sharepointIds or shared"
+        ),
+        allow_list=True,
+    )
+    use_delta_query: bool | None = Param(
+        description=(
+            "Return only items created, changed or deleted since the previous "
+            "delta query for the same drive. Only supported on the drive root, "
+            "without Folder ID or Folder Path. The first run returns every item "
+            "and stores the delta link in asset state"
+        ),
+        default=False,
+    )
+    max_depth: int | None = Param(
+        description=(
+            "Maximum number of folder levels to list below the parent folder. "
+            "1 lists only the direct children. Leave empty for no limit"
+        ),
+    )
+    max_items: int | None = Param(
+        description=(
+            "Maximum number of items to return. Listing stops as soon as the "
+            "limit is reached. Leave empty for no limit"
+        ),
+    )
     target_user_id: str | None = target_user_id_param()
 
 
@@ -201,6 +270,7 @@ class ListItemsOutput(PermissiveActionOutput):
 
 class ListItemsSummary(ActionOutput):
     total_items: int
+    truncated: bool = OutputField(example_values=[False])
 
 
 def _get_delegated_list_items_endpoint(params: ListItemsParams) -> str:
@@ -300,26 +370,311 @@ def _get_list_items_child_endpoint(
     return LIST_ITEMS_FOLDER_ID_ENDPOINT.format(folder_id=folder_id)
 
 
-def _get_list_response(graph_client: Any, endpoint: str) -> list[dict[str, Any]]:
+def _get_list_response(
+    graph_client: Any,
+    endpoint: str,
+    *,
+    select: str | None = None,
+) -> list[dict[str, Any]]:
     """Return every item from a paginated Microsoft Graph list response.
 
     Microsoft Graph paginates list responses by returning a page of items in
     "value" and, when more pages exist, an "@odata.nextLink" URL for the next
     page. This follows that next-link chain until Graph stops returning one.
+    Pages are requested at Graph's maximum page size. The "$select" projection
+    is only sent on the first request because Graph carries it into every
+    next link.
     """
     items: list[dict[str, Any]] = []
     next_endpoint: str | None = endpoint
+    query_params: dict[str, Any] | None = {"$select": select} if select else None
+    page_size = GRAPH_MAX_PAGE_SIZE
 
     while next_endpoint:
-        response = graph_client.get(next_endpoint)
-        response.raise_for_status()
-        response_json = response.json()
+        response_json, page_size = get_graph_page(
+            graph_client,
+            next_endpoint,
+            params=query_params,
+            page_size=page_size,
+        )
         items.extend(response_json.get(GRAPH_VALUE_FIELD, []))
         next_endpoint = response_json.get(GRAPH_NEXT_LINK_FIELD)
+        query_params = None
 
     return items
 
 
+def _get_list_items_select(params: ListItemsParams) -> str:
+    extra_fields = split_list_param(params.extra_fields)
+    if params.use_delta_query:
+        extra_fields.extend(DELTA_SELECT_FIELDS)
+    return get_select_fields(
+        ListItemsOutput,
+        exclude=LOCATOR_OUTPUT_FIELDS,
+        extra_fields=extra_fields,
+    )
+
+
+def _get_max_concurrency(params: ListItemsParams) -> int:
+    max_concurrency = (
+        params.max_concurrency
+        if params.max_concurrency is not None
+        else DEFAULT_MAX_CONCURRENCY
+    )
+    if max_concurrency <= 0:
+        raise ActionFailure(INVALID_MAX_CONCURRENCY_MESSAGE)
+    return min(max_concurrency, MAX_CONCURRENCY_LIMIT)
+
+
+def _validate_list_limits(params: ListItemsParams) -> None:
+    if params.max_depth is not None and params.max_depth <= 0:
+        raise ActionFailure(INVALID_MAX_DEPTH_MESSAGE)
+    if params.max_items is not None and params.max_items <= 0:
+        raise ActionFailure(INVALID_MAX_ITEMS_MESSAGE)
+    if params.use_delta_query and (
+        params.max_depth is not None or params.max_items is not None
+    ):
+        raise ActionFailure(DELTA_QUERY_LIMITS_MESSAGE)
+    # OneDrive for Business and SharePoint only track changes from the root.
+    if params.use_delta_query and (
+        params.folder_id or (params.folder_path or "").strip("/\\")
+    ):
+        raise ActionFailure(DELTA_QUERY_FOLDER_MESSAGE)
+
+
+def _get_items_limit(params: ListItemsParams) -> int | None:
+    """Return how many items to consume, one more than Max Items if set.
+
+    The extra item tells a complete result apart from a truncated one.
+    """
+    if params.max_items is None:
+        return None
+    return params.max_items + 1
+
+
+@dataclass
+class _FolderTreeWalk:
+    """Record whether a folder tree walk left folders unexpanded."""
+
+    truncated: bool = False
+
+
+def _has_children(item: dict[str, Any]) -> bool:
+    folder = item.get(ITEM_FOLDER_FIELD) or {}
+    return folder.get(FOLDER_CHILD_COUNT_FIELD, 1) > 0
+
+
+def _iter_pending_folders(
+    pending_folders: list[tuple[str, int]],
+    prefetched: dict[str, Future[list[dict[str, Any]]]],
+    get_child_endpoint: Callable[[str], str],
+    max_depth: int | None,
+) -> Iterator[str]:
+    """Yield pending folder endpoints in the order the walk will list them.
+
+    A folder whose listing has already arrived is followed by its child
+    folders, so listings deeper in the tree are prefetched before the walk
+    pushes them on the stack.
+    """
+    for pending_endpoint, depth in reversed(pending_folders):
+        yield pending_endpoint
+        future = prefetched.get(pending_endpoint)
+        if future is None or not future.done() or future.exception() is not None:
+            continue
+        if max_depth is not None and depth >= max_depth:
+            continue
+        yield from _iter_pending_folders(
+            [
+                (get_child_endpoint(child.get(ITEM_ID_FIELD)), depth + 1)
+                for child in future.result()
+                if not child.get(ITEM_FILE_FIELD)
+            ],
+            prefetched,
+            get_child_endpoint,
+            max_depth,
+        )
+
+
+def _prefetch_folders(
+    executor: ThreadPoolExecutor,
+    list_children: Callable[[str], list[dict[str, Any]]],
+    get_child_endpoint: Callable[[str], str],
+    pending_folders: list[tuple[str, int]],
+    prefetched: dict[str, Future[list[dict[str, Any]]]],
+    *,
+    max_concurrency: int,
+    max_depth: int | None,
+) -> set[Future[list[dict[str, Any]]]]:
+    """Submit the next pending listings until enough are in flight.
+
+    Returns the listings that are still in flight.
+    """
+    in_flight = {future for future in prefetched.values() if not future.done()}
+    pending_endpoints = _iter_pending_folders(
+        pending_folders, prefetched, get_child_endpoint, max_depth
+    )
+    for pending_endpoint in pending_endpoints:
+        if len(in_flight) >= max_concurrency:
+            break
+        if pending_endpoint not in prefetched:
+            future = executor.submit(list_children, pending_endpoint)
+            prefetched[pending_endpoint] = future
+            in_flight.add(future)
+    return in_flight
+
+
+def _iter_folder_tree(
+    graph_client: Any,
+    params: ListItemsParams,
+    asset: Asset,
+    endpoint: str,
+    *,
+    max_concurrency: int,
+    select: str | None = None,
+    max_depth: int | None = None,
+    walk: _FolderTreeWalk | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Yield every item below a folder in the order the app has always used.
+
+    Folders are taken from a stack: the children of a folder are yielded
+    together, in the order Graph lists them, and the last child folder is
+    expanded next. Listings are prefetched in the order the walk will need
+    them, keeping ``max_concurrency`` requests in flight: the folders next on
+    the stack first, then the child folders of listings that have already
+    arrived. Finished listings wait in ``prefetched`` until their folder
+    comes off the stack and do not count against that limit.
+
+    Folders on level ``max_depth`` are yielded but not expanded; when any of
+    them has children, ``walk.truncated`` is set. Closing the generator early
+    cancels the prefetched listings that have not started yet.
+    """
+    list_children = partial(_get_list_response, graph_client, select=select)
+    get_child_endpoint = partial(_get_list_items_child_endpoint, params, asset)
+    pending_folders: list[tuple[str, int]] = [(endpoint, 1)]
+    prefetched: dict[str, Future[list[dict[str, Any]]]] = {}
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        prefetch = partial(
+            _prefetch_folders,
+            executor,
+            list_children,
+            get_child_endpoint,
+            pending_folders,
+            prefetched,
+            max_concurrency=max_concurrency,
+            max_depth=max_depth,
+        )
+        try:
+            while pending_folders:
+                current_endpoint, depth = pending_folders[-1]
+                in_flight = prefetch()
+                # Refill the slots of other listings that finish while waiting,
+                # but leave the children of this folder until the caller has
+                # consumed it, since the caller may stop here.
+                while True:
+                    current = prefetched.get(current_endpoint)
+                    if current is not None and current.done():
+                        break
+                    wait(in_flight, return_when=FIRST_COMPLETED)
+                    if current is None or not current.done():
+                        in_flight = prefetch()
+
+                pending_folders.pop()
+                children = prefetched.pop(current_endpoint).result()
+                expand_folders = max_depth is None or depth < max_depth
+                for child in children:
+                    is_folder = not child.get(ITEM_FILE_FIELD)
+                    if is_folder and expand_folders:
+                        pending_folders.append(
+                            (get_child_endpoint(child.get(ITEM_ID_FIELD)), depth + 1)
+                        )
+                    elif is_folder and walk is not None and _has_children(child):
+                        walk.truncated = True
+                    yield child
+        finally:
+            # Prefetched listings that have not started are not needed once
+            # the caller stops consuming items.
+            executor.shutdown(cancel_futures=True)
+
+
+def _get_delta_endpoint(endpoint: str) -> str:
+    return endpoint.removesuffix(CHILDREN_ENDPOINT_SUFFIX) + DELTA_ENDPOINT_SUFFIX
+
+
+def _get_delta_response(
+    graph_client: Any,
+    endpoint: str,
+    *,
+    select: str | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Return changed items and the delta link from a Graph delta query.
+
+    Delta pages are followed through "@odata.nextLink" until Graph returns
+    the "@odata.deltaLink" that later runs resume from.
+    """
+    items: list[dict[str, Any]] = []
+    next_endpoint: str | None = endpoint
+    delta_link: str | None = None
+    query_params: dict[str, Any] | None = {"$select": select} if select else None
+    page_size = GRAPH_MAX_PAGE_SIZE
+
+    while next_endpoint:
+        response_json, page_size = get_graph_page(
+            graph_client,
+            next_endpoint,
+            params=query_params,
+            page_size=page_size,
+        )
+        items.extend(
+            item
+            for item in response_json.get(GRAPH_VALUE_FIELD, [])
+            if ITEM_ROOT_FIELD not in item
+        )
+        next_endpoint = response_json.get(GRAPH_NEXT_LINK_FIELD)
+        delta_link = response_json.get(GRAPH_DELTA_LINK_FIELD, delta_link)
+        query_params = None
+
+    return items, delta_link
+
+
+def _list_delta_changes(
+    graph_client: Any,
+    asset: Asset,
+    endpoint: str,
+    *,
+    select: str | None = None,
+) -> list[dict[str, Any]]:
+    delta_links: dict[str, str] = dict(
+        asset.cache_state.get(LIST_ITEMS_DELTA_LINKS_STATE_KEY) or {}
+    )
+    stored_delta_link = delta_links.get(endpoint)
+    delta_endpoint = stored_delta_link or _get_delta_endpoint(endpoint)
+    # Stored delta links already carry the "$select" of the run that created them.
+    delta_select = None if stored_delta_link else select
+    logging.info(
+        "Using stored Microsoft Graph delta link"
+        if stored_delta_link
+        else f"Starting Microsoft Graph delta query: {delta_endpoint}"
+    )
+
+    try:
+        items, delta_link = _get_delta_response(
+            graph_client, delta_endpoint, select=delta_select
+        )
+    except httpx.HTTPStatusError as e:
+        if not stored_delta_link or e.response.status_code != httpx.codes.GONE:
+            raise
+        logging.warning("Stored Microsoft Graph delta link expired; resyncing")
+        items, delta_link = _get_delta_response(
+            graph_client, _get_delta_endpoint(endpoint), select=select
+        )
+
+    if delta_link:
+        delta_links[endpoint] = delta_link
+        asset.cache_state[LIST_ITEMS_DELTA_LINKS_STATE_KEY] = delta_links
+    return items
+
+
 def _normalize_parent_reference(item: dict[str, Any]) -> None:
     parent_reference = item.get(PARENT_REFERENCE_FIELD)
     if not parent_reference:
@@ -341,44 +696,71 @@ def _normalize_parent_reference(item: dict[str, Any]) -> None:
     parent_reference.pop(PARENT_PATH_FIELD, None)
 
 
+def _iter_list_items_outputs(
+    items: Iterable[dict[str, Any]],
+    params: ListItemsParams,
+) -> Iterator[ListItemsOutput]:
+    """Normalize raw Graph items and build their outputs one item at a time."""
+    for item in items:
+        _normalize_parent_reference(item)
+        item["drive_id"] = params.drive_id
+        item["folder_id"] = params.folder_id
+        item["folder_path"] = params.folder_path
+        yield ListItemsOutput(**item)
+
+
 def list_items(
     params: ListItemsParams, soar: SOARClient, asset: Asset
 ) -> list[ListItemsOutput]:
     logging.info("In action handler for: list_items")
+    max_concurrency = _get_max_concurrency(params)
+    _validate_list_limits(params)
+    select = _get_list_items_select(params)
     endpoint = _get_list_items_endpoint(params, asset)
     logging.info(f"Using Microsoft Graph list items endpoint: {endpoint}")
 
+    walk = _FolderTreeWalk()
     try:
         with get_graph_client(asset, str(soar.get_asset_id())) as graph_client:
-            items: list[dict[str, Any]] = []
-            pending_endpoints: list[str] = [endpoint]
-
-            while pending_endpoints:
-                current_endpoint: str = pending_endpoints.pop()
-                children: list[dict[str, Any]] = _get_list_response(
-                    graph_client, current_endpoint
+            items: Iterable[dict[str, Any]]
+            if params.use_delta_query:
+                items = _list_delta_changes(
+                    graph_client, asset, endpoint, select=select
                 )
-
-                for child in children:
-                    items.append(child)
-                    if not child.get(ITEM_FILE_FIELD):
-                        child_id: str | None = child.get(ITEM_ID_FIELD)
-                        pending_endpoints.append(
-                            _get_list_items_child_endpoint(
-                                params,
-                                asset,
-                                child_id,
-                            )
-                        )
-
+            else:
+                items = _iter_folder_tree(
+                    graph_client,
+                    params,
+                    asset,
+                    endpoint,
+                    max_concurrency=max_concurrency,
+                    select=select,
+                    max_depth=params.max_depth,
+                    walk=walk,
+                )
+            # The SDK accepts an iterator, but it reads the summary before
+            # consuming it, does not report errors raised while iterating as
+            # action failures and keeps every item's data anyway. The outputs
+            # are therefore collected here, while the client is open; raw
+            # items are released as soon as their output model is built.
+            outputs = list(
+                islice(
+                    _iter_list_items_outputs(items, params),
+                    _get_items_limit(params),
+                )
+            )
+            if isinstance(items, Generator):
+                # Stop listing folders once the item limit has been reached.
+                items.close()
     except OAuthClientError as e:
         raise ActionFailure(AUTHORIZATION_REQUIRED_MESSAGE) from e
 
-    for item in items:
-        _normalize_parent_reference(item)
-        item["drive_id"] = params.drive_id
-        item["folder_id"] = params.folder_id
-        item["folder_path"] = params.folder_path
+    truncated = walk.truncated
+    if params.max_items is not None and len(outputs) > params.max_items:
+        outputs = outputs[: params.max_items]
+        truncated = True
+    if truncated:
+        logging.info("List items stopped early because a limit was reached")
 
-    soar.set_summary(ListItemsSummary(total_items=len(items)))
-    return [ListItemsOutput(**item) for item in items]
+    soar.set_summary(ListItemsSummary(total_items=len(outputs), truncated=truncated))
+    return outputs
@@ -25,7 +25,7 @@ from soar_sdk.params import Param, Params
 
 from ..asset import Asset
 from ..auth import is_client_credentials_auth
-from ..graph import get_graph_client
+from ..graph import GRAPH_MAX_PAGE_SIZE, get_graph_client, get_graph_page
 from ..target_user import resolve_target_user_id, target_user_id_param
 
 
@@ -364,10 +364,10 @@ def _get_filename_search_response(
     visited_folder_ids: set[str] = set()
     normalized_search_text = search_text.casefold()
     requests_made = 0
+    page_size = GRAPH_MAX_PAGE_SIZE
 
     while pending_endpoints and len(matches) < max_results:
         next_endpoint: str | None = pending_endpoints.pop()
-        query_params: dict[str, Any] | None = {"$top": MAX_RESULTS_LIMIT}
 
         while next_endpoint and len(matches) < max_results:
             if requests_made >= max_requests:
@@ -377,9 +377,11 @@ def _get_filename_search_response(
                 )
 
             requests_made += 1
-            response = graph_client.get(next_endpoint, params=query_params)
-            response.raise_for_status()
-            response_json = response.json()
+            response_json, page_size = get_graph_page(
+                graph_client,
+                next_endpoint,
+                page_size=page_size,
+            )
 
             for item in response_json.get(GRAPH_VALUE_FIELD, []):
                 if normalized_search_text in str(item.get("name") or "").casefold():
@@ -402,7 +404,6 @@ def _get_filename_search_response(
                     )
 
             next_endpoint = response_json.get(GRAPH_NEXT_LINK_FIELD)
-            query_params = None
 
     return _FilenameScanResult(items=matches)
 
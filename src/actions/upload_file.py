@@ -11,8 +11,15 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from collections.abc import Iterator
+from collections.abc import Callable, Iterable, Iterator
+import contextlib
+from dataclasses import dataclass
+from datetime import UTC, datetime
+import importlib.util
+import mmap
+import os
 from pathlib import Path
+import threading
 import time
 from typing import Any, BinaryIO
 
@@ -31,7 +38,15 @@ from soar_sdk.params import Param, Params
 
 from ..asset import Asset
 from ..auth import is_client_credentials_auth
+from ..consts import UPLOAD_SESSIONS_STATE_KEY
+from ..download import (
+    FILE_SIZE_FIELD,
+    QUICK_XOR_HASH_FIELD,
+    SHA1_HASH_FIELD,
+    get_metadata_hashes,
+)
 from ..graph import get_graph_client
+from ..quickxorhash import QuickXorHash
 from ..target_user import resolve_target_user_id, target_user_id_param
 
 
@@ -43,12 +58,26 @@ VAULT_PATH_ABSENT_MESSAGE = "Vault path not accessible for provided Vault ID"
 VAULT_INFO_ABSENT_MESSAGE = "Vault info not accessible for provided Vault ID"
 ERROR_READING_VAULT_FILE_MESSAGE = "Reading file data from vault failed"
 UPLOAD_FILE_SUCCESS_MESSAGE = "The file is uploaded successfully"
+UPLOAD_FILE_SKIPPED_MESSAGE = (
+    "An identical file already exists at the destination, upload skipped"
+)
 UPLOAD_FILE_FAILED_MESSAGE = "Uploading file failed"
 
+# Microsoft Graph requires every chunk but the last to be a multiple of
+# 320 KiB and accepts at most 60 MiB per chunk. CHUNK_SIZE is the maximum.
 CHUNK_SIZE = 62_914_560
+UPLOAD_CHUNK_SIZE_MULTIPLE = 327_680
+MIN_UPLOAD_CHUNK_SIZE = 3_276_800
+INITIAL_UPLOAD_CHUNK_SIZE = 10_485_760
+UPLOAD_CHUNK_TARGET_SECONDS = 10.0
+SIMPLE_UPLOAD_MAX_SIZE = 4 * 1024 * 1024
+UPLOAD_STREAM_BUFFER_SIZE = 1024 * 1024
 UPLOAD_TIMEOUT_SECONDS = 300.0
 MAX_UPLOAD_RETRIES = 3
 UPLOAD_RETRY_BACKOFF_SECONDS = 2.0
+UPLOAD_HTTP2_ENABLED = True
+UPLOAD_POOL_MAX_CONNECTIONS = 4
+UPLOAD_POOL_KEEPALIVE_EXPIRY_SECONDS = 60.0
 RETRY_AFTER_HEADER = "Retry-After"
 RETRYABLE_UPLOAD_STATUS_CODES = {
     httpx.codes.REQUEST_TIMEOUT,
@@ -70,12 +99,16 @@ CREATE_UPLOAD_SESSION_CLIENT_CREDENTIALS_DRIVE_ENDPOINT = (
 CREATE_UPLOAD_SESSION_CLIENT_CREDENTIALS_NO_DRIVE_ENDPOINT = (
     "/users/{target_user_id}/drive/root:/{file_path}:/createUploadSession"
 )
+CREATE_UPLOAD_SESSION_SUFFIX = ":/createUploadSession"
+SIMPLE_UPLOAD_CONTENT_SUFFIX = ":/content"
+SIMPLE_UPLOAD_CONTENT_TYPE = "application/octet-stream"
 GRAPH_CONFLICT_BEHAVIOR_FIELD = "@microsoft.graph.conflictBehavior"
 GRAPH_RENAME_VALUE = "rename"
 GRAPH_FAIL_VALUE = "fail"
 GRAPH_ITEM_FIELD = "item"
 UPLOAD_URL_FIELD = "uploadUrl"
 NEXT_EXPECTED_RANGES_FIELD = "nextExpectedRanges"
+EXPIRATION_DATE_TIME_FIELD = "expirationDateTime"
 PARENT_REFERENCE_FIELD = "parentReference"
 PARENT_PATH_FIELD = "path"
 PARENT_DRIVE_PATH_FIELD = "drivePath"
@@ -97,6 +130,13 @@ class UploadFileParams(Params):
         description="File path with file name", primary=True, cef_types=["file path"]
     )
     auto_rename: bool | None = Param(description="Auto rename file", default=True)
+    skip_if_identical: bool | None = Param(
+        description=(
+            "Skip the upload and return the existing file when the destination "
+            "already holds a file with the same size and hash"
+        ),
+        default=False,
+    )
     target_user_id: str | None = target_user_id_param()
 
 
@@ -320,15 +360,79 @@ def _get_upload_session_endpoint(params: UploadFileParams, asset: Asset) -> str:
     return _get_delegated_upload_session_endpoint(params)
 
 
+def _get_conflict_behavior(params: UploadFileParams) -> str:
+    return GRAPH_RENAME_VALUE if params.auto_rename else GRAPH_FAIL_VALUE
+
+
 def _get_upload_session_body(params: UploadFileParams) -> dict[str, dict[str, str]]:
-    conflict_behavior = GRAPH_RENAME_VALUE if params.auto_rename else GRAPH_FAIL_VALUE
     return {
         GRAPH_ITEM_FIELD: {
-            GRAPH_CONFLICT_BEHAVIOR_FIELD: conflict_behavior,
+            GRAPH_CONFLICT_BEHAVIOR_FIELD: _get_conflict_behavior(params),
         }
     }
 
 
+def _get_simple_upload_endpoint(upload_session_endpoint: str) -> str:
+    """Return the ":/content" endpoint for the same path as an upload session."""
+    return (
+        upload_session_endpoint.removesuffix(CREATE_UPLOAD_SESSION_SUFFIX)
+        + SIMPLE_UPLOAD_CONTENT_SUFFIX
+    )
+
+
+def _get_destination_item_endpoint(upload_session_endpoint: str) -> str:
+    """Return the driveItem endpoint for the same path as an upload session."""
+    return upload_session_endpoint.removesuffix(CREATE_UPLOAD_SESSION_SUFFIX)
+
+
+def _get_quick_xor_hash(file_obj: BinaryIO) -> str:
+    quick_xor_hash = QuickXorHash()
+    file_obj.seek(0)
+    while buffer := file_obj.read(UPLOAD_STREAM_BUFFER_SIZE):
+        quick_xor_hash.update(buffer)
+    file_obj.seek(0)
+    return quick_xor_hash.b64digest()
+
+
+def _get_identical_item(
+    graph_client: httpx.Client,
+    upload_session_endpoint: str,
+    vault_id: str,
+    file_obj: BinaryIO,
+    file_size: int,
+) -> dict[str, Any] | None:
+    """Return the destination item if it has the same content as the vault file.
+
+    Vault IDs are the SHA-1 of the attachment, so a reported SHA-1 is compared
+    directly. Drives that only report a QuickXorHash get one computed from the
+    vault file, which reads it once but sends nothing.
+    """
+    item_endpoint = _get_destination_item_endpoint(upload_session_endpoint)
+    response = graph_client.get(item_endpoint)
+    if response.status_code == httpx.codes.NOT_FOUND:
+        return None
+    response.raise_for_status()
+
+    item = response.json()
+    if item.get(FILE_SIZE_FIELD) != file_size:
+        return None
+
+    metadata_hashes = get_metadata_hashes(item)
+    if sha1 := metadata_hashes.get(SHA1_HASH_FIELD):
+        identical = sha1.lower() == vault_id.lower()
+    elif quick_xor_hash := metadata_hashes.get(QUICK_XOR_HASH_FIELD):
+        identical = quick_xor_hash == _get_quick_xor_hash(file_obj)
+    else:
+        identical = False
+
+    if not identical:
+        return None
+
+    logging.info(f"Destination item is identical to the vault file: {item_endpoint}")
+    _normalize_parent_reference(item)
+    return item
+
+
 def _get_vault_attachment(
     soar: SOARClient, vault_id: str
 ) -> tuple[VaultAttachment, int]:
@@ -377,6 +481,260 @@ def _normalize_parent_reference(item: dict[str, Any]) -> None:
     parent_reference.pop(PARENT_PATH_FIELD, None)
 
 
+@dataclass(frozen=True)
+class _ChunkTiming:
+    start: int
+    size: int
+    elapsed_seconds: float
+    attempts: int = 1
+
+    @property
+    def bytes_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return float(self.size)
+        return self.size / self.elapsed_seconds
+
+
+class _UploadChunkContent:
+    """Body of one upload chunk, streamed from the vault file in small buffers.
+
+    The content can be iterated again for every retry of the chunk, so the
+    chunk is never held in memory as a whole.
+    """
+
+    def __init__(
+        self,
+        source: mmap.mmap | BinaryIO,
+        start: int,
+        size: int,
+        *,
+        throttle: Callable[[int], None] | None = None,
+    ) -> None:
+        self.source = source
+        self.start = start
+        self.size = size
+        self.throttle = throttle
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[bytes]:
+        end = self.start + self.size
+        for offset in range(self.start, end, UPLOAD_STREAM_BUFFER_SIZE):
+            buffer_end = min(offset + UPLOAD_STREAM_BUFFER_SIZE, end)
+            if self.throttle is not None:
+                self.throttle(buffer_end - offset)
+            if isinstance(self.source, mmap.mmap):
+                yield self.source[offset:buffer_end]
+                continue
+
+            self.source.seek(offset)
+            buffer = self.source.read(buffer_end - offset)
+            if not buffer:
+                raise ActionFailure(ERROR_READING_VAULT_FILE_MESSAGE)
+            yield buffer
+
+
+@contextlib.contextmanager
+def _open_upload_source(
+    file_obj: BinaryIO,
+) -> Iterator[tuple[mmap.mmap | BinaryIO, int]]:
+    """Yield a read-only memory map of the file and its size.
+
+    Reads of a memory map come straight from the page cache. File objects
+    without a file descriptor are read with seek and read instead.
+    """
+    try:
+        source = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        source = None
+
+    if source is None:
+        yield file_obj, file_obj.seek(0, os.SEEK_END)
+        return
+
+    with source:
+        yield source, len(source)
+
+
+def _round_chunk_size(size: int) -> int:
+    size = max(size, MIN_UPLOAD_CHUNK_SIZE)
+    size -= size % UPLOAD_CHUNK_SIZE_MULTIPLE
+    return min(size, CHUNK_SIZE)
+
+
+@dataclass
+class _UploadChunkSizer:
+    """Chunk size of one upload session, tuned from the timing of each chunk.
+
+    The size aims for chunks that take UPLOAD_CHUNK_TARGET_SECONDS, so slow
+    links re-send less data after a failure and fast links make fewer
+    requests. It halves after a chunk that needed retries and at most
+    doubles after a healthy one.
+    """
+
+    size: int = 0
+
+    def __post_init__(self) -> None:
+        self.size = _round_chunk_size(self.size or INITIAL_UPLOAD_CHUNK_SIZE)
+
+    def record(self, timing: _ChunkTiming) -> None:
+        if timing.attempts > 1:
+            target_size = self.size // 2
+        else:
+            target_size = min(
+                int(timing.bytes_per_second * UPLOAD_CHUNK_TARGET_SECONDS),
+                self.size * 2,
+            )
+
+        size = _round_chunk_size(target_size)
+        if size != self.size:
+            logging.info(f"Changing upload chunk size from {self.size} to {size}")
+        self.size = size
+
+
+_upload_sessions_lock = threading.Lock()
+
+
+def _get_upload_session_state_key(vault_id: str, endpoint: str) -> str:
+    return f"{vault_id}|{endpoint}"
+
+
+def _is_upload_session_expired(upload_session: dict[str, Any]) -> bool:
+    expiration = upload_session.get(EXPIRATION_DATE_TIME_FIELD)
+    if not expiration:
+        return False
+    try:
+        return datetime.fromisoformat(expiration) <= datetime.now(UTC)
+    except ValueError:
+        return True
+
+
+@dataclass(frozen=True)
+class _UploadSessionState:
+    """Upload session of one vault file and destination, kept in asset state.
+
+    The session URL, its expiry and the last acknowledged ranges are stored
+    under UPLOAD_SESSIONS_STATE_KEY, so a rerun after the worker died can
+    continue the session instead of starting again at byte 0.
+    """
+
+    asset: Asset
+    key: str
+
+    @contextlib.contextmanager
+    def _upload_sessions(self) -> Iterator[dict[str, Any]]:
+        with _upload_sessions_lock:
+            upload_sessions = {
+                key: upload_session
+                for key, upload_session in (
+                    self.asset.cache_state.get(UPLOAD_SESSIONS_STATE_KEY) or {}
+                ).items()
+                if not _is_upload_session_expired(upload_session)
+            }
+            yield upload_sessions
+            self.asset.cache_state[UPLOAD_SESSIONS_STATE_KEY] = upload_sessions
+
+    def load(self) -> dict[str, Any] | None:
+        upload_session = (
+            self.asset.cache_state.get(UPLOAD_SESSIONS_STATE_KEY) or {}
+        ).get(self.key)
+        if upload_session is None or _is_upload_session_expired(upload_session):
+            return None
+        return upload_session
+
+    def save(self, upload_session: dict[str, Any]) -> None:
+        with self._upload_sessions() as upload_sessions:
+            upload_sessions[self.key] = {
+                UPLOAD_URL_FIELD: upload_session[UPLOAD_URL_FIELD],
+                EXPIRATION_DATE_TIME_FIELD: upload_session.get(
+                    EXPIRATION_DATE_TIME_FIELD
+                ),
+                NEXT_EXPECTED_RANGES_FIELD: upload_session.get(
+                    NEXT_EXPECTED_RANGES_FIELD, []
+                ),
+            }
+
+    def save_next_expected_ranges(self, next_expected_ranges: list[str]) -> None:
+        with self._upload_sessions() as upload_sessions:
+            if self.key in upload_sessions:
+                upload_sessions[self.key] = {
+                    **upload_sessions[self.key],
+                    NEXT_EXPECTED_RANGES_FIELD: next_expected_ranges,
+                }
+
+    def clear(self) -> None:
+        with self._upload_sessions() as upload_sessions:
+            upload_sessions.pop(self.key, None)
+
+
+def _get_next_expected_start(next_expected_ranges: list[str]) -> int:
+    return int(next_expected_ranges[0].split("-", 1)[0])
+
+
+def _resume_upload_session(
+    upload_client: httpx.Client, session_state: _UploadSessionState
+) -> tuple[str, int] | None:
+    """Return the stored upload URL and the first byte it still expects.
+
+    Returns None when there is no stored session or it can no longer be
+    resumed, in which case the stored session is dropped.
+    """
+    upload_session = session_state.load()
+    if upload_session is None:
+        return None
+
+    upload_url = upload_session[UPLOAD_URL_FIELD]
+    try:
+        response = upload_client.get(upload_url)
+        response.raise_for_status()
+        next_expected_ranges = response.json().get(NEXT_EXPECTED_RANGES_FIELD)
+    except httpx.HTTPError as e:
+        logging.warning(f"Stored upload session cannot be resumed: {e}")
+        next_expected_ranges = None
+
+    if not next_expected_ranges:
+        session_state.clear()
+        return None
+
+    chunk_start = _get_next_expected_start(next_expected_ranges)
+    logging.info(f"Resuming stored upload session at byte {chunk_start}")
+    return upload_url, chunk_start
+
+
+def _is_http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _get_upload_client(
+    max_connections: int = UPLOAD_POOL_MAX_CONNECTIONS,
+) -> httpx.Client:
+    """Return a keep-alive client for the pre-authenticated upload session URL.
+
+    Upload URLs are not Graph URLs and must not carry the Graph bearer token,
+    so chunk PUTs get their own client that stays open for the whole session.
+    HTTP/2 is used when the optional h2 package is installed.
+    """
+    return httpx.Client(
+        timeout=UPLOAD_TIMEOUT_SECONDS,
+        http2=UPLOAD_HTTP2_ENABLED and _is_http2_available(),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            keepalive_expiry=UPLOAD_POOL_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+def _log_upload_timings(timings: list[_ChunkTiming]) -> None:
+    total_bytes = sum(timing.size for timing in timings)
+    total_seconds = sum(timing.elapsed_seconds for timing in timings)
+    throughput = total_bytes / total_seconds if total_seconds > 0 else total_bytes
+    logging.info(
+        f"Uploaded {total_bytes} bytes in {len(timings)} chunk(s) over "
+        f"{total_seconds:.2f}s ({throughput:.0f} bytes/s)"
+    )
+
+
 def _get_upload_retry_delay(response: httpx.Response | None, attempt: int) -> float:
     if response is not None:
         retry_after = response.headers.get(RETRY_AFTER_HEADER)
@@ -390,22 +748,22 @@ def _get_upload_retry_delay(response: httpx.Response | None, attempt: int) -> fl
 
 
 def _put_upload_chunk(
+    upload_client: httpx.Client,
     upload_url: str,
     headers: dict[str, str],
-    content: bytes,
-) -> httpx.Response:
+    content: bytes | Iterable[bytes],
+) -> tuple[httpx.Response, int]:
+    """PUT one chunk, retrying throttling and transient failures.
+
+    Returns the response and the number of attempts it took.
+    """
     for attempt in range(MAX_UPLOAD_RETRIES + 1):
         response: httpx.Response | None = None
         try:
-            response = httpx.put(
-                upload_url,
-                headers=headers,
-                content=content,
-                timeout=UPLOAD_TIMEOUT_SECONDS,
-            )
+            response = upload_client.put(upload_url, headers=headers, content=content)
             if response.status_code not in RETRYABLE_UPLOAD_STATUS_CODES:
                 response.raise_for_status()
-                return response
+                return response, attempt + 1
         except httpx.TransportError:
             if attempt == MAX_UPLOAD_RETRIES:
                 raise
@@ -419,36 +777,201 @@ def _put_upload_chunk(
 
 
 def _upload_file_chunks(
+    upload_client: httpx.Client,
     upload_url: str,
     file_obj: BinaryIO,
     file_size: int,
+    *,
+    chunk_start: int = 0,
+    on_chunk_uploaded: Callable[[list[str]], None] | None = None,
+    throttle: Callable[[int], None] | None = None,
+) -> dict[str, Any]:
+    with _open_upload_source(file_obj) as (source, source_size):
+        return _upload_source_chunks(
+            upload_client,
+            upload_url,
+            source,
+            min(source_size, file_size),
+            file_size,
+            chunk_start=chunk_start,
+            on_chunk_uploaded=on_chunk_uploaded,
+            throttle=throttle,
+        )
+
+
+def _upload_source_chunks(
+    upload_client: httpx.Client,
+    upload_url: str,
+    source: mmap.mmap | BinaryIO,
+    readable_size: int,
+    file_size: int,
+    *,
+    chunk_start: int,
+    on_chunk_uploaded: Callable[[list[str]], None] | None,
+    throttle: Callable[[int], None] | None,
 ) -> dict[str, Any]:
-    chunk_start = 0
+    timings: list[_ChunkTiming] = []
+    chunk_sizer = _UploadChunkSizer()
 
     while chunk_start < file_size:
-        chunk_end = min(chunk_start + CHUNK_SIZE, file_size) - 1
-        file_obj.seek(chunk_start)
-        content = file_obj.read(chunk_end - chunk_start + 1)
-        if not content:
+        if chunk_start >= readable_size:
             raise ActionFailure(ERROR_READING_VAULT_FILE_MESSAGE)
 
+        chunk_end = min(chunk_start + chunk_sizer.size, readable_size) - 1
+        content = _UploadChunkContent(
+            source,
+            chunk_start,
+            chunk_end - chunk_start + 1,
+            throttle=throttle,
+        )
+
         headers = {
             "Content-Length": str(len(content)),
             "Content-Range": f"bytes {chunk_start}-{chunk_end}/{file_size}",
         }
 
-        response = _put_upload_chunk(upload_url, headers, content)
+        started_at = time.monotonic()
+        response, attempts = _put_upload_chunk(
+            upload_client, upload_url, headers, content
+        )
+        timing = _ChunkTiming(
+            start=chunk_start,
+            size=len(content),
+            elapsed_seconds=time.monotonic() - started_at,
+            attempts=attempts,
+        )
+        timings.append(timing)
+        chunk_sizer.record(timing)
+        logging.info(
+            f"Uploaded chunk bytes {chunk_start}-{chunk_end} in "
+            f"{timing.elapsed_seconds:.2f}s ({timing.bytes_per_second:.0f} bytes/s)"
+        )
         response_json = response.json()
 
         next_expected_ranges = response_json.get(NEXT_EXPECTED_RANGES_FIELD)
         if not next_expected_ranges:
+            _log_upload_timings(timings)
             return response_json
 
-        chunk_start = int(next_expected_ranges[0].split("-", 1)[0])
+        if on_chunk_uploaded is not None:
+            on_chunk_uploaded(next_expected_ranges)
+        chunk_start = _get_next_expected_start(next_expected_ranges)
 
     raise ActionFailure(UPLOAD_FILE_FAILED_MESSAGE)
 
 
+def _upload_small_file(
+    graph_client: httpx.Client,
+    upload_session_endpoint: str,
+    params: UploadFileParams,
+    file_obj: BinaryIO,
+    *,
+    throttle: Callable[[int], None] | None = None,
+) -> dict[str, Any]:
+    """Upload a file of at most SIMPLE_UPLOAD_MAX_SIZE bytes in a single PUT.
+
+    This skips the upload session round trip. The conflict behavior that an
+    upload session takes in its body is passed as a query parameter instead.
+    The Graph client retries throttling and transient failures itself.
+    """
+    content_endpoint = _get_simple_upload_endpoint(upload_session_endpoint)
+    logging.info(f"Using Microsoft Graph simple upload endpoint: {content_endpoint}")
+    content = file_obj.read()
+    if throttle is not None:
+        throttle(len(content))
+    response = graph_client.put(
+        content_endpoint,
+        headers={"Content-Type": SIMPLE_UPLOAD_CONTENT_TYPE},
+        content=content,
+        params={GRAPH_CONFLICT_BEHAVIOR_FIELD: _get_conflict_behavior(params)},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def _create_upload_session(
+    graph_client: httpx.Client, params: UploadFileParams, endpoint: str
+) -> dict[str, Any]:
+    response = graph_client.post(
+        endpoint,
+        json=_get_upload_session_body(params),
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def _upload_large_file(
+    graph_client: httpx.Client,
+    upload_client: httpx.Client,
+    params: UploadFileParams,
+    asset: Asset,
+    endpoint: str,
+    file_obj: BinaryIO,
+    file_size: int,
+    *,
+    throttle: Callable[[int], None] | None = None,
+) -> dict[str, Any]:
+    """Upload a file through an upload session, resuming a stored one if any."""
+    session_state = _UploadSessionState(
+        asset, _get_upload_session_state_key(params.vault_id, endpoint)
+    )
+    resumed_session = _resume_upload_session(upload_client, session_state)
+    if resumed_session is None:
+        upload_session = _create_upload_session(graph_client, params, endpoint)
+        session_state.save(upload_session)
+        resumed_session = (upload_session[UPLOAD_URL_FIELD], 0)
+
+    upload_url, chunk_start = resumed_session
+    upload_response = _upload_file_chunks(
+        upload_client,
+        upload_url,
+        file_obj,
+        file_size,
+        chunk_start=chunk_start,
+        on_chunk_uploaded=session_state.save_next_expected_ranges,
+        throttle=throttle,
+    )
+
+    session_state.clear()
+    return upload_response
+
+
+def _upload_vault_file(
+    graph_client: httpx.Client,
+    upload_client: httpx.Client,
+    params: UploadFileParams,
+    asset: Asset,
+    endpoint: str,
+    file_obj: BinaryIO,
+    file_size: int,
+    *,
+    throttle: Callable[[int], None] | None = None,
+) -> dict[str, Any]:
+    """Upload an open vault file and return the normalized driveItem."""
+    if file_size > SIMPLE_UPLOAD_MAX_SIZE:
+        upload_response = _upload_large_file(
+            graph_client,
+            upload_client,
+            params,
+            asset,
+            endpoint,
+            file_obj,
+            file_size,
+            throttle=throttle,
+        )
+    else:
+        upload_response = _upload_small_file(
+            graph_client,
+            endpoint,
+            params,
+            file_obj,
+            throttle=throttle,
+        )
+
+    _normalize_parent_reference(upload_response)
+    return upload_response
+
+
 def upload_file(
     params: UploadFileParams, soar: SOARClient, asset: Asset
 ) -> UploadFileOutput:
@@ -459,24 +982,35 @@ def upload_file(
     attachment, file_size = _get_vault_attachment(soar, params.vault_id)
 
     try:
-        with attachment.open("rb") as file_obj:
-            try:
-                with get_graph_client(asset, str(soar.get_asset_id())) as graph_client:
-                    response = graph_client.post(
-                        endpoint,
-                        json=_get_upload_session_body(params),
-                    )
-                    response.raise_for_status()
-                    session_response = response.json()
-            except OAuthClientError as e:
-                raise ActionFailure(AUTHORIZATION_REQUIRED_MESSAGE) from e
-
-            upload_url = session_response[UPLOAD_URL_FIELD]
-            upload_response = _upload_file_chunks(upload_url, file_obj, file_size)
+        with (
+            attachment.open("rb") as file_obj,
+            get_graph_client(asset, str(soar.get_asset_id())) as graph_client,
+            _get_upload_client() as upload_client,
+        ):
+            identical_item = (
+                _get_identical_item(
+                    graph_client, endpoint, params.vault_id, file_obj, file_size
+                )
+                if params.skip_if_identical
+                else None
+            )
+            if identical_item is not None:
+                soar.set_message(UPLOAD_FILE_SKIPPED_MESSAGE)
+                return UploadFileOutput(**identical_item)
+
+            upload_response = _upload_vault_file(
+                graph_client,
+                upload_client,
+                params,
+                asset,
+                endpoint,
+                file_obj,
+                file_size,
+            )
+    except OAuthClientError as e:
+        raise ActionFailure(AUTHORIZATION_REQUIRED_MESSAGE) from e
     except OSError as e:
         raise ActionFailure(ERROR_READING_VAULT_FILE_MESSAGE) from e
 
-    _normalize_parent_reference(upload_response)
-
     soar.set_message(UPLOAD_FILE_SUCCESS_MESSAGE)
     return UploadFileOutput(**upload_response)
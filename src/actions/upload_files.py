@@ -0,0 +1,355 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+import httpx
+from soar_sdk import logging
+from soar_sdk.abstract import SOARClient
+from soar_sdk.action_results import ActionOutput, OutputField
+from soar_sdk.auth.client import OAuthClientError
+from soar_sdk.exceptions import ActionFailure
+from soar_sdk.models.vault_attachment import VaultAttachment
+from soar_sdk.params import Param, Params
+
+from ..asset import Asset
+from ..graph import get_graph_client
+from ..list_param import split_list_param
+from ..target_user import target_user_id_param
+from .upload_file import (
+    UPLOAD_FILE_SKIPPED_MESSAGE,
+    UploadFileParams,
+    _get_identical_item,
+    _get_upload_client,
+    _get_upload_session_endpoint,
+    _get_vault_attachment,
+    _upload_vault_file,
+)
+
+
+AUTHORIZATION_REQUIRED_MESSAGE = (
+    "Token not available. Please run Test Connectivity first."
+)
+MANDATORY_VAULT_IDS_MESSAGE = "Vault IDs is mandatory"
+INVALID_MAX_CONCURRENCY_MESSAGE = "Max Concurrency must be greater than zero"
+INVALID_MAX_BANDWIDTH_MESSAGE = "Max Bandwidth must be greater than zero"
+UPLOAD_FILES_MESSAGE = "Uploaded {total_uploaded} of {total_files} file(s)"
+UPLOAD_FILE_SUCCESS_STATUS = "success"
+UPLOAD_FILE_FAILED_STATUS = "failed"
+ITEM_ID_FIELD = "id"
+ITEM_NAME_FIELD = "name"
+ITEM_SIZE_FIELD = "size"
+ITEM_WEB_URL_FIELD = "webUrl"
+DEFAULT_MAX_CONCURRENCY = 4
+MAX_CONCURRENCY_LIMIT = 8
+BYTES_PER_KILOBYTE = 1024
+
+
+class UploadFilesParams(Params):
+    vault_ids: str = Param(
+        description="Comma-separated list of vault IDs",
+        primary=True,
+        cef_types=["vault id", "sha1"],
+        allow_list=True,
+        column_name="Vault IDs",
+    )
+    folder_path: str | None = Param(
+        description=(
+            "Path of the folder to upload the files to, named after their vault "
+            "attachments. Leave empty to upload to the drive root"
+        ),
+        primary=True,
+        cef_types=["msonedrive folder path"],
+        column_name="Folder Path",
+    )
+    drive_id: str | None = Param(
+        description="Parent drive ID",
+        primary=True,
+        cef_types=["msonedrive drive id"],
+        column_name="Drive ID",
+    )
+    auto_rename: bool | None = Param(description="Auto rename file", default=True)
+    skip_if_identical: bool | None = Param(
+        description=(
+            "Skip files whose destination already holds a file with the same "
+            "size and hash"
+        ),
+        default=False,
+    )
+    max_concurrency: int | None = Param(
+        description=(
+            "Maximum number of files uploaded at once, capped at "
+            f"{MAX_CONCURRENCY_LIMIT}"
+        ),
+        default=DEFAULT_MAX_CONCURRENCY,
+    )
+    max_bandwidth: int | None = Param(
+        description=(
+            "Maximum combined upload rate of all files in kilobytes per second. "
+            "Leave empty for no limit"
+        ),
+    )
+    target_user_id: str | None = target_user_id_param()
+
+
+class UploadFilesOutput(ActionOutput):
+    vault_id: str = OutputField(
+        column_name="Vault ID",
+        cef_types=["vault id"],
+        example_values=["example-vault-id"],
+    )
+    status: str = OutputField(
+        column_name="Status",
+        example_values=[UPLOAD_FILE_SUCCESS_STATUS, UPLOAD_FILE_FAILED_STATUS],
+    )
+    file_path: str | None = OutputField(
+        column_name="File Path",
+        cef_types=["file path"],
+        example_values=["Evidence/filetxt.txt"],
+    )
+    id: str | None = OutputField(
+        column_name="File ID",
+        cef_types=["msonedrive file id"],
+        example_values=["01TEST123TEST123TEST123U3KTTEST123"],
+    )
+    name: str | None = OutputField(
+        column_name="File Name",
+        example_values=["filetxt.txt"],
+    )
+    size: float | None = OutputField(
+        column_name="Size (Bytes)",
+        cef_types=["file size"],
+        example_values=[4],
+    )
+    webUrl: str | None = OutputField(
+        column_name="File Web URL",
+        cef_types=["url"],
+        example_values=["https://example.sharepoint.com/personal/Evidence/filetxt.txt"],
+    )
+    message: str | None = OutputField(
+        column_name="Message",
+        example_values=["Unable to retrieve vault item details"],
+    )
+
+
+class UploadFilesSummary(ActionOutput):
+    total_uploaded: int = OutputField(example_values=[2])
+    total_failed: int = OutputField(example_values=[0])
+
+
+class _BandwidthLimiter:
+    """Caps the combined rate of bytes sent by concurrent uploads.
+
+    Each call reserves the next free slot on a shared schedule and sleeps
+    until it, so callers are paced fairly in the order they asked.
+    """
+
+    def __init__(self, bytes_per_second: float) -> None:
+        self.bytes_per_second = bytes_per_second
+        self._lock = threading.Lock()
+        self._next_send_at = time.monotonic()
+
+    def __call__(self, size: int) -> None:
+        with self._lock:
+            now = time.monotonic()
+            send_at = max(self._next_send_at, now)
+            self._next_send_at = send_at + size / self.bytes_per_second
+
+        if send_at > now:
+            time.sleep(send_at - now)
+
+
+def _get_max_concurrency(params: UploadFilesParams) -> int:
+    max_concurrency = (
+        params.max_concurrency
+        if params.max_concurrency is not None
+        else DEFAULT_MAX_CONCURRENCY
+    )
+    if max_concurrency <= 0:
+        raise ActionFailure(INVALID_MAX_CONCURRENCY_MESSAGE)
+    return min(max_concurrency, MAX_CONCURRENCY_LIMIT)
+
+
+def _get_bandwidth_limiter(params: UploadFilesParams) -> _BandwidthLimiter | None:
+    if params.max_bandwidth is None:
+        return None
+    if params.max_bandwidth <= 0:
+        raise ActionFailure(INVALID_MAX_BANDWIDTH_MESSAGE)
+    return _BandwidthLimiter(params.max_bandwidth * BYTES_PER_KILOBYTE)
+
+
+def _get_upload_file_params(
+    params: UploadFilesParams, vault_id: str, file_name: str
+) -> UploadFileParams:
+    folder_path = (params.folder_path or "").strip("/\\")
+    return UploadFileParams(
+        drive_id=params.drive_id,
+        vault_id=vault_id,
+        file_path=f"{folder_path}/{file_name}" if folder_path else file_name,
+        auto_rename=params.auto_rename,
+        skip_if_identical=params.skip_if_identical,
+        target_user_id=params.target_user_id,
+    )
+
+
+def _upload_attachment(
+    graph_client: httpx.Client,
+    upload_client: httpx.Client,
+    params: UploadFileParams,
+    asset: Asset,
+    attachment: VaultAttachment,
+    file_size: int,
+    throttle: _BandwidthLimiter | None,
+) -> tuple[dict[str, Any], bool]:
+    """Upload one attachment, returning the driveItem and whether it was skipped."""
+    endpoint = _get_upload_session_endpoint(params, asset)
+    logging.info(f"Uploading vault file {params.vault_id} to {params.file_path}")
+    with attachment.open("rb") as file_obj:
+        if params.skip_if_identical:
+            identical_item = _get_identical_item(
+                graph_client, endpoint, params.vault_id, file_obj, file_size
+            )
+            if identical_item is not None:
+                return identical_item, True
+
+        upload_response = _upload_vault_file(
+            graph_client,
+            upload_client,
+            params,
+            asset,
+            endpoint,
+            file_obj,
+            file_size,
+            throttle=throttle,
+        )
+    return upload_response, False
+
+
+def _get_error_message(error: Exception) -> str:
+    # str() of an ActionFailure adds an "Action failure: " prefix.
+    return error.message if isinstance(error, ActionFailure) else str(error)
+
+
+def _get_failed_output(
+    vault_id: str, message: str, *, file_path: str | None = None
+) -> UploadFilesOutput:
+    return UploadFilesOutput(
+        vault_id=vault_id,
+        status=UPLOAD_FILE_FAILED_STATUS,
+        file_path=file_path,
+        message=message,
+    )
+
+
+def _get_success_output(
+    vault_id: str,
+    file_path: str,
+    upload_response: dict[str, Any],
+    *,
+    skipped: bool = False,
+) -> UploadFilesOutput:
+    return UploadFilesOutput(
+        vault_id=vault_id,
+        status=UPLOAD_FILE_SUCCESS_STATUS,
+        file_path=file_path,
+        id=upload_response.get(ITEM_ID_FIELD),
+        name=upload_response.get(ITEM_NAME_FIELD),
+        size=upload_response.get(ITEM_SIZE_FIELD),
+        webUrl=upload_response.get(ITEM_WEB_URL_FIELD),
+        message=UPLOAD_FILE_SKIPPED_MESSAGE if skipped else None,
+    )
+
+
+def upload_files(
+    params: UploadFilesParams, soar: SOARClient, asset: Asset
+) -> list[UploadFilesOutput]:
+    logging.info("In action handler for: upload_files")
+    max_concurrency = _get_max_concurrency(params)
+    throttle = _get_bandwidth_limiter(params)
+    vault_ids = split_list_param(params.vault_ids)
+    if not vault_ids:
+        raise ActionFailure(MANDATORY_VAULT_IDS_MESSAGE)
+
+    outputs: dict[int, UploadFilesOutput] = {}
+    uploads: dict[
+        int, tuple[UploadFileParams, Future[tuple[dict[str, Any], bool]]]
+    ] = {}
+    try:
+        with (
+            get_graph_client(asset, str(soar.get_asset_id())) as graph_client,
+            _get_upload_client(max_concurrency) as upload_client,
+            ThreadPoolExecutor(max_workers=max_concurrency) as executor,
+        ):
+            logging.info(f"Uploading {len(vault_ids)} vault file(s)")
+            for index, vault_id in enumerate(vault_ids):
+                try:
+                    attachment, file_size = _get_vault_attachment(soar, vault_id)
+                except ActionFailure as e:
+                    outputs[index] = _get_failed_output(vault_id, e.message)
+                    continue
+
+                upload_params = _get_upload_file_params(
+                    params, vault_id, attachment.name
+                )
+                future = executor.submit(
+                    _upload_attachment,
+                    graph_client,
+                    upload_client,
+                    upload_params,
+                    asset,
+                    attachment,
+                    file_size,
+                    throttle,
+                )
+                uploads[index] = (upload_params, future)
+
+            for index, (upload_params, future) in uploads.items():
+                try:
+                    upload_response, skipped = future.result()
+                except (ActionFailure, httpx.HTTPError, OSError) as e:
+                    outputs[index] = _get_failed_output(
+                        upload_params.vault_id,
+                        _get_error_message(e),
+                        file_path=upload_params.file_path,
+                    )
+                    continue
+
+                outputs[index] = _get_success_output(
+                    upload_params.vault_id,
+                    upload_params.file_path,
+                    upload_response,
+                    skipped=skipped,
+                )
+    except OAuthClientError as e:
+        raise ActionFailure(AUTHORIZATION_REQUIRED_MESSAGE) from e
+
+    results = [outputs[index] for index in range(len(vault_ids))]
+    total_uploaded = sum(
+        output.status == UPLOAD_FILE_SUCCESS_STATUS for output in results
+    )
+    soar.set_summary(
+        UploadFilesSummary(
+            total_uploaded=total_uploaded,
+            total_failed=len(results) - total_uploaded,
+        )
+    )
+    soar.set_message(
+        UPLOAD_FILES_MESSAGE.format(
+            total_uploaded=total_uploaded,
+            total_files=len(results),
+        )
+    )
+    return results
@@ -29,3 +29,24 @@ class Asset(BaseAsset):
         description="User ID or user principal name for client credentials mode",
         required=False,
     )
+    rate_limit_requests_per_second: float | None = AssetField(
+        description=(
+            "Maximum Microsoft Graph requests per second for this tenant and "
+            "user, shared by every action on the host. Leave empty for no limit"
+        ),
+        required=False,
+    )
+    rate_limit_concurrent_requests: int | None = AssetField(
+        description=(
+            "Maximum Microsoft Graph requests in flight at once for this tenant "
+            "and user. Leave empty for no limit"
+        ),
+        required=False,
+    )
+    rate_limit_across_processes: bool | None = AssetField(
+        description=(
+            "Share the requests per second limit between action processes "
+            "through a lock file"
+        ),
+        default=False,
+    )
@@ -0,0 +1,271 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import time
+import urllib.parse
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from soar_sdk import logging
+from soar_sdk.exceptions import ActionFailure
+
+from .graph import get_retry_after_seconds
+
+
+GRAPH_BATCH_ENDPOINT = "/$batch"
+GRAPH_BATCH_MAX_REQUESTS = 20
+GRAPH_BATCH_REQUESTS_FIELD = "requests"
+GRAPH_BATCH_RESPONSES_FIELD = "responses"
+MAX_BATCH_RETRIES = 3
+BATCH_RETRY_BACKOFF_SECONDS = 2.0
+BATCH_URL_SAFE_CHARACTERS = "/:!$&'()*+,;=@?"
+RETRYABLE_BATCH_STATUS_CODES = {
+    httpx.codes.TOO_MANY_REQUESTS,
+    httpx.codes.SERVICE_UNAVAILABLE,
+    httpx.codes.GATEWAY_TIMEOUT,
+}
+DUPLICATE_BATCH_REQUEST_ID_MESSAGE = "Duplicate batch request ID: {request_id}"
+UNKNOWN_BATCH_DEPENDENCY_MESSAGE = (
+    "Batch request {request_id} depends on {dependency_id}, which must appear "
+    "earlier in the batch"
+)
+MISSING_BATCH_RESPONSE_MESSAGE = (
+    "Microsoft Graph did not return a response for batch request {request_id}"
+)
+FAILED_DEPENDENCY_MESSAGE = "Dependent batch request {dependency_id} failed"
+
+
+@dataclass(frozen=True)
+class BatchRequest:
+    id: str
+    method: str
+    url: str
+    body: Any = None
+    headers: dict[str, str] | None = None
+    depends_on: tuple[str, ...] = ()
+
+    def to_json(self, sent_ids: set[str]) -> dict[str, Any]:
+        """Serialize the sub-request for a $batch body.
+
+        Only dependencies sent in the same batch are listed in "dependsOn";
+        dependencies from earlier batches have already been resolved.
+        """
+        request_json: dict[str, Any] = {
+            "id": self.id,
+            "method": self.method.upper(),
+            "url": urllib.parse.quote(self.url, safe=BATCH_URL_SAFE_CHARACTERS),
+        }
+        if self.body is not None:
+            request_json["body"] = self.body
+            request_json["headers"] = {
+                "Content-Type": "application/json",
+                **(self.headers or {}),
+            }
+        elif self.headers:
+            request_json["headers"] = self.headers
+
+        depends_on = [
+            dependency_id
+            for dependency_id in self.depends_on
+            if dependency_id in sent_ids
+        ]
+        if depends_on:
+            request_json["dependsOn"] = depends_on
+        return request_json
+
+
+@dataclass(frozen=True)
+class BatchResponse:
+    id: str
+    status: int
+    body: Any = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return httpx.codes.is_success(self.status)
+
+    @property
+    def error_message(self) -> str:
+        if isinstance(self.body, dict):
+            error = self.body.get("error") or {}
+            if isinstance(error, dict) and error.get("message"):
+                return str(error["message"])
+        return f"Microsoft Graph returned status {self.status}"
+
+    @classmethod
+    def from_json(cls, response_json: dict[str, Any]) -> "BatchResponse":
+        return cls(
+            id=str(response_json.get("id")),
+            status=int(response_json.get("status") or 0),
+            body=response_json.get("body"),
+            headers=response_json.get("headers") or {},
+        )
+
+
+def _validate_batch_requests(requests: Sequence[BatchRequest]) -> None:
+    seen_ids: set[str] = set()
+    for request in requests:
+        if request.id in seen_ids:
+            raise ActionFailure(
+                DUPLICATE_BATCH_REQUEST_ID_MESSAGE.format(request_id=request.id)
+            )
+        for dependency_id in request.depends_on:
+            if dependency_id not in seen_ids:
+                raise ActionFailure(
+                    UNKNOWN_BATCH_DEPENDENCY_MESSAGE.format(
+                        request_id=request.id,
+                        dependency_id=dependency_id,
+                    )
+                )
+        seen_ids.add(request.id)
+
+
+def _chunk_batch_requests(
+    requests: Sequence[BatchRequest],
+) -> Iterator[list[BatchRequest]]:
+    for chunk_start in range(0, len(requests), GRAPH_BATCH_MAX_REQUESTS):
+        yield list(requests[chunk_start : chunk_start + GRAPH_BATCH_MAX_REQUESTS])
+
+
+def _get_failed_dependency_response(
+    request: BatchRequest,
+    responses: dict[str, BatchResponse],
+) -> BatchResponse | None:
+    for dependency_id in request.depends_on:
+        dependency_response = responses.get(dependency_id)
+        if dependency_response is not None and not dependency_response.ok:
+            return BatchResponse(
+                id=request.id,
+                status=httpx.codes.FAILED_DEPENDENCY,
+                body={
+                    "error": {
+                        "message": FAILED_DEPENDENCY_MESSAGE.format(
+                            dependency_id=dependency_id
+                        )
+                    }
+                },
+            )
+    return None
+
+
+def _get_batch_retry_delay(responses: list[BatchResponse], attempt: int) -> float:
+    retry_after_values: list[float] = []
+    for response in responses:
+        retry_after = get_retry_after_seconds(httpx.Headers(response.headers))
+        if retry_after is not None:
+            retry_after_values.append(retry_after)
+
+    if retry_after_values:
+        return max(retry_after_values)
+    return BATCH_RETRY_BACKOFF_SECONDS * (attempt + 1)
+
+
+def _get_requests_to_retry(
+    requests: list[BatchRequest],
+    responses: dict[str, BatchResponse],
+) -> list[BatchRequest]:
+    """Return throttled sub-requests plus the dependents Graph skipped for them."""
+    retry_ids: set[str] = set()
+    for request in requests:
+        status = responses[request.id].status
+        if status in RETRYABLE_BATCH_STATUS_CODES or (
+            status == httpx.codes.FAILED_DEPENDENCY
+            and any(dependency_id in retry_ids for dependency_id in request.depends_on)
+        ):
+            retry_ids.add(request.id)
+    return [request for request in requests if request.id in retry_ids]
+
+
+def _send_batch_chunk(
+    graph_client: Any,
+    requests: list[BatchRequest],
+    responses: dict[str, BatchResponse],
+) -> None:
+    pending_requests: list[BatchRequest] = []
+    for request in requests:
+        failed_dependency_response = _get_failed_dependency_response(request, responses)
+        if failed_dependency_response is not None:
+            responses[request.id] = failed_dependency_response
+        else:
+            pending_requests.append(request)
+
+    for attempt in range(MAX_BATCH_RETRIES + 1):
+        if not pending_requests:
+            return
+
+        sent_ids = {request.id for request in pending_requests}
+        response = graph_client.post(
+            GRAPH_BATCH_ENDPOINT,
+            json={
+                GRAPH_BATCH_REQUESTS_FIELD: [
+                    request.to_json(sent_ids) for request in pending_requests
+                ]
+            },
+        )
+        response.raise_for_status()
+        for response_json in response.json().get(GRAPH_BATCH_RESPONSES_FIELD, []):
+            batch_response = BatchResponse.from_json(response_json)
+            if batch_response.id in sent_ids:
+                responses[batch_response.id] = batch_response
+
+        for request in pending_requests:
+            if request.id not in responses:
+                raise ActionFailure(
+                    MISSING_BATCH_RESPONSE_MESSAGE.format(request_id=request.id)
+                )
+
+        if attempt == MAX_BATCH_RETRIES:
+            return
+
+        pending_requests = _get_requests_to_retry(pending_requests, responses)
+        if pending_requests:
+            delay = _get_batch_retry_delay(
+                [responses[request.id] for request in pending_requests],
+                attempt,
+            )
+            logging.info(
+                f"Microsoft Graph throttled {len(pending_requests)} batch "
+                f"sub-request(s); retrying in {delay}s"
+            )
+            time.sleep(delay)
+
+
+def send_batch_requests(
+    graph_client: Any,
+    requests: Sequence[BatchRequest],
+) -> dict[str, BatchResponse]:
+    """Send Graph requests through JSON $batch and return responses by ID.
+
+    Requests are sent in list order, GRAPH_BATCH_MAX_REQUESTS at a time.
+    "depends_on" may only reference requests listed earlier; when a dependency
+    failed in an earlier batch the dependent request is not sent and gets a
+    424 Failed Dependency response. Throttled sub-requests (and dependents
+    Graph skipped because of them) are retried after their Retry-After delay.
+
+    Args:
+        graph_client: Authenticated Microsoft Graph client.
+        requests: Sub-requests with IDs unique across the whole call.
+
+    Returns:
+        One response per request, keyed by request ID in request order.
+    """
+    _validate_batch_requests(requests)
+    responses: dict[str, BatchResponse] = {}
+
+    for chunk in _chunk_batch_requests(requests):
+        _send_batch_chunk(graph_client, chunk, responses)
+
+    return {request.id: responses[request.id] for request in requests}
@@ -40,3 +40,17 @@ REDIRECT_URI_STATE_KEY = "redirect_uri"
 # src/auth.py and src/test_connectivity.py to select the authentication flow.
 AUTH_METHOD_DELEGATED = "Delegated"
 AUTH_METHOD_CLIENT_CREDENTIALS = "Client Credentials"
+
+# Used by src/graph.py to size the process-level connection pool that every
+# Microsoft Graph client borrows, so actions reuse warm TLS connections.
+GRAPH_POOL_MAX_CONNECTIONS = 20
+GRAPH_POOL_MAX_KEEPALIVE_CONNECTIONS = 10
+GRAPH_POOL_KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+# Used by src/actions/list_items.py to persist the Microsoft Graph
+# "@odata.deltaLink" per listed drive or folder for incremental delta runs.
+LIST_ITEMS_DELTA_LINKS_STATE_KEY = "list_items_delta_links"
+
+# Used by src/actions/upload_file.py to persist upload sessions per vault file
+# and destination, so an interrupted upload resumes at the next expected byte.
+UPLOAD_SESSIONS_STATE_KEY = "upload_file_sessions"
@@ -0,0 +1,712 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import hashlib
+import importlib
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import IO, Any
+
+import httpx
+from soar_sdk import logging
+from soar_sdk.abstract import SOARClient
+from soar_sdk.exceptions import ActionFailure, SoarAPIError
+
+from .quickxorhash import QuickXorHash
+from .vault_index import get_vault_index, invalidate_vault_index
+
+
+DOWNLOAD_URL_FIELD = "@microsoft.graph.downloadUrl"
+FILE_SIZE_FIELD = "size"
+FILE_FACET_FIELD = "file"
+HASHES_FIELD = "hashes"
+SHA1_HASH_FIELD = "sha1Hash"
+SHA256_HASH_FIELD = "sha256Hash"
+QUICK_XOR_HASH_FIELD = "quickXorHash"
+FILE_HAS_NO_CONTENT_MESSAGE = "File has no content"
+FILE_NOT_FOUND_MESSAGE = "The requested file does not exist on OneDrive"
+ERROR_READING_DOWNLOADED_FILE_MESSAGE = "Reading downloaded file data failed"
+INCOMPLETE_DOWNLOAD_MESSAGE = (
+    "Downloaded {downloaded_size} of {file_size} bytes; the download was incomplete"
+)
+HASH_MISMATCH_MESSAGE = (
+    "Downloaded file {hash_name} {actual} does not match {expected} reported by "
+    "Microsoft Graph"
+)
+RANGE_NOT_SATISFIED_MESSAGE = (
+    "Download server did not return the requested byte range {start}-{end}"
+)
+ADD_FILE_TO_VAULT_ERROR_MESSAGE = "Could not add file to vault"
+VAULT_ATTACHMENT_LOOKUP_ERROR = "Could not retrieve attachment information"
+FORCE_INFECTED_DOWNLOAD_HEADER = {"Prefer": "forceInfectedDownload"}
+DOWNLOAD_TIMEOUT_SECONDS = 30.0
+# The phantom vault_info diagnostics list the whole container twice more on
+# every duplicate check; enable them only when debugging vault lookups.
+VAULT_LOOKUP_DIAGNOSTICS_ENABLED = False
+DOWNLOAD_SEGMENT_SIZE = 32 * 1024 * 1024
+DOWNLOAD_MAX_CONNECTIONS = 4
+DOWNLOAD_MAX_RESUME_ATTEMPTS = 3
+DOWNLOAD_RESUME_BACKOFF_SECONDS = 2.0
+EXPIRED_DOWNLOAD_URL_STATUS_CODES = {
+    httpx.codes.UNAUTHORIZED,
+    httpx.codes.FORBIDDEN,
+}
+RETRYABLE_DOWNLOAD_STATUS_CODES = {
+    httpx.codes.TOO_MANY_REQUESTS,
+    httpx.codes.INTERNAL_SERVER_ERROR,
+    httpx.codes.BAD_GATEWAY,
+    httpx.codes.SERVICE_UNAVAILABLE,
+    httpx.codes.GATEWAY_TIMEOUT,
+}
+
+
+def _log_legacy_vault_lookup(container_id: int) -> None:
+    try:
+        ph_rules = importlib.import_module("phantom.rules")
+    except ModuleNotFoundError:
+        logging.info("phantom.rules unavailable; skipping legacy vault_info diagnostic")
+        return
+
+    success, message, vault_meta_info = ph_rules.vault_info(container_id=container_id)
+    vault_meta_info = list(vault_meta_info)
+    logging.info(
+        "legacy phantom.rules.vault_info result: "
+        f"success={success}, message={message!r}, item_count={len(vault_meta_info)}"
+    )
+
+
+def _log_sdk_vault_lookup(container_id: int) -> None:
+    try:
+        phantom_vault = importlib.import_module("phantom.vault")
+    except ModuleNotFoundError:
+        logging.info("phantom.vault unavailable; skipping SDK vault_info diagnostic")
+        return
+
+    success, message, vault_meta_info = phantom_vault.vault_info(
+        None,
+        None,
+        container_id,
+        download_file=True,
+    )
+    vault_meta_info = list(vault_meta_info)
+    logging.info(
+        "SDK phantom.vault.vault_info result: "
+        f"success={success}, message={message!r}, item_count={len(vault_meta_info)}"
+    )
+
+
+def get_metadata_hashes(metadata: dict[str, Any]) -> dict[str, str]:
+    return (metadata.get(FILE_FACET_FIELD) or {}).get(HASHES_FIELD) or {}
+
+
+def check_download_hashes(
+    metadata_hashes: dict[str, str],
+    *,
+    quick_xor_hash: str,
+    sha256: str,
+) -> None:
+    """Fail when the downloaded content does not match the hashes Graph reports."""
+    expected_quick_xor_hash = metadata_hashes.get(QUICK_XOR_HASH_FIELD)
+    if expected_quick_xor_hash and expected_quick_xor_hash != quick_xor_hash:
+        raise ActionFailure(
+            HASH_MISMATCH_MESSAGE.format(
+                hash_name=QUICK_XOR_HASH_FIELD,
+                expected=expected_quick_xor_hash,
+                actual=quick_xor_hash,
+            )
+        )
+
+    expected_sha256 = metadata_hashes.get(SHA256_HASH_FIELD)
+    if expected_sha256 and expected_sha256.lower() != sha256:
+        raise ActionFailure(
+            HASH_MISMATCH_MESSAGE.format(
+                hash_name=SHA256_HASH_FIELD,
+                expected=expected_sha256.lower(),
+                actual=sha256,
+            )
+        )
+
+
+def get_existing_vault_id(
+    soar: SOARClient,
+    *,
+    file_name: str,
+    file_size: int,
+    sha1: str | None = None,
+) -> str | None:
+    """Return the vault ID of a matching attachment in the executing container."""
+    container_id = soar.get_executing_container_id()
+    logging.info(f"Checking existing vault attachments for container_id={container_id}")
+    if VAULT_LOOKUP_DIAGNOSTICS_ENABLED:
+        _log_legacy_vault_lookup(container_id)
+        _log_sdk_vault_lookup(container_id)
+
+    try:
+        vault_index = get_vault_index(soar, container_id)
+    except SoarAPIError as e:
+        if e.message == VAULT_ATTACHMENT_LOOKUP_ERROR:
+            logging.info(
+                "Could not retrieve existing vault attachments; "
+                "skipping duplicate check"
+            )
+            return None
+        raise
+
+    vault_id = vault_index.find(file_name=file_name, file_size=file_size, sha1=sha1)
+    if vault_id is not None:
+        logging.info(
+            f"Found existing vault attachment for file_name={file_name} "
+            f"size={file_size}"
+        )
+        return vault_id
+    logging.info("No matching vault attachment found")
+    return None
+
+
+def get_download_tmp_dir(soar: SOARClient) -> Path | None:
+    """Return the vault tmp dir when it exists on this host, else None."""
+    vault_tmp_dir = Path(soar.vault.get_vault_tmp_dir())
+    if vault_tmp_dir.exists():
+        return vault_tmp_dir
+    return None
+
+
+def _get_download_client() -> httpx.Client:
+    return httpx.Client(
+        timeout=DOWNLOAD_TIMEOUT_SECONDS,
+        limits=httpx.Limits(max_connections=DOWNLOAD_MAX_CONNECTIONS),
+    )
+
+
+class _DownloadUrl:
+    """Share a download URL between segment downloads and refresh it on expiry.
+
+    Pre-authenticated download URLs expire after a short time. The first
+    download that sees the expired URL fetches a new one; downloads that
+    failed with the same URL reuse it instead of refreshing again.
+    """
+
+    def __init__(self, url: str, refresh: Callable[[], str] | None = None) -> None:
+        self._url = url
+        self._refresh = refresh
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    def refresh(self, expired_url: str) -> bool:
+        with self._lock:
+            if self._url != expired_url:
+                return True
+            if self._refresh is None:
+                return False
+            logging.info("Download URL expired; requesting a new one")
+            self._url = self._refresh()
+            return True
+
+
+class DownloadHashes:
+    """Hash download content as it is written to the temp file.
+
+    QuickXorHash accepts chunks at any offset, so concurrent segments hash
+    their own bytes. SHA-256 needs the bytes in file order: it is updated
+    while chunks arrive in order and computed from the temp file otherwise.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self._quick_xor = QuickXorHash()
+        self._sha256 = hashlib.sha256()
+        self._sha256_length = 0
+        self._sha256_in_order = True
+
+    def update(self, offset: int, chunk: bytes) -> None:
+        with self._lock:
+            self._quick_xor.update(chunk, offset)
+            if self._sha256_in_order and offset == self._sha256_length:
+                self._sha256.update(chunk)
+                self._sha256_length += len(chunk)
+            else:
+                self._sha256_in_order = False
+
+    @property
+    def quick_xor_hash(self) -> str:
+        return self._quick_xor.b64digest()
+
+    def get_sha256(self, temp_path: Path) -> str:
+        if self._sha256_in_order:
+            return self._sha256.hexdigest()
+        logging.info("Computing SHA-256 of the segmented download")
+        with temp_path.open("rb") as temp_file:
+            return hashlib.file_digest(temp_file, "sha256").hexdigest()
+
+
+def _get_download_url(graph_client: httpx.Client, endpoint: str) -> str:
+    response = graph_client.get(endpoint)
+    response.raise_for_status()
+    download_url = response.json().get(DOWNLOAD_URL_FIELD)
+    if not download_url:
+        raise ActionFailure(FILE_NOT_FOUND_MESSAGE)
+    return download_url
+
+
+def _get_download_segments(file_size: int) -> list[tuple[int, int]]:
+    """Split a file into inclusive (start, end) byte ranges."""
+    return [
+        (start, min(start + DOWNLOAD_SEGMENT_SIZE, file_size) - 1)
+        for start in range(0, file_size, DOWNLOAD_SEGMENT_SIZE)
+    ]
+
+
+def _get_range_header(start: int, end: int | None = None) -> dict[str, str]:
+    return {"Range": f"bytes={start}-{'' if end is None else end}"}
+
+
+def _download_range(
+    client: httpx.Client,
+    download_url: _DownloadUrl,
+    fd: int,
+    *,
+    start: int = 0,
+    end: int | None = None,
+    headers: dict[str, str] | None = None,
+    follow_redirects: bool = False,
+    hashes: DownloadHashes | None = None,
+) -> tuple[int, bool]:
+    """Write bytes ``start``-``end`` of a download into a file at their offset.
+
+    Bytes already written are kept when the connection drops, the server
+    returns a retryable status, or a ranged response ends early; the request
+    is then re-issued from the first missing byte. An expired download URL
+    is refreshed before resuming.
+
+    Args:
+        client: Client used to request the download URL.
+        download_url: Shared download URL.
+        fd: File descriptor of the temp file.
+        start: First byte to download.
+        end: Last byte to download, or None to read to the end of the file.
+        headers: Extra request headers.
+        follow_redirects: Whether to follow redirects to the download host.
+        hashes: Hashes updated with every chunk as it is written.
+
+    Returns:
+        The number of bytes written, and whether the server honored ranges.
+        When a server answers a range starting at byte 0 with the whole file,
+        the whole file is written.
+    """
+    written = 0
+    ranged = False
+    attempt = 0
+    while True:
+        url = download_url.url
+        offset = start + written
+        request_headers = dict(headers or {})
+        if offset or end is not None:
+            request_headers.update(_get_range_header(offset, end))
+
+        try:
+            with client.stream(
+                "GET",
+                url,
+                headers=request_headers,
+                timeout=DOWNLOAD_TIMEOUT_SECONDS,
+                follow_redirects=follow_redirects,
+            ) as response:
+                if (
+                    response.status_code in EXPIRED_DOWNLOAD_URL_STATUS_CODES
+                    and attempt < DOWNLOAD_MAX_RESUME_ATTEMPTS
+                    and download_url.refresh(url)
+                ):
+                    attempt += 1
+                    continue
+                response.raise_for_status()
+
+                ranged = response.status_code == httpx.codes.PARTIAL_CONTENT
+                if "Range" in request_headers and not ranged:
+                    if start:
+                        raise ActionFailure(
+                            RANGE_NOT_SATISFIED_MESSAGE.format(start=start, end=end)
+                        )
+                    # The server ignored the range and sent the whole file.
+                    if written and hashes is not None:
+                        hashes.reset()
+                    written = 0
+
+                # Chunks are written as they arrive rather than buffered to a
+                # fixed size, so a dropped connection loses no received bytes.
+                for chunk in response.iter_bytes():
+                    if not chunk:
+                        continue
+                    if hashes is not None:
+                        hashes.update(start + written, chunk)
+                    written += os.pwrite(fd, chunk, start + written)
+
+            if end is None or start + written > end or not ranged:
+                return written, ranged
+            error: Exception = ActionFailure(
+                INCOMPLETE_DOWNLOAD_MESSAGE.format(
+                    downloaded_size=written,
+                    file_size=end - start + 1,
+                )
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in RETRYABLE_DOWNLOAD_STATUS_CODES:
+                raise
+            error = e
+        except httpx.TransportError as e:
+            error = e
+
+        if attempt == DOWNLOAD_MAX_RESUME_ATTEMPTS:
+            raise error
+        attempt += 1
+        logging.info(
+            f"Download interrupted ({error}); resuming from byte "
+            f"{start + written} in {DOWNLOAD_RESUME_BACKOFF_SECONDS * attempt}s"
+        )
+        time.sleep(DOWNLOAD_RESUME_BACKOFF_SECONDS * attempt)
+
+
+def _download_segment(
+    download_client: httpx.Client,
+    download_url: _DownloadUrl,
+    fd: int,
+    start: int,
+    end: int,
+    hashes: DownloadHashes | None = None,
+) -> int:
+    written, _ = _download_range(
+        download_client, download_url, fd, start=start, end=end, hashes=hashes
+    )
+    return written
+
+
+def _download_file_segments(
+    download_client: httpx.Client,
+    download_url: _DownloadUrl,
+    temp_file: IO[bytes],
+    file_size: int,
+    hashes: DownloadHashes | None = None,
+) -> int:
+    """Download a file over concurrent Range requests into ``temp_file``.
+
+    The first segment doubles as the range support probe. When the server
+    answers it with the whole file instead of 206 Partial Content, that
+    response has already been written as a single stream. Otherwise the
+    remaining segments are downloaded by a thread pool, each with positional
+    writes at its own offset.
+    """
+    fd = temp_file.fileno()
+    (first_start, first_end), *segments = _get_download_segments(file_size)
+
+    temp_file.truncate(file_size)
+    written, ranged = _download_range(
+        download_client,
+        download_url,
+        fd,
+        start=first_start,
+        end=first_end,
+        hashes=hashes,
+    )
+    if not ranged:
+        logging.info(
+            "Download server ignored the Range header; downloaded in a single stream"
+        )
+        temp_file.truncate(written)
+        return written
+
+    logging.info(
+        f"Downloading {file_size} bytes in {len(segments) + 1} segment(s) "
+        f"over up to {DOWNLOAD_MAX_CONNECTIONS} connection(s)"
+    )
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_MAX_CONNECTIONS) as executor:
+        futures = [
+            executor.submit(
+                _download_segment,
+                download_client,
+                download_url,
+                fd,
+                start,
+                end,
+                hashes,
+            )
+            for start, end in segments
+        ]
+        try:
+            return written + sum(future.result() for future in futures)
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def download_file_to_tmp(
+    download_url: str,
+    temp_dir: Path | None,
+    *,
+    expected_size: int | None = None,
+    refresh_download_url: Callable[[], str] | None = None,
+    hashes: DownloadHashes | None = None,
+) -> tuple[Path, int]:
+    """Download a pre-authenticated download URL into a temp file.
+
+    Files larger than one DOWNLOAD_SEGMENT_SIZE segment are downloaded over
+    concurrent Range requests when ``expected_size`` is known. Interrupted
+    downloads resume from the partial temp file, using
+    ``refresh_download_url`` to replace an expired URL.
+    """
+    temp_path: Path | None = None
+    shared_download_url = _DownloadUrl(download_url, refresh_download_url)
+    try:
+        with NamedTemporaryFile(
+            "wb",
+            delete=False,
+            dir=temp_dir,
+        ) as temp_file:
+            temp_path = Path(temp_file.name)
+
+            with _get_download_client() as download_client:
+                if expected_size and expected_size > DOWNLOAD_SEGMENT_SIZE:
+                    file_size = _download_file_segments(
+                        download_client,
+                        shared_download_url,
+                        temp_file,
+                        expected_size,
+                        hashes,
+                    )
+                else:
+                    file_size, _ = _download_range(
+                        download_client,
+                        shared_download_url,
+                        temp_file.fileno(),
+                        hashes=hashes,
+                    )
+                    temp_file.truncate(file_size)
+    except Exception:
+        if temp_path is not None:
+            temp_path.unlink(missing_ok=True)
+        raise
+
+    return temp_path, file_size
+
+
+def download_graph_content_to_tmp(
+    graph_client: httpx.Client,
+    endpoint: str,
+    temp_dir: Path | None,
+    *,
+    headers: dict[str, str] | None = None,
+    hashes: DownloadHashes | None = None,
+) -> tuple[Path, int]:
+    temp_path: Path | None = None
+    try:
+        with NamedTemporaryFile(
+            "wb",
+            delete=False,
+            dir=temp_dir,
+        ) as temp_file:
+            temp_path = Path(temp_file.name)
+            file_size, _ = _download_range(
+                graph_client,
+                _DownloadUrl(endpoint),
+                temp_file.fileno(),
+                headers=headers,
+                follow_redirects=True,
+                hashes=hashes,
+            )
+            temp_file.truncate(file_size)
+    except Exception:
+        if temp_path is not None:
+            temp_path.unlink(missing_ok=True)
+        raise
+
+    return temp_path, file_size
+
+
+def _add_platform_vault_attachment(
+    soar: SOARClient,
+    *,
+    temp_path: Path,
+    file_name: str,
+    metadata: dict[str, str],
+) -> str | None:
+    try:
+        phantom_vault = importlib.import_module("phantom.vault")
+        phantom = importlib.import_module("phantom.app")
+    except ModuleNotFoundError:
+        return None
+
+    vault_response = phantom_vault.Vault.add_attachment(
+        str(temp_path),
+        container_id=soar.get_executing_container_id(),
+        file_name=file_name,
+        metadata=metadata,
+    )
+    if not vault_response.get("succeeded"):
+        raise ActionFailure(ADD_FILE_TO_VAULT_ERROR_MESSAGE)
+
+    return vault_response.get("vault_id") or vault_response[phantom.APP_JSON_HASH]
+
+
+def create_downloaded_vault_attachment(
+    soar: SOARClient,
+    *,
+    temp_path: Path,
+    file_name: str,
+    file_size: int,
+) -> str:
+    """Add a downloaded file to the vault.
+
+    Downloads are written to the vault tmp dir whenever it exists, so they
+    are added by path and never read into memory. Without a vault tmp dir,
+    such as when the app runs outside the platform, the SDK vault only
+    accepts paths under its own tmp dir or the whole content, so the file is
+    read and created from content; memory use then grows with the file size.
+    """
+    vault_tmp_dir = get_download_tmp_dir(soar)
+    metadata = {"size": str(file_size)}
+    if vault_tmp_dir is None:
+        try:
+            file_content = temp_path.read_bytes()
+        except OSError as e:
+            raise ActionFailure(ERROR_READING_DOWNLOADED_FILE_MESSAGE) from e
+
+        return soar.vault.create_attachment(
+            soar.get_executing_container_id(),
+            file_content,
+            file_name,
+            metadata=metadata,
+        )
+
+    platform_vault_id = _add_platform_vault_attachment(
+        soar,
+        temp_path=temp_path,
+        file_name=file_name,
+        metadata=metadata,
+    )
+    if platform_vault_id is not None:
+        return platform_vault_id
+
+    return soar.vault.add_attachment(
+        soar.get_executing_container_id(),
+        str(temp_path),
+        file_name,
+        metadata=metadata,
+    )
+
+
+@dataclass(frozen=True)
+class DownloadedFile:
+    """A verified download waiting in a temp file to be added to the vault."""
+
+    temp_path: Path
+    size: int
+    quick_xor_hash: str
+    sha256: str
+
+
+def download_item_to_tmp(
+    graph_client: httpx.Client,
+    metadata: dict[str, Any],
+    *,
+    endpoint: str,
+    content_endpoint: str | None,
+    temp_dir: Path | None,
+) -> DownloadedFile:
+    """Download a drive item into a temp file and verify its content.
+
+    Args:
+        graph_client: Authenticated Microsoft Graph client.
+        metadata: driveItem metadata with the download URL, size and hashes.
+        endpoint: Metadata endpoint used to refresh an expired download URL.
+        content_endpoint: Graph content endpoint for force infected downloads,
+            or None to use the pre-authenticated download URL.
+        temp_dir: Directory for the temp file.
+
+    Returns:
+        The temp file with its size and hashes. The caller removes it.
+    """
+    hashes = DownloadHashes()
+    if content_endpoint is not None:
+        logging.info(
+            "force_infected_download enabled; using Microsoft Graph "
+            f"content endpoint: {content_endpoint}"
+        )
+        temp_path, file_size = download_graph_content_to_tmp(
+            graph_client,
+            content_endpoint,
+            temp_dir,
+            headers=FORCE_INFECTED_DOWNLOAD_HEADER,
+            hashes=hashes,
+        )
+    else:
+        download_url = metadata.get(DOWNLOAD_URL_FIELD)
+        if not download_url:
+            raise ActionFailure(FILE_NOT_FOUND_MESSAGE)
+        temp_path, file_size = download_file_to_tmp(
+            download_url,
+            temp_dir,
+            expected_size=metadata.get(FILE_SIZE_FIELD),
+            refresh_download_url=partial(_get_download_url, graph_client, endpoint),
+            hashes=hashes,
+        )
+
+    try:
+        if not file_size:
+            raise ActionFailure(FILE_HAS_NO_CONTENT_MESSAGE)
+        logging.info(f"Downloaded file content size={file_size}")
+        downloaded_file = DownloadedFile(
+            temp_path=temp_path,
+            size=file_size,
+            quick_xor_hash=hashes.quick_xor_hash,
+            sha256=hashes.get_sha256(temp_path),
+        )
+        check_download_hashes(
+            get_metadata_hashes(metadata),
+            quick_xor_hash=downloaded_file.quick_xor_hash,
+            sha256=downloaded_file.sha256,
+        )
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return downloaded_file
+
+
+def add_downloaded_file_to_vault(
+    soar: SOARClient,
+    downloaded_file: DownloadedFile,
+    *,
+    file_name: str,
+) -> str:
+    try:
+        vault_id = create_downloaded_vault_attachment(
+            soar,
+            temp_path=downloaded_file.temp_path,
+            file_name=file_name,
+            file_size=downloaded_file.size,
+        )
+    finally:
+        invalidate_vault_index(soar.get_executing_container_id())
+    logging.info(f"Created vault attachment for file_name={file_name}")
+    return vault_id
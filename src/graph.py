@@ -11,7 +11,16 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import contextlib
+import random
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any
+
 import httpx
+from soar_sdk import logging
+from soar_sdk.action_results import ActionOutput
 from soar_sdk.auth import OAuthBearerAuth
 from soar_sdk.auth.flows import AuthorizationCodeFlow
 
@@ -21,7 +30,371 @@ from .auth import (
     get_client_credentials_flow,
     is_client_credentials_auth,
 )
-from .consts import MICROSOFT_GRAPH_BASE_URL, REDIRECT_URI_STATE_KEY
+from .consts import (
+    AUTH_METHOD_CLIENT_CREDENTIALS,
+    AUTH_METHOD_DELEGATED,
+    GRAPH_POOL_KEEPALIVE_EXPIRY_SECONDS,
+    GRAPH_POOL_MAX_CONNECTIONS,
+    GRAPH_POOL_MAX_KEEPALIVE_CONNECTIONS,
+    MICROSOFT_GRAPH_BASE_URL,
+    REDIRECT_URI_STATE_KEY,
+)
+from .rate_limit import RateLimiter, get_rate_limiter
+
+
+GRAPH_MAX_PAGE_SIZE = 999
+GRAPH_MIN_PAGE_SIZE = 100
+RETRY_AFTER_HEADER = "Retry-After"
+THROTTLED_STATUS_CODES = {
+    httpx.codes.TOO_MANY_REQUESTS,
+    httpx.codes.SERVICE_UNAVAILABLE,
+}
+GRAPH_MAX_RETRIES = 5
+GRAPH_RETRY_BUDGET = 30
+GRAPH_RETRY_BACKOFF_SECONDS = 1.0
+GRAPH_RETRY_MAX_BACKOFF_SECONDS = 30.0
+TRANSIENT_STATUS_CODES = {
+    httpx.codes.INTERNAL_SERVER_ERROR,
+    httpx.codes.BAD_GATEWAY,
+    httpx.codes.GATEWAY_TIMEOUT,
+}
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+THROTTLED_RETRIES_EXTENSION = "graph_throttled_retries"
+
+_GraphTransportKey = tuple[str, str, bool]
+
+_graph_transports: dict[_GraphTransportKey, httpx.HTTPTransport] = {}
+_graph_transports_lock = threading.Lock()
+
+
+class _SharedTransport(httpx.BaseTransport):
+    """Lend a pooled transport to a client without letting the client close it.
+
+    httpx closes a client's transport when the client is closed. Actions keep
+    using ``with get_graph_client(...)`` blocks, so the pooled transport is
+    wrapped and only closed through ``invalidate_graph_transports``.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport) -> None:
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        return None
+
+
+def _get_retry_backoff_seconds(attempt: int) -> float:
+    backoff = min(
+        GRAPH_RETRY_BACKOFF_SECONDS * 2**attempt, GRAPH_RETRY_MAX_BACKOFF_SECONDS
+    )
+    return backoff / 2 + random.uniform(0, backoff / 2)  # noqa: S311 - jitter, not cryptography
+
+
+class _RetryTransport(httpx.BaseTransport):
+    """Retry throttled and transient Graph failures for every request of a client.
+
+    Throttling responses are retried for every method, because Graph has not
+    processed a throttled request. Other server errors and transport errors
+    are only retried for idempotent methods, and connection failures for any
+    method. Requests with a streamed body cannot be replayed and are sent once.
+
+    Waits follow Retry-After when Graph sends it and jittered exponential
+    backoff otherwise. A client gets GRAPH_RETRY_BUDGET retries in total, so
+    an action against a throttled tenant fails instead of stalling for hours.
+
+    The number of throttled retries behind a response is stored in its
+    THROTTLED_RETRIES_EXTENSION extension, so callers sharing the client
+    across threads can tell which of their own requests were throttled.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        *,
+        max_retries: int = GRAPH_MAX_RETRIES,
+        retry_budget: int = GRAPH_RETRY_BUDGET,
+    ) -> None:
+        self._transport = transport
+        self.max_retries = max_retries
+        self.retries_left = retry_budget
+        self.retry_count = 0
+        self.throttled_count = 0
+        self._lock = threading.Lock()
+
+    def _take_retry(self, attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        with self._lock:
+            if self.retries_left <= 0:
+                logging.warning("Microsoft Graph retry budget exhausted")
+                return False
+            self.retries_left -= 1
+            self.retry_count += 1
+            return True
+
+    def _should_retry_response(
+        self, request: httpx.Request, response: httpx.Response
+    ) -> bool:
+        if response.status_code in THROTTLED_STATUS_CODES:
+            with self._lock:
+                self.throttled_count += 1
+            return True
+        return (
+            response.status_code in TRANSIENT_STATUS_CODES
+            and request.method in IDEMPOTENT_METHODS
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        replayable = isinstance(request.stream, httpx.ByteStream)
+        attempt = 0
+        throttled_retries = 0
+        while True:
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError as e:
+                if not (
+                    replayable
+                    and (
+                        request.method in IDEMPOTENT_METHODS
+                        or isinstance(e, httpx.ConnectError)
+                    )
+                    and self._take_retry(attempt)
+                ):
+                    raise
+                delay = _get_retry_backoff_seconds(attempt)
+                reason = type(e).__name__
+            else:
+                if not (
+                    self._should_retry_response(request, response)
+                    and replayable
+                    and self._take_retry(attempt)
+                ):
+                    response.extensions[THROTTLED_RETRIES_EXTENSION] = throttled_retries
+                    return response
+                if response.status_code in THROTTLED_STATUS_CODES:
+                    throttled_retries += 1
+                delay = get_retry_after_seconds(response.headers)
+                if delay is None:
+                    delay = _get_retry_backoff_seconds(attempt)
+                reason = f"HTTP {response.status_code}"
+                response.close()
+
+            logging.info(
+                f"Retrying Microsoft Graph {request.method} {request.url.path} "
+                f"after {reason} in {delay:.1f}s"
+            )
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        if self.retry_count:
+            logging.info(
+                f"Microsoft Graph requests were retried {self.retry_count} time(s), "
+                f"{self.throttled_count} throttling response(s) received"
+            )
+        self._transport.close()
+
+
+class _SlotReleasingStream(httpx.SyncByteStream):
+    """Response body that releases its rate limit slot when it is closed."""
+
+    def __init__(
+        self, stream: httpx.SyncByteStream, slot: contextlib.ExitStack
+    ) -> None:
+        self._stream = stream
+        self._slot = slot
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._slot.close()
+
+
+class _RateLimitedTransport(httpx.BaseTransport):
+    """Send each request through the shared rate limiter of its tenant and user.
+
+    It sits below the retry transport, so retries also wait for a token. The
+    concurrency slot is held until the response is closed, which httpx does
+    once the body is read, so streamed downloads count as in flight while
+    their body is transferred.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, limiter: RateLimiter) -> None:
+        self._transport = transport
+        self._limiter = limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with contextlib.ExitStack() as slot:
+            slot.enter_context(self._limiter.request_slot())
+            response = self._transport.handle_request(request)
+            # A body that was already read holds no connection; release now.
+            if not response.is_closed:
+                response.stream = _SlotReleasingStream(response.stream, slot.pop_all())
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def _get_auth_mode(asset: Asset) -> str:
+    if is_client_credentials_auth(asset):
+        return AUTH_METHOD_CLIENT_CREDENTIALS
+    return AUTH_METHOD_DELEGATED
+
+
+def get_graph_transport(
+    asset: Asset,
+    asset_id: str,
+    *,
+    verify: bool = True,
+    limits: httpx.Limits | None = None,
+) -> httpx.BaseTransport:
+    """Return the process-level Graph connection pool for an asset.
+
+    Transports are keyed by asset ID, authentication mode and TLS verification
+    so connections are never shared between credentials. ``limits`` only
+    applies when the pool is first created.
+    """
+    key = (asset_id, _get_auth_mode(asset), verify)
+    with _graph_transports_lock:
+        transport = _graph_transports.get(key)
+        if transport is None:
+            transport = httpx.HTTPTransport(
+                verify=verify,
+                limits=limits
+                or httpx.Limits(
+                    max_connections=GRAPH_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=GRAPH_POOL_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=GRAPH_POOL_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+            )
+            _graph_transports[key] = transport
+
+    return _SharedTransport(transport)
+
+
+def get_graph_rate_limiter(asset: Asset, asset_id: str) -> RateLimiter | None:
+    """Return the rate limiter shared by every client of the asset's tenant and user.
+
+    Client credentials assets are keyed by their target user. Delegated assets
+    act as the user who authorized the asset, so they are keyed by asset ID.
+    """
+    tenant = (asset.tenant_id or "common").strip().lower()
+    if is_client_credentials_auth(asset):
+        user = (asset.target_user_id or "").strip().lower()
+    else:
+        user = f"asset:{asset_id}"
+    return get_rate_limiter(
+        f"{tenant}|{user}",
+        requests_per_second=asset.rate_limit_requests_per_second,
+        max_concurrent_requests=asset.rate_limit_concurrent_requests,
+        shared_across_processes=bool(asset.rate_limit_across_processes),
+    )
+
+
+def invalidate_graph_transports(asset_id: str | None = None) -> None:
+    """Close pooled Graph connections for one asset, or for every asset."""
+    with _graph_transports_lock:
+        keys = [
+            key for key in _graph_transports if asset_id is None or key[0] == asset_id
+        ]
+        transports = [_graph_transports.pop(key) for key in keys]
+
+    for transport in transports:
+        transport.close()
+
+
+def get_select_fields(
+    output_cls: type[ActionOutput],
+    *,
+    exclude: Iterable[str] = (),
+    extra_fields: Iterable[str] = (),
+) -> str:
+    """Build a Graph "$select" value from the top-level fields of an output model.
+
+    Args:
+        output_cls: Action output model whose fields Graph should return.
+        exclude: Model field names that the action fills in itself.
+        extra_fields: Additional Graph properties requested by the user.
+
+    Returns:
+        Comma-separated property names, using field aliases where set.
+    """
+    excluded = set(exclude)
+    select_fields: list[str] = []
+    for name, field in output_cls.model_fields.items():
+        if name in excluded:
+            continue
+        select_fields.append(field.alias or name)
+
+    for extra_field in extra_fields:
+        if extra_field not in select_fields:
+            select_fields.append(extra_field)
+    return ",".join(select_fields)
+
+
+def get_retry_after_seconds(headers: Mapping[str, str]) -> float | None:
+    """Return the Retry-After delay in seconds, or None when it is not usable.
+
+    The delay is capped at GRAPH_RETRY_MAX_BACKOFF_SECONDS so a very long
+    Retry-After cannot hold a worker for hours between retries.
+    """
+    retry_after = headers.get(RETRY_AFTER_HEADER)
+    if not retry_after:
+        return None
+    try:
+        return min(max(float(retry_after), 0.0), GRAPH_RETRY_MAX_BACKOFF_SECONDS)
+    except ValueError:
+        return None
+
+
+def get_graph_page(
+    graph_client: Any,
+    endpoint: str,
+    *,
+    params: Mapping[str, Any] | None = None,
+    page_size: int = GRAPH_MAX_PAGE_SIZE,
+) -> tuple[dict[str, Any], int]:
+    """Request one page of a Graph collection with a "$top" page size.
+
+    The query parameters are merged into the endpoint's own query, so the
+    "$skiptoken" or "token" of a next or delta link is kept; httpx would
+    replace the whole query if they were passed as ``params``. "$top" is
+    also sent with next links so a reduced page size sticks for the rest of
+    the listing.
+
+    Throttled pages are retried by the client's retry transport, so a
+    response that still fails is raised. When the page was only returned
+    after throttled retries, the page size is halved for each of them, down
+    to GRAPH_MIN_PAGE_SIZE.
+
+    Args:
+        graph_client: Authenticated Microsoft Graph client.
+        endpoint: Graph endpoint or next-link URL to request.
+        params: Extra query parameters, such as "$select".
+        page_size: Number of items to request.
+
+    Returns:
+        The response JSON and the page size to use for the next page.
+    """
+    url = httpx.URL(endpoint).copy_merge_params({**(params or {}), "$top": page_size})
+    response = graph_client.get(url)
+    response.raise_for_status()
+
+    throttled_retries = response.extensions.get(THROTTLED_RETRIES_EXTENSION, 0)
+    if throttled_retries:
+        page_size = max(page_size // 2**throttled_retries, GRAPH_MIN_PAGE_SIZE)
+        logging.info(
+            f"Microsoft Graph throttled a list request {throttled_retries} "
+            f"time(s); requesting the next pages with page size {page_size}"
+        )
+    return response.json(), page_size
 
 
 def get_graph_client(
@@ -31,13 +404,19 @@ def get_graph_client(
     base_url: str = MICROSOFT_GRAPH_BASE_URL,
     verify: bool = True,
 ) -> httpx.Client:
+    transport: httpx.BaseTransport = get_graph_transport(asset, asset_id, verify=verify)
+    rate_limiter = get_graph_rate_limiter(asset, asset_id)
+    if rate_limiter is not None:
+        transport = _RateLimitedTransport(transport, rate_limiter)
+    transport = _RetryTransport(transport)
+
     if is_client_credentials_auth(asset):
         token = get_client_credentials_flow(asset).get_token()
         return httpx.Client(
             base_url=base_url,
             headers={"Authorization": f"Bearer {token.access_token}"},
             timeout=30.0,
-            verify=verify,
+            transport=transport,
         )
 
     flow: AuthorizationCodeFlow = get_auth_code_flow(
@@ -49,5 +428,5 @@ def get_graph_client(
         base_url=base_url,
         auth=OAuthBearerAuth(oauth_client=flow.client),
         timeout=30.0,
-        verify=verify,
+        transport=transport,
     )
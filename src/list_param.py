@@ -0,0 +1,21 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+def split_list_param(value: str | None) -> list[str]:
+    """Split a comma-separated action parameter into unique, non-empty values."""
+    values: list[str] = []
+    for raw_value in (value or "").split(","):
+        stripped_value = raw_value.strip()
+        if stripped_value and stripped_value not in values:
+            values.append(stripped_value)
+    return values
@@ -0,0 +1,82 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import base64
+
+
+QUICK_XOR_WIDTH_BITS = 160
+QUICK_XOR_SHIFT_BITS = 11
+QUICK_XOR_DIGEST_SIZE = QUICK_XOR_WIDTH_BITS // 8
+QUICK_XOR_LENGTH_SIZE = 8
+# Byte i is rotated left by (i * 11) % 160 bits. 11 and 160 are coprime, so
+# the rotation repeats every 160 bytes and bytes 160 apart can be XORed
+# together before they are rotated.
+QUICK_XOR_PERIOD_BYTES = QUICK_XOR_WIDTH_BITS
+_PERIOD_BITS = QUICK_XOR_PERIOD_BYTES * 8
+_PERIOD_MASK = (1 << _PERIOD_BITS) - 1
+_WIDTH_MASK = (1 << QUICK_XOR_WIDTH_BITS) - 1
+
+
+class QuickXorHash:
+    """Incremental Microsoft QuickXorHash, as reported in driveItem hashes.
+
+    The hash of a byte only depends on its position in the file, so chunks
+    may be added in any order as long as their file offsets are given. That
+    lets segmented downloads hash each segment as it is written.
+    """
+
+    def __init__(self) -> None:
+        self._folded = 0
+        self._length = 0
+
+    def update(self, data: bytes | memoryview, offset: int | None = None) -> None:
+        """Add ``data`` found at ``offset`` in the file, or after the last chunk.
+
+        Every byte of the file must be added exactly once.
+        """
+        if offset is None:
+            offset = self._length
+
+        view = memoryview(data)
+        fold = 0
+        for start in range(0, len(view), QUICK_XOR_PERIOD_BYTES):
+            block = view[start : start + QUICK_XOR_PERIOD_BYTES]
+            fold ^= int.from_bytes(block, "little")
+
+        shift = (offset % QUICK_XOR_PERIOD_BYTES) * 8
+        if shift:
+            fold = ((fold << shift) | (fold >> (_PERIOD_BITS - shift))) & _PERIOD_MASK
+        self._folded ^= fold
+        self._length += len(view)
+
+    def digest(self) -> bytes:
+        value = 0
+        for position in range(QUICK_XOR_PERIOD_BYTES):
+            byte = (self._folded >> (position * 8)) & 0xFF
+            if not byte:
+                continue
+            rotation = (position * QUICK_XOR_SHIFT_BITS) % QUICK_XOR_WIDTH_BITS
+            value ^= (
+                (byte << rotation) | (byte >> (QUICK_XOR_WIDTH_BITS - rotation))
+            ) & _WIDTH_MASK
+
+        digest = bytearray(value.to_bytes(QUICK_XOR_DIGEST_SIZE, "little"))
+        length_bytes = self._length.to_bytes(QUICK_XOR_LENGTH_SIZE, "little")
+        length_start = QUICK_XOR_DIGEST_SIZE - QUICK_XOR_LENGTH_SIZE
+        for index, length_byte in enumerate(length_bytes):
+            digest[length_start + index] ^= length_byte
+        return bytes(digest)
+
+    def b64digest(self) -> str:
+        """Return the digest base64-encoded, as Microsoft Graph reports it."""
+        return base64.b64encode(self.digest()).decode("ascii")
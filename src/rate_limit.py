@@ -0,0 +1,207 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import contextlib
+import hashlib
+import json
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from soar_sdk import logging
+
+try:
+    import fcntl
+except ImportError:
+    # fcntl is not available on Windows.
+    fcntl = None
+
+
+RATE_LIMIT_STATE_FILE_PREFIX = "microsoftonedrive-graph-rate-"
+TOKENS_FIELD = "tokens"
+UPDATED_AT_FIELD = "updated_at"
+
+_RateLimiterKey = tuple[str, float | None, int | None, bool]
+
+_rate_limiters: dict[_RateLimiterKey, "RateLimiter"] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Thread-safe token bucket that refills ``rate`` tokens per second.
+
+    Every caller takes a token straight away and sleeps off any deficit, so
+    concurrent callers are paced in the order they asked. The bucket holds
+    at most one second of tokens, which bounds bursts after an idle period.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, now: float) -> float:
+        elapsed = max(now - self._updated_at, 0.0)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+        self._tokens -= 1
+        return max(-self._tokens / self.rate, 0.0)
+
+    def acquire(self) -> None:
+        with self._lock:
+            wait = self._take(time.monotonic())
+        if wait > 0:
+            time.sleep(wait)
+
+
+class FileTokenBucket(TokenBucket):
+    """Token bucket whose state is shared by processes through a locked file.
+
+    The state is read, updated and written back under an exclusive fcntl
+    lock, using wall-clock time so every process measures refills alike.
+    """
+
+    def __init__(self, rate: float, path: Path) -> None:
+        super().__init__(rate)
+        self.path = path
+
+    def acquire(self) -> None:
+        with self._lock, self.path.open("a+", encoding="utf-8") as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+            state_file.seek(0)
+            try:
+                state = json.loads(state_file.read() or "{}")
+            except ValueError:
+                state = {}
+
+            now = time.time()
+            self._tokens = min(
+                float(state.get(TOKENS_FIELD, self.capacity)), self.capacity
+            )
+            self._updated_at = float(state.get(UPDATED_AT_FIELD, now))
+            wait = self._take(now)
+
+            state_file.seek(0)
+            state_file.truncate()
+            json.dump(
+                {TOKENS_FIELD: self._tokens, UPDATED_AT_FIELD: self._updated_at},
+                state_file,
+            )
+
+        if wait > 0:
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Caps the request rate and the number of requests in flight for one key."""
+
+    def __init__(
+        self,
+        bucket: TokenBucket | None = None,
+        max_concurrent_requests: int | None = None,
+    ) -> None:
+        self.bucket = bucket
+        self._semaphore = (
+            threading.BoundedSemaphore(max_concurrent_requests)
+            if max_concurrent_requests
+            else None
+        )
+
+    @contextlib.contextmanager
+    def request_slot(self) -> Iterator[None]:
+        """Wait for a free slot and a token, then hold the slot for the request."""
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+        try:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            yield
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+
+def _get_state_path(key: str) -> Path:
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return Path(tempfile.gettempdir()) / f"{RATE_LIMIT_STATE_FILE_PREFIX}{digest}.json"
+
+
+def _get_token_bucket(
+    key: str, requests_per_second: float, *, shared_across_processes: bool
+) -> TokenBucket:
+    if not shared_across_processes:
+        return TokenBucket(requests_per_second)
+    if fcntl is None:
+        logging.warning(
+            "File locks are not available on this platform; "
+            "rate limiting Microsoft Graph requests per process"
+        )
+        return TokenBucket(requests_per_second)
+    return FileTokenBucket(requests_per_second, _get_state_path(key))
+
+
+def get_rate_limiter(
+    key: str,
+    *,
+    requests_per_second: float | None = None,
+    max_concurrent_requests: int | None = None,
+    shared_across_processes: bool = False,
+) -> RateLimiter | None:
+    """Return the process-level rate limiter for a key, or None when unlimited.
+
+    Limiters are cached per key and settings, so every client of a tenant and
+    user in this process shares one bucket and one concurrency cap. Values
+    that are empty or not positive disable the matching limit.
+    """
+    requests_per_second = (
+        requests_per_second if requests_per_second and requests_per_second > 0 else None
+    )
+    max_concurrent_requests = (
+        max_concurrent_requests
+        if max_concurrent_requests and max_concurrent_requests > 0
+        else None
+    )
+    if requests_per_second is None and max_concurrent_requests is None:
+        return None
+
+    limiter_key = (
+        key,
+        requests_per_second,
+        max_concurrent_requests,
+        shared_across_processes,
+    )
+    with _rate_limiters_lock:
+        rate_limiter = _rate_limiters.get(limiter_key)
+        if rate_limiter is None:
+            bucket = (
+                _get_token_bucket(
+                    key,
+                    requests_per_second,
+                    shared_across_processes=shared_across_processes,
+                )
+                if requests_per_second is not None
+                else None
+            )
+            rate_limiter = RateLimiter(bucket, max_concurrent_requests)
+            _rate_limiters[limiter_key] = rate_limiter
+    return rate_limiter
+
+
+def invalidate_rate_limiters() -> None:
+    """Drop every cached rate limiter."""
+    with _rate_limiters_lock:
+        _rate_limiters.clear()
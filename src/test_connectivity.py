@@ -30,6 +30,7 @@ from .consts import (
     MICROSOFT_GRAPH_BASE_URL,
     REDIRECT_URI_STATE_KEY,
 )
+from .graph import invalidate_graph_transports
 
 
 AUTHORIZE_WAIT_TIME = 15
@@ -48,6 +49,7 @@ def run_test_connectivity(
     oauth_start_url: str,
 ) -> None:
     """test connectivity"""
+    invalidate_graph_transports(str(soar.get_asset_id()))
     if is_client_credentials_auth(asset):
         run_client_credentials_test_connectivity(asset)
     else:
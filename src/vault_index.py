@@ -0,0 +1,100 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from soar_sdk import logging
+from soar_sdk.abstract import SOARClient
+
+
+VAULT_INDEX_TTL_SECONDS = 60.0
+
+_vault_indexes: dict[int, "VaultIndex"] = {}
+_vault_indexes_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class VaultIndex:
+    """Vault attachments of one container, indexed for duplicate lookups.
+
+    SOAR vault IDs are the SHA-1 of the attachment content, so the hash index
+    also answers lookups by a SHA-1 reported by Microsoft Graph.
+    """
+
+    by_name_and_size: dict[tuple[str, int], str]
+    by_sha1: dict[str, str]
+    created_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_attachments(cls, attachments: Iterable[Any]) -> "VaultIndex":
+        by_name_and_size: dict[tuple[str, int], str] = {}
+        by_sha1: dict[str, str] = {}
+        for attachment in attachments:
+            by_name_and_size.setdefault(
+                (attachment.name, attachment.size), attachment.vault_id
+            )
+            by_sha1.setdefault(str(attachment.vault_id).lower(), attachment.vault_id)
+        return cls(by_name_and_size=by_name_and_size, by_sha1=by_sha1)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() - self.created_at > VAULT_INDEX_TTL_SECONDS
+
+    def find(
+        self,
+        *,
+        file_name: str,
+        file_size: int,
+        sha1: str | None = None,
+    ) -> str | None:
+        if sha1:
+            vault_id = self.by_sha1.get(sha1.lower())
+            if vault_id is not None:
+                return vault_id
+        return self.by_name_and_size.get((file_name, file_size))
+
+
+def get_vault_index(soar: SOARClient, container_id: int) -> VaultIndex:
+    """Return the attachment index of a container, listing the vault on a miss.
+
+    Indexes are cached per process for VAULT_INDEX_TTL_SECONDS, since other
+    apps and playbooks can add attachments to the same container. Callers
+    that add attachments themselves invalidate the index.
+    """
+    with _vault_indexes_lock:
+        vault_index = _vault_indexes.get(container_id)
+    if vault_index is not None and not vault_index.expired:
+        return vault_index
+
+    attachments = soar.vault.get_attachment(container_id=container_id)
+    logging.info(
+        f"Indexed {len(attachments)} vault attachment(s) for "
+        f"container_id={container_id}"
+    )
+    vault_index = VaultIndex.from_attachments(attachments)
+    with _vault_indexes_lock:
+        _vault_indexes[container_id] = vault_index
+    return vault_index
+
+
+def invalidate_vault_index(container_id: int | None = None) -> None:
+    """Drop the cached index for one container, or for every container."""
+    with _vault_indexes_lock:
+        if container_id is None:
+            _vault_indexes.clear()
+        else:
+            _vault_indexes.pop(container_id, None)
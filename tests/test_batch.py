@@ -0,0 +1,103 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import Any
+
+from src import batch
+from src.batch import BatchRequest, send_batch_requests
+
+
+class BatchHttpResponse:
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self.payload = payload
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self) -> dict[str, Any]:
+        return self.payload
+
+
+class FakeBatchClient:
+    def __init__(self, statuses: list[dict[str, int]] | None = None) -> None:
+        self.statuses = statuses or []
+        self.posts: list[list[dict[str, Any]]] = []
+
+    def post(self, endpoint: str, *, json: dict[str, Any]) -> BatchHttpResponse:
+        assert endpoint == "/$batch"
+        requests = json["requests"]
+        self.posts.append(requests)
+        statuses = self.statuses.pop(0) if self.statuses else {}
+        return BatchHttpResponse(
+            {
+                "responses": [
+                    {
+                        "id": request["id"],
+                        "status": statuses.get(request["id"], 204),
+                        "headers": {"Retry-After": "0"},
+                    }
+                    for request in requests
+                ]
+            }
+        )
+
+
+def _delete(request_id: str, *depends_on: str) -> BatchRequest:
+    return BatchRequest(
+        id=request_id,
+        method="DELETE",
+        url=f"/me/drive/items/{request_id}",
+        depends_on=depends_on,
+    )
+
+
+def test_send_batch_requests_splits_into_graph_sized_batches() -> None:
+    graph_client = FakeBatchClient()
+    requests = [_delete(str(index)) for index in range(45)]
+
+    responses = send_batch_requests(graph_client, requests)
+
+    assert [len(post) for post in graph_client.posts] == [20, 20, 5]
+    assert list(responses) == [str(index) for index in range(45)]
+    assert all(response.ok for response in responses.values())
+
+
+def test_send_batch_requests_retries_only_throttled_sub_requests(
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(batch.time, "sleep", lambda _delay: None)
+    graph_client = FakeBatchClient([{"b": 429, "c": 424}, {}])
+
+    responses = send_batch_requests(
+        graph_client,
+        [_delete("a"), _delete("b"), _delete("c", "b")],
+    )
+
+    assert [[request["id"] for request in post] for post in graph_client.posts] == [
+        ["a", "b", "c"],
+        ["b", "c"],
+    ]
+    assert graph_client.posts[1][1]["dependsOn"] == ["b"]
+    assert all(response.ok for response in responses.values())
+
+
+def test_send_batch_requests_fails_dependents_of_failed_earlier_batch() -> None:
+    graph_client = FakeBatchClient([{"0": 404}])
+    requests = [_delete(str(index)) for index in range(20)]
+    requests.append(_delete("dependent", "0"))
+
+    responses = send_batch_requests(graph_client, requests)
+
+    assert len(graph_client.posts) == 1
+    assert responses["dependent"].status == 424
+    assert "0" in responses["dependent"].error_message
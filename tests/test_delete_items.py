@@ -0,0 +1,110 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import contextlib
+import importlib
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from soar_sdk.exceptions import ActionFailure
+
+from src.actions.delete_items import (
+    DeleteItemsParams,
+    _get_delete_items_requests,
+    delete_items,
+)
+from src.app import app
+from src.consts import AUTH_METHOD_CLIENT_CREDENTIALS, AUTH_METHOD_DELEGATED
+
+
+def _asset(
+    *,
+    auth_method: str = AUTH_METHOD_DELEGATED,
+    target_user_id: str | None = "target@example.com",
+) -> SimpleNamespace:
+    return SimpleNamespace(auth_method=auth_method, target_user_id=target_user_id)
+
+
+def test_delete_items_registers_table_action() -> None:
+    action = app.actions_manager.get_action("delete_items")
+
+    assert action.meta.render_as == "table"
+    assert action.meta.summary_type is not None
+
+
+def test_delete_items_requests_reuse_delete_file_endpoints() -> None:
+    params = DeleteItemsParams(
+        item_ids="file-id, folder-id,file-id",
+        item_paths="/Reports/old.txt",
+    )
+
+    delete_requests = _get_delete_items_requests(
+        params,
+        _asset(auth_method=AUTH_METHOD_CLIENT_CREDENTIALS),
+    )
+
+    assert [(item, item_type) for item, item_type, _ in delete_requests] == [
+        ("file-id", "id"),
+        ("folder-id", "id"),
+        ("/Reports/old.txt", "path"),
+    ]
+    assert [request.url for _, _, request in delete_requests] == [
+        "/users/target@example.com/drive/items/file-id",
+        "/users/target@example.com/drive/items/folder-id",
+        "/users/target@example.com/drive/root:/Reports/old.txt",
+    ]
+    assert {request.method for _, _, request in delete_requests} == {"DELETE"}
+
+
+def test_delete_items_requires_item_ids_or_paths() -> None:
+    with pytest.raises(ActionFailure, match="Either Item IDs or Item Paths"):
+        _get_delete_items_requests(DeleteItemsParams(item_ids=" , "), _asset())
+
+
+def test_delete_items_reports_invalid_paths_as_failed_rows(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    delete_items_module = importlib.import_module("src.actions.delete_items")
+    sent_urls: list[str] = []
+
+    def send_batch_requests(_graph_client: Any, requests: Any) -> dict[str, Any]:
+        sent_urls.extend(request.url for request in requests)
+        return {
+            request.id: delete_items_module.BatchResponse(id=request.id, status=204)
+            for request in requests
+        }
+
+    monkeypatch.setattr(
+        delete_items_module,
+        "get_graph_client",
+        lambda *_args, **_kwargs: contextlib.nullcontext(SimpleNamespace()),
+    )
+    monkeypatch.setattr(delete_items_module, "send_batch_requests", send_batch_requests)
+    soar = SimpleNamespace(
+        get_asset_id=lambda: "asset-id",
+        set_summary=lambda _summary: None,
+        set_message=lambda _message: None,
+    )
+
+    outputs = delete_items(
+        DeleteItemsParams(item_ids="file-id", item_paths="/"), soar, _asset()
+    )
+
+    assert sent_urls == ["/me/drive/items/file-id"]
+    assert [(output.item, output.status) for output in outputs] == [
+        ("file-id", "success"),
+        ("/", "failed"),
+    ]
+    assert outputs[1].status_code == 400
+    assert outputs[1].message == "Either File ID or File Path is mandatory"
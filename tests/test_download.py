@@ -0,0 +1,317 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import hashlib
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from soar_sdk.exceptions import ActionFailure
+
+from src import download
+from src.download import (
+    DownloadHashes,
+    _get_download_segments,
+    check_download_hashes,
+    create_downloaded_vault_attachment,
+    download_file_to_tmp,
+)
+from src.quickxorhash import QuickXorHash
+
+
+DOWNLOAD_URL = "https://download.example/file"
+
+
+def _download_handler(
+    content: bytes, *, honor_range: bool = True
+) -> tuple[list[str | None], httpx.MockTransport]:
+    ranges: list[str | None] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("Range")
+        ranges.append(range_header)
+        if not honor_range or range_header is None:
+            return httpx.Response(200, content=content)
+        start, end = (int(value) for value in range_header[6:].split("-"))
+        return httpx.Response(206, content=content[start : end + 1])
+
+    return ranges, httpx.MockTransport(handler)
+
+
+def _use_download_transport(
+    monkeypatch: pytest.MonkeyPatch, transport: httpx.MockTransport
+) -> None:
+    monkeypatch.setattr(download, "DOWNLOAD_SEGMENT_SIZE", 4)
+    monkeypatch.setattr(download, "DOWNLOAD_RESUME_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(
+        download,
+        "_get_download_client",
+        lambda: httpx.Client(transport=transport),
+    )
+
+
+def test_get_download_segments_cover_file(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(download, "DOWNLOAD_SEGMENT_SIZE", 4)
+
+    assert _get_download_segments(10) == [(0, 3), (4, 7), (8, 9)]
+
+
+def test_download_file_to_tmp_downloads_segments_in_parallel(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    content = b"0123456789abcdefghij"
+    ranges, transport = _download_handler(content)
+    _use_download_transport(monkeypatch, transport)
+
+    temp_path, file_size = download_file_to_tmp(
+        DOWNLOAD_URL, tmp_path, expected_size=len(content)
+    )
+
+    assert file_size == len(content)
+    assert temp_path.read_bytes() == content
+    assert sorted(ranges) == sorted(
+        f"bytes={start}-{min(start + 3, len(content) - 1)}"
+        for start in range(0, len(content), 4)
+    )
+
+
+def test_download_file_to_tmp_hashes_segments_as_they_are_written(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    content = b"0123456789abcdefghij"
+    _, transport = _download_handler(content)
+    _use_download_transport(monkeypatch, transport)
+    hashes = DownloadHashes()
+
+    temp_path, _ = download_file_to_tmp(
+        DOWNLOAD_URL, tmp_path, expected_size=len(content), hashes=hashes
+    )
+    expected_quick_xor_hash = QuickXorHash()
+    expected_quick_xor_hash.update(content)
+
+    assert hashes.quick_xor_hash == expected_quick_xor_hash.b64digest()
+    assert hashes.get_sha256(temp_path) == hashlib.sha256(content).hexdigest()
+
+
+def test_download_file_to_tmp_hashes_whole_file_when_ranges_are_ignored(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    content = b"0123456789abcdefghij"
+    _, transport = _download_handler(content, honor_range=False)
+    _use_download_transport(monkeypatch, transport)
+    hashes = DownloadHashes()
+
+    temp_path, _ = download_file_to_tmp(
+        DOWNLOAD_URL, tmp_path, expected_size=len(content), hashes=hashes
+    )
+    expected_quick_xor_hash = QuickXorHash()
+    expected_quick_xor_hash.update(content)
+
+    assert hashes.quick_xor_hash == expected_quick_xor_hash.b64digest()
+    assert hashes.get_sha256(temp_path) == hashlib.sha256(content).hexdigest()
+
+
+def test_download_file_to_tmp_falls_back_when_ranges_are_ignored(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    content = b"0123456789abcdefghij"
+    ranges, transport = _download_handler(content, honor_range=False)
+    _use_download_transport(monkeypatch, transport)
+
+    temp_path, file_size = download_file_to_tmp(
+        DOWNLOAD_URL, tmp_path, expected_size=len(content)
+    )
+
+    assert file_size == len(content)
+    assert temp_path.read_bytes() == content
+    assert ranges == ["bytes=0-3"]
+
+
+def test_download_file_to_tmp_resumes_short_segments(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    content = b"0123456789"
+    ranges: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        range_header = request.headers["Range"]
+        ranges.append(range_header)
+        start, end = (int(value) for value in range_header[6:].split("-"))
+        # Every first attempt at a segment drops the connection after one byte.
+        end = start if start % 4 == 0 else end
+        return httpx.Response(206, content=content[start : end + 1])
+
+    _use_download_transport(monkeypatch, httpx.MockTransport(handler))
+
+    temp_path, file_size = download_file_to_tmp(
+        DOWNLOAD_URL, tmp_path, expected_size=len(content)
+    )
+
+    assert file_size == len(content)
+    assert temp_path.read_bytes() == content
+    assert "bytes=1-3" in ranges
+    assert "bytes=5-7" in ranges
+
+
+def test_download_file_to_tmp_resumes_single_stream_from_offset(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    content = b"0123456789"
+    ranges: list[str | None] = []
+
+    class DroppedStream(httpx.SyncByteStream):
+        def __iter__(self) -> Iterator[bytes]:
+            yield content[:6]
+            raise httpx.ReadError("connection reset")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("Range")
+        ranges.append(range_header)
+        if range_header is None:
+            return httpx.Response(200, stream=DroppedStream())
+        return httpx.Response(206, content=content[6:])
+
+    _use_download_transport(monkeypatch, httpx.MockTransport(handler))
+
+    temp_path, file_size = download_file_to_tmp(DOWNLOAD_URL, tmp_path)
+
+    assert file_size == len(content)
+    assert temp_path.read_bytes() == content
+    assert ranges == [None, "bytes=6-"]
+
+
+def test_download_file_to_tmp_refreshes_expired_download_url(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    requested_urls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested_urls.append(str(request.url))
+        if str(request.url) == DOWNLOAD_URL:
+            return httpx.Response(401)
+        return httpx.Response(200, content=b"content")
+
+    _use_download_transport(monkeypatch, httpx.MockTransport(handler))
+
+    temp_path, file_size = download_file_to_tmp(
+        DOWNLOAD_URL,
+        tmp_path,
+        refresh_download_url=lambda: "https://download.example/fresh",
+    )
+
+    assert temp_path.read_bytes() == b"content"
+    assert file_size == len(b"content")
+    assert requested_urls == [DOWNLOAD_URL, "https://download.example/fresh"]
+
+
+def test_download_file_to_tmp_removes_partial_file_after_retries(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(206, content=b"")
+
+    _use_download_transport(monkeypatch, httpx.MockTransport(handler))
+
+    with pytest.raises(ActionFailure, match="download was incomplete"):
+        download_file_to_tmp(DOWNLOAD_URL, tmp_path, expected_size=8)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_check_download_hashes_fails_on_mismatch() -> None:
+    content_hash = QuickXorHash()
+    content_hash.update(b"content")
+    sha256 = hashlib.sha256(b"content").hexdigest()
+
+    check_download_hashes(
+        {"quickXorHash": content_hash.b64digest(), "sha256Hash": sha256.upper()},
+        quick_xor_hash=content_hash.b64digest(),
+        sha256=sha256,
+    )
+    with pytest.raises(ActionFailure, match="does not match"):
+        check_download_hashes(
+            {"quickXorHash": "AAAAAAAAAAAAAAAAAAAAAAAAAAA="},
+            quick_xor_hash=content_hash.b64digest(),
+            sha256=sha256,
+        )
+
+
+class FakeVaultClient:
+    def __init__(self, vault_tmp_dir: Path) -> None:
+        self.vault_tmp_dir = vault_tmp_dir
+        self.added: list[tuple[Path, bytes]] = []
+        self.created: list[bytes] = []
+
+    def get_vault_tmp_dir(self) -> str:
+        return str(self.vault_tmp_dir)
+
+    def add_attachment(
+        self,
+        container_id: int,
+        file_location: str,
+        file_name: str,
+        metadata: dict[str, str] | None = None,
+    ) -> str:
+        path = Path(file_location)
+        if not path.is_relative_to(self.vault_tmp_dir):
+            raise ValueError(f"File location must be in {self.vault_tmp_dir}")
+        self.added.append((path, path.read_bytes()))
+        return "vault-id"
+
+    def create_attachment(
+        self,
+        container_id: int,
+        file_content: bytes,
+        file_name: str,
+        metadata: dict[str, str] | None = None,
+    ) -> str:
+        self.created.append(file_content)
+        return "created-vault-id"
+
+
+def test_create_downloaded_vault_attachment_adds_file_by_path(
+    tmp_path: Path,
+) -> None:
+    vault_tmp_dir = tmp_path / "vault"
+    vault_tmp_dir.mkdir()
+    temp_path = vault_tmp_dir / "download"
+    temp_path.write_bytes(b"content")
+    vault = FakeVaultClient(vault_tmp_dir)
+    soar = SimpleNamespace(vault=vault, get_executing_container_id=lambda: 1)
+
+    vault_id = create_downloaded_vault_attachment(
+        soar, temp_path=temp_path, file_name="report.txt", file_size=7
+    )
+
+    assert vault_id == "vault-id"
+    assert vault.added == [(temp_path, b"content")]
+    assert vault.created == []
+
+
+def test_create_downloaded_vault_attachment_creates_content_without_vault_tmp_dir(
+    tmp_path: Path,
+) -> None:
+    temp_path = tmp_path / "download"
+    temp_path.write_bytes(b"content")
+    vault = FakeVaultClient(tmp_path / "missing")
+    soar = SimpleNamespace(vault=vault, get_executing_container_id=lambda: 1)
+
+    vault_id = create_downloaded_vault_attachment(
+        soar, temp_path=temp_path, file_name="report.txt", file_size=7
+    )
+
+    assert vault_id == "created-vault-id"
+    assert vault.created == [b"content"]
+    assert vault.added == []
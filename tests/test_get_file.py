@@ -11,18 +11,27 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import contextlib
+import importlib
 from types import SimpleNamespace
 
+import httpx
 import pytest
 from soar_sdk.exceptions import ActionFailure
 
+from src import vault_index
 from src.actions.get_file import (
     GetFileParams,
     _get_file_content_endpoint,
+    get_file,
 )
 from src.consts import AUTH_METHOD_CLIENT_CREDENTIALS, AUTH_METHOD_DELEGATED
 
 
+# src.actions re-exports get_file, which shadows the module of the same name.
+get_file_module = importlib.import_module("src.actions.get_file")
+
+
 def _asset(
     *,
     auth_method: str = AUTH_METHOD_DELEGATED,
@@ -92,3 +101,53 @@ def test_get_file_content_endpoint_requires_target_user_for_client_credentials()
 
     with pytest.raises(ActionFailure, match="Target User ID is required"):
         _get_file_content_endpoint(params, asset)
+
+
+class FakeMetadataClient:
+    def __init__(self, metadata: dict[str, object]) -> None:
+        self.metadata = metadata
+        self.requested: list[str] = []
+
+    def get(self, endpoint: str, **_kwargs: object) -> httpx.Response:
+        self.requested.append(endpoint)
+        return httpx.Response(
+            200,
+            json=self.metadata,
+            request=httpx.Request("GET", f"https://graph.example{endpoint}"),
+        )
+
+
+def _soar(attachments: list[SimpleNamespace]) -> SimpleNamespace:
+    return SimpleNamespace(
+        get_asset_id=lambda: "asset-id",
+        get_executing_container_id=lambda: 1,
+        set_summary=lambda _summary: None,
+        vault=SimpleNamespace(get_attachment=lambda **_kwargs: attachments),
+    )
+
+
+def test_get_file_skips_download_when_vault_has_matching_file(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    graph_client = FakeMetadataClient(
+        {"name": "report.txt", "size": 4, "@microsoft.graph.downloadUrl": "url"}
+    )
+    monkeypatch.setattr(
+        get_file_module,
+        "get_graph_client",
+        lambda *_args, **_kwargs: contextlib.nullcontext(graph_client),
+    )
+
+    def fail_download(*_args: object, **_kwargs: object) -> None:
+        raise AssertionError("file content should not be downloaded")
+
+    monkeypatch.setattr(get_file_module, "download_item_to_tmp", fail_download)
+    attachment = SimpleNamespace(name="report.txt", size=4, vault_id="vault-id")
+    vault_index.invalidate_vault_index()
+
+    output = get_file(GetFileParams(file_id="file-id"), _soar([attachment]), _asset())
+    vault_index.invalidate_vault_index()
+
+    assert output.vault_id == "vault-id"
+    assert output.size == 4
+    assert graph_client.requested == ["/me/drive/items/file-id"]
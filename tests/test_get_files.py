@@ -0,0 +1,283 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import contextlib
+import importlib
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+import pytest
+from soar_sdk.exceptions import ActionFailure
+
+from src import vault_index
+from src.actions.get_files import GetFilesParams, get_files
+from src.app import app
+from src.consts import AUTH_METHOD_DELEGATED
+from src.download import DownloadedFile
+
+
+# src.actions re-exports get_files, which shadows the module of the same name.
+get_files_module = importlib.import_module("src.actions.get_files")
+
+
+def _asset() -> SimpleNamespace:
+    return SimpleNamespace(auth_method=AUTH_METHOD_DELEGATED, target_user_id=None)
+
+
+class FakeGraphClient:
+    """Serve a folder listing and $batch metadata requests."""
+
+    def __init__(
+        self,
+        metadata: dict[str, dict[str, Any]],
+        folder_items: list[dict[str, Any]] | None = None,
+    ) -> None:
+        self.metadata = metadata
+        self.folder_items = folder_items or []
+        self.batches: list[list[str]] = []
+
+    def get(self, endpoint: str, **_kwargs: Any) -> httpx.Response:
+        return httpx.Response(
+            200,
+            json={"value": self.folder_items},
+            request=httpx.Request("GET", f"https://graph.example{endpoint}"),
+        )
+
+    def post(self, endpoint: str, *, json: dict[str, Any]) -> httpx.Response:
+        self.batches.append([request["url"] for request in json["requests"]])
+        responses = []
+        for request in json["requests"]:
+            metadata = self.metadata.get(request["url"])
+            responses.append(
+                {"id": request["id"], "status": 200, "body": metadata}
+                if metadata is not None
+                else {
+                    "id": request["id"],
+                    "status": 404,
+                    "body": {"error": {"message": "Item not found"}},
+                }
+            )
+        return httpx.Response(
+            200,
+            json={"responses": responses},
+            request=httpx.Request("POST", f"https://graph.example{endpoint}"),
+        )
+
+
+def _soar(tmp_path: Path, attachments: list[SimpleNamespace]) -> SimpleNamespace:
+    return SimpleNamespace(
+        get_asset_id=lambda: "asset-id",
+        get_executing_container_id=lambda: 1,
+        set_summary=lambda _summary: None,
+        set_message=lambda _message: None,
+        vault=SimpleNamespace(
+            get_attachment=lambda **_kwargs: attachments,
+            get_vault_tmp_dir=lambda: str(tmp_path),
+        ),
+    )
+
+
+@pytest.fixture
+def fake_downloads(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> Iterator[list[str]]:
+    """Replace downloads and vault adds, recording the downloaded file names."""
+    downloaded: list[str] = []
+
+    def download_item_to_tmp(
+        _graph_client: Any, metadata: dict[str, Any], **_kwargs: Any
+    ) -> DownloadedFile:
+        downloaded.append(metadata["name"])
+        temp_path = tmp_path / metadata["name"]
+        temp_path.write_bytes(b"content")
+        return DownloadedFile(
+            temp_path=temp_path, size=7, quick_xor_hash="qxh", sha256="sha"
+        )
+
+    monkeypatch.setattr(get_files_module, "download_item_to_tmp", download_item_to_tmp)
+    monkeypatch.setattr(
+        get_files_module,
+        "add_downloaded_file_to_vault",
+        lambda _soar, downloaded_file, *, file_name: f"vault-{file_name}",
+    )
+    vault_index.invalidate_vault_index()
+    yield downloaded
+    vault_index.invalidate_vault_index()
+
+
+def _use_graph_client(
+    monkeypatch: pytest.MonkeyPatch, graph_client: FakeGraphClient
+) -> None:
+    monkeypatch.setattr(
+        get_files_module,
+        "get_graph_client",
+        lambda *_args, **_kwargs: contextlib.nullcontext(graph_client),
+    )
+
+
+def test_get_files_registers_table_action() -> None:
+    action = app.actions_manager.get_action("get_files")
+
+    assert action.meta.render_as == "table"
+    assert action.meta.summary_type is not None
+
+
+def test_get_files_requires_files_or_folder() -> None:
+    with pytest.raises(ActionFailure, match="Either File IDs, File Paths"):
+        get_files(GetFilesParams(), SimpleNamespace(), _asset())
+
+
+def test_get_files_reports_each_file_outcome(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    fake_downloads: list[str],
+) -> None:
+    graph_client = FakeGraphClient(
+        {
+            "/me/drive/items/new-id": {"name": "new.txt", "size": 7},
+            "/me/drive/items/known-id": {"name": "known.txt", "size": 5},
+        }
+    )
+    _use_graph_client(monkeypatch, graph_client)
+    known = SimpleNamespace(name="known.txt", size=5, vault_id="known-vault-id")
+
+    outputs = get_files(
+        GetFilesParams(file_ids="new-id,known-id,missing-id"),
+        _soar(tmp_path, [known]),
+        _asset(),
+    )
+
+    assert [(output.item, output.status) for output in outputs] == [
+        ("new-id", "success"),
+        ("known-id", "success"),
+        ("missing-id", "failed"),
+    ]
+    assert outputs[0].vault_id == "vault-new.txt"
+    assert outputs[1].vault_id == "known-vault-id"
+    assert outputs[2].message == "Item not found"
+    assert fake_downloads == ["new.txt"]
+    assert len(graph_client.batches) == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_get_files_filters_folder_files_by_name(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    fake_downloads: list[str],
+) -> None:
+    graph_client = FakeGraphClient(
+        {"/me/drive/items/doc-id": {"name": "report.docx", "size": 7}},
+        folder_items=[
+            {"id": "doc-id", "name": "report.docx", "file": {}},
+            {"id": "txt-id", "name": "notes.txt", "file": {}},
+            {"id": "sub-id", "name": "archive.docx", "folder": {"childCount": 1}},
+        ],
+    )
+    _use_graph_client(monkeypatch, graph_client)
+
+    outputs = get_files(
+        GetFilesParams(folder_path="Evidence", name_filter="*.docx"),
+        _soar(tmp_path, []),
+        _asset(),
+    )
+
+    assert [output.item for output in outputs] == ["doc-id"]
+    assert graph_client.batches == [["/me/drive/items/doc-id"]]
+    assert fake_downloads == ["report.docx"]
+
+
+def test_get_files_downloads_a_file_also_in_the_folder_once(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    fake_downloads: list[str],
+) -> None:
+    graph_client = FakeGraphClient(
+        {"/me/drive/items/doc-id": {"name": "report.docx", "size": 7}},
+        folder_items=[{"id": "doc-id", "name": "report.docx", "file": {}}],
+    )
+    _use_graph_client(monkeypatch, graph_client)
+
+    outputs = get_files(
+        GetFilesParams(file_ids="doc-id", folder_path="Evidence"),
+        _soar(tmp_path, []),
+        _asset(),
+    )
+
+    assert [output.item for output in outputs] == ["doc-id"]
+    assert graph_client.batches == [["/me/drive/items/doc-id"]]
+    assert fake_downloads == ["report.docx"]
+
+
+def test_get_files_reports_vault_failures_without_prefix(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    fake_downloads: list[str],
+) -> None:
+    _use_graph_client(
+        monkeypatch,
+        FakeGraphClient({"/me/drive/items/new-id": {"name": "new.txt", "size": 7}}),
+    )
+
+    def add_downloaded_file_to_vault(*_args: Any, **_kwargs: Any) -> str:
+        raise ActionFailure("Vault is full")
+
+    monkeypatch.setattr(
+        get_files_module, "add_downloaded_file_to_vault", add_downloaded_file_to_vault
+    )
+
+    outputs = get_files(
+        GetFilesParams(file_ids="new-id"), _soar(tmp_path, []), _asset()
+    )
+
+    assert outputs[0].status == "failed"
+    assert outputs[0].message == "Vault is full"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_get_files_removes_finished_downloads_when_submitting_fails(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    fake_downloads: list[str],
+) -> None:
+    _use_graph_client(
+        monkeypatch,
+        FakeGraphClient(
+            {
+                "/me/drive/items/first-id": {"name": "first.txt", "size": 7},
+                "/me/drive/items/second-id": {"name": "second.txt", "size": 7},
+            }
+        ),
+    )
+    vault_lookups: list[str] = []
+
+    def get_existing_vault_id(_soar: Any, *, file_name: str, **_kwargs: Any) -> None:
+        vault_lookups.append(file_name)
+        if len(vault_lookups) > 1:
+            raise RuntimeError("Vault lookup failed")
+
+    monkeypatch.setattr(
+        get_files_module, "get_existing_vault_id", get_existing_vault_id
+    )
+
+    with pytest.raises(RuntimeError, match="Vault lookup failed"):
+        get_files(
+            GetFilesParams(file_ids="first-id,second-id"),
+            _soar(tmp_path, []),
+            _asset(),
+        )
+
+    assert fake_downloads == ["first.txt"]
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,324 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+import pytest
+
+from src import graph
+from src.actions.list_drive import ListDriveOutput
+from src.actions.list_items import ListItemsOutput
+from src.consts import AUTH_METHOD_CLIENT_CREDENTIALS, AUTH_METHOD_DELEGATED
+
+
+def _asset(*, auth_method: str = AUTH_METHOD_DELEGATED) -> SimpleNamespace:
+    return SimpleNamespace(auth_method=auth_method)
+
+
+def _pooled(transport) -> object:
+    return transport._transport
+
+
+def test_graph_transport_is_reused_per_asset_and_auth_mode() -> None:
+    graph.invalidate_graph_transports()
+
+    first = graph.get_graph_transport(_asset(), "1")
+    second = graph.get_graph_transport(_asset(), "1")
+    client_credentials = graph.get_graph_transport(
+        _asset(auth_method=AUTH_METHOD_CLIENT_CREDENTIALS), "1"
+    )
+    other_asset = graph.get_graph_transport(_asset(), "2")
+
+    assert _pooled(first) is _pooled(second)
+    assert _pooled(first) is not _pooled(client_credentials)
+    assert _pooled(first) is not _pooled(other_asset)
+
+    graph.invalidate_graph_transports()
+
+
+def test_closing_client_transport_keeps_pool_open() -> None:
+    graph.invalidate_graph_transports()
+    transport = graph.get_graph_transport(_asset(), "1")
+
+    transport.close()
+
+    assert _pooled(graph.get_graph_transport(_asset(), "1")) is _pooled(transport)
+    graph.invalidate_graph_transports()
+
+
+def test_invalidate_graph_transports_only_drops_requested_asset() -> None:
+    graph.invalidate_graph_transports()
+    first = graph.get_graph_transport(_asset(), "1")
+    second = graph.get_graph_transport(_asset(), "2")
+
+    graph.invalidate_graph_transports("1")
+
+    assert _pooled(graph.get_graph_transport(_asset(), "1")) is not _pooled(first)
+    assert _pooled(graph.get_graph_transport(_asset(), "2")) is _pooled(second)
+    graph.invalidate_graph_transports()
+
+
+def test_get_select_fields_projects_output_model_fields() -> None:
+    select = graph.get_select_fields(
+        ListItemsOutput,
+        exclude=("drive_id", "folder_id", "folder_path"),
+        extra_fields=["sharepointIds", "id"],
+    ).split(",")
+
+    assert "@microsoft.graph.downloadUrl" in select
+    assert {"id", "name", "file", "folder", "parentReference"} <= set(select)
+    assert "drive_id" not in select
+    assert select[-1] == "sharepointIds"
+    assert select.count("id") == 1
+
+
+def test_get_select_fields_covers_every_drive_output_field() -> None:
+    select = graph.get_select_fields(ListDriveOutput).split(",")
+
+    assert set(select) == set(ListDriveOutput.model_fields)
+
+
+class FakePageClient:
+    def __init__(self, responses: list[httpx.Response]) -> None:
+        self.responses = responses
+        self.params: list[dict[str, Any]] = []
+
+    def get(self, url: httpx.URL) -> httpx.Response:
+        self.params.append(dict(url.params))
+        response = self.responses.pop(0)
+        response.request = httpx.Request("GET", f"https://graph.example{url}")
+        return response
+
+
+def test_get_graph_page_requests_maximum_page_size() -> None:
+    graph_client = FakePageClient([httpx.Response(200, json={"value": []})])
+
+    response_json, page_size = graph.get_graph_page(
+        graph_client,
+        "/me/drive/root/children",
+        params={"$select": "id"},
+    )
+
+    assert response_json == {"value": []}
+    assert page_size == 999
+    assert graph_client.params == [{"$select": "id", "$top": "999"}]
+
+
+def test_get_graph_page_keeps_the_skiptoken_of_a_next_link() -> None:
+    requested: list[httpx.URL] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url)
+        return httpx.Response(200, json={"value": []})
+
+    graph_client = httpx.Client(
+        base_url="https://graph.example/v1.0",
+        transport=httpx.MockTransport(handler),
+    )
+
+    graph.get_graph_page(
+        graph_client,
+        "https://graph.example/v1.0/me/drive/root/children?$skiptoken=page-2",
+    )
+
+    assert requested[0].path == "/v1.0/me/drive/root/children"
+    assert dict(requested[0].params) == {"$skiptoken": "page-2", "$top": "999"}
+
+
+def test_get_graph_page_raises_throttling_left_by_the_retry_transport() -> None:
+    graph_client = FakePageClient([httpx.Response(429, headers={"Retry-After": "3"})])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        graph.get_graph_page(graph_client, "/me/drive/root/children")
+
+    assert [params["$top"] for params in graph_client.params] == ["999"]
+
+
+def _retry_client(
+    responses: list[httpx.Response | Exception],
+    requests: list[httpx.Request],
+    **kwargs: Any,
+) -> tuple[httpx.Client, graph._RetryTransport]:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    transport = graph._RetryTransport(httpx.MockTransport(handler), **kwargs)
+    return (
+        httpx.Client(base_url="https://graph.example", transport=transport),
+        transport,
+    )
+
+
+def test_get_graph_page_shrinks_page_size_after_throttled_retries(
+    monkeypatch,
+) -> None:
+    delays: list[float] = []
+    monkeypatch.setattr(graph.time, "sleep", delays.append)
+    requests: list[httpx.Request] = []
+    client, _ = _retry_client(
+        [
+            httpx.Response(429, headers={"Retry-After": "3"}),
+            httpx.Response(200, json={"value": [{"id": "item"}]}),
+            httpx.Response(200, json={"value": []}),
+        ],
+        requests,
+    )
+
+    response_json, page_size = graph.get_graph_page(client, "/me/drive/root/children")
+    _, next_page_size = graph.get_graph_page(
+        client, "/me/drive/root/children", page_size=page_size
+    )
+
+    assert response_json == {"value": [{"id": "item"}]}
+    assert page_size == 499
+    assert next_page_size == 499
+    assert [request.url.params["$top"] for request in requests] == [
+        "999",
+        "999",
+        "499",
+    ]
+    assert delays == [3.0]
+
+
+def test_get_graph_page_keeps_the_minimum_page_size(monkeypatch) -> None:
+    monkeypatch.setattr(graph.time, "sleep", lambda _delay: None)
+    client, _ = _retry_client(
+        [
+            httpx.Response(503),
+            httpx.Response(429),
+            httpx.Response(200, json={"value": []}),
+        ],
+        [],
+    )
+
+    _, page_size = graph.get_graph_page(
+        client, "/me/drive/root/children", page_size=300
+    )
+
+    assert page_size == graph.GRAPH_MIN_PAGE_SIZE
+
+
+@pytest.mark.parametrize(
+    ("retry_after", "expected"),
+    [("4", 4.0), ("-1", 0.0), ("86400", 30.0), ("Wed, 21 Oct 2026", None)],
+)
+def test_get_retry_after_seconds_is_capped(
+    retry_after: str, expected: float | None
+) -> None:
+    assert graph.get_retry_after_seconds({"Retry-After": retry_after}) == expected
+
+
+def test_retry_transport_honors_retry_after_and_counts_throttling(
+    monkeypatch,
+) -> None:
+    delays: list[float] = []
+    monkeypatch.setattr(graph.time, "sleep", delays.append)
+    requests: list[httpx.Request] = []
+    client, transport = _retry_client(
+        [
+            httpx.Response(429, headers={"Retry-After": "4"}),
+            httpx.Response(503, headers={"Retry-After": "2"}),
+            httpx.Response(201, json={"id": "folder-id"}),
+        ],
+        requests,
+    )
+
+    response = client.post("/me/drive/root/children", json={"name": "folder"})
+
+    assert response.json() == {"id": "folder-id"}
+    assert [request.method for request in requests] == ["POST"] * 3
+    assert requests[2].content == requests[0].content
+    assert delays == [4.0, 2.0]
+    assert transport.throttled_count == 2
+    assert transport.retry_count == 2
+
+
+def test_retry_transport_only_retries_server_errors_for_idempotent_methods(
+    monkeypatch,
+) -> None:
+    delays: list[float] = []
+    monkeypatch.setattr(graph.time, "sleep", delays.append)
+    requests: list[httpx.Request] = []
+    client, _ = _retry_client(
+        [
+            httpx.Response(502),
+            httpx.Response(200, json={"value": []}),
+            httpx.Response(500),
+        ],
+        requests,
+    )
+
+    assert client.get("/me/drive/root/children").status_code == 200
+    assert client.post("/$batch", json={"requests": []}).status_code == 500
+    assert [request.method for request in requests] == ["GET", "GET", "POST"]
+    assert len(delays) == 1
+    assert 0.5 <= delays[0] <= 1.0
+
+
+def test_retry_transport_retries_transport_errors_for_idempotent_methods(
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(graph.time, "sleep", lambda _delay: None)
+    requests: list[httpx.Request] = []
+    client, _ = _retry_client(
+        [
+            httpx.ReadTimeout("timed out"),
+            httpx.Response(204),
+            httpx.ReadTimeout("timed out"),
+        ],
+        requests,
+    )
+
+    assert client.delete("/me/drive/items/item-id").status_code == 204
+    with pytest.raises(httpx.ReadTimeout):
+        client.post("/me/drive/root/children", json={"name": "folder"})
+    assert len(requests) == 3
+
+
+def test_retry_transport_stops_when_retry_budget_is_spent(monkeypatch) -> None:
+    monkeypatch.setattr(graph.time, "sleep", lambda _delay: None)
+    requests: list[httpx.Request] = []
+    client, transport = _retry_client(
+        [httpx.Response(429, headers={"Retry-After": "0"}) for _ in range(4)],
+        requests,
+        retry_budget=2,
+    )
+
+    assert client.get("/me/drive/root/children").status_code == 429
+    assert client.get("/me/drive/root/children").status_code == 429
+    assert len(requests) == 4
+    assert transport.retries_left == 0
+    assert transport.throttled_count == 4
+
+
+def test_retry_transport_does_not_replay_streamed_bodies(monkeypatch) -> None:
+    monkeypatch.setattr(graph.time, "sleep", lambda _delay: None)
+    requests: list[httpx.Request] = []
+    client, _ = _retry_client(
+        [httpx.Response(429, headers={"Retry-After": "0"})],
+        requests,
+    )
+
+    response = client.put(
+        "/me/drive/root:/report.txt:/content",
+        content=iter([b"report"]),
+    )
+
+    assert response.status_code == 429
+    assert len(requests) == 1
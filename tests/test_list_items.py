@@ -0,0 +1,482 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import contextlib
+import importlib
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+import pytest
+from soar_sdk.exceptions import ActionFailure
+
+from src.actions.list_items import (
+    ListItemsParams,
+    _FolderTreeWalk,
+    _get_delta_endpoint,
+    _get_list_response,
+    _get_list_items_select,
+    _get_max_concurrency,
+    _iter_folder_tree,
+    _iter_list_items_outputs,
+    _list_delta_changes,
+    _validate_list_limits,
+    list_items,
+)
+from src.consts import AUTH_METHOD_DELEGATED, LIST_ITEMS_DELTA_LINKS_STATE_KEY
+
+
+class ListResponse:
+    status_code = 200
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self.payload = payload
+        self.extensions: dict[str, Any] = {}
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self) -> dict[str, Any]:
+        return self.payload
+
+
+class FakeFolderClient:
+    """Serve folder listings by endpoint, finishing later folders first."""
+
+    def __init__(self, folders: dict[str, list[dict[str, Any]]]) -> None:
+        self.folders = folders
+        self.requested: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def get(self, url: httpx.URL) -> ListResponse:
+        endpoint = url.path
+        with self.lock:
+            self.requested.append(endpoint)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05 if endpoint.endswith("/a/children") else 0.01)
+        with self.lock:
+            self.in_flight -= 1
+        return ListResponse({"value": self.folders[endpoint]})
+
+
+def _folder(item_id: str) -> dict[str, Any]:
+    return {"id": item_id, "name": item_id, "folder": {"childCount": 1}}
+
+
+def _file(item_id: str) -> dict[str, Any]:
+    return {"id": item_id, "name": item_id, "file": {"mimeType": "text/plain"}}
+
+
+def _asset() -> SimpleNamespace:
+    return SimpleNamespace(auth_method=AUTH_METHOD_DELEGATED, target_user_id=None)
+
+
+def test_get_list_response_follows_next_links_with_their_skiptoken() -> None:
+    pages = {
+        None: {
+            "value": [_file("a")],
+            "@odata.nextLink": (
+                "https://graph.example/v1.0/me/drive/root/children"
+                "?$top=999&$skiptoken=page-2"
+            ),
+        },
+        "page-2": {"value": [_file("b")]},
+    }
+    requested: list[httpx.URL] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url)
+        assert len(requested) <= len(pages)
+        return httpx.Response(200, json=pages[request.url.params.get("$skiptoken")])
+
+    graph_client = httpx.Client(
+        base_url="https://graph.example/v1.0",
+        transport=httpx.MockTransport(handler),
+    )
+
+    items = _get_list_response(graph_client, "/me/drive/root/children", select="id")
+
+    assert [item["id"] for item in items] == ["a", "b"]
+    assert [dict(url.params) for url in requested] == [
+        {"$select": "id", "$top": "999"},
+        {"$top": "999", "$skiptoken": "page-2"},
+    ]
+
+
+def test_iter_folder_tree_expands_the_last_listed_folder_first() -> None:
+    graph_client = FakeFolderClient(
+        {
+            "/me/drive/root/children": [_folder("a"), _folder("b"), _file("c")],
+            "/me/drive/items/a/children": [_file("a1"), _folder("a2")],
+            "/me/drive/items/b/children": [_file("b1")],
+            "/me/drive/items/a2/children": [_file("a21")],
+        }
+    )
+
+    items = list(
+        _iter_folder_tree(
+            graph_client,
+            ListItemsParams(),
+            _asset(),
+            "/me/drive/root/children",
+            max_concurrency=4,
+        )
+    )
+
+    assert [item["id"] for item in items] == ["a", "b", "c", "b1", "a1", "a2", "a21"]
+    assert graph_client.max_in_flight == 2
+
+
+def test_iter_folder_tree_respects_max_concurrency() -> None:
+    folders = {"/me/drive/root/children": [_folder(str(i)) for i in range(6)]}
+    folders.update({f"/me/drive/items/{i}/children": [] for i in range(6)})
+    graph_client = FakeFolderClient(folders)
+
+    list(
+        _iter_folder_tree(
+            graph_client,
+            ListItemsParams(),
+            _asset(),
+            "/me/drive/root/children",
+            max_concurrency=2,
+        )
+    )
+
+    assert graph_client.max_in_flight <= 2
+
+
+def test_iter_folder_tree_keeps_max_concurrency_below_the_first_level() -> None:
+    folders = {"/me/drive/root/children": [_folder(f"f{i}") for i in range(4)]}
+    for i in range(4):
+        folders[f"/me/drive/items/f{i}/children"] = [
+            _folder(f"g{i}{j}") for j in range(4)
+        ]
+        folders.update({f"/me/drive/items/g{i}{j}/children": [] for j in range(4)})
+    graph_client = FakeFolderClient(folders)
+    nested_in_flight = 0
+    max_nested_in_flight = 0
+    get = graph_client.get
+
+    def get_nested(url: httpx.URL) -> ListResponse:
+        nonlocal nested_in_flight, max_nested_in_flight
+        nested = "/items/g" in url.path
+        with graph_client.lock:
+            nested_in_flight += nested
+            max_nested_in_flight = max(max_nested_in_flight, nested_in_flight)
+        try:
+            return get(url)
+        finally:
+            with graph_client.lock:
+                nested_in_flight -= nested
+
+    graph_client.get = get_nested
+
+    list(
+        _iter_folder_tree(
+            graph_client,
+            ListItemsParams(),
+            _asset(),
+            "/me/drive/root/children",
+            max_concurrency=8,
+        )
+    )
+
+    assert max_nested_in_flight == 8
+    assert graph_client.max_in_flight <= 8
+
+
+def test_iter_folder_tree_is_lazy() -> None:
+    graph_client = FakeFolderClient(
+        {
+            "/me/drive/root/children": [_folder("a")],
+            "/me/drive/items/a/children": [_file("a1")],
+        }
+    )
+
+    items = _iter_folder_tree(
+        graph_client,
+        ListItemsParams(),
+        _asset(),
+        "/me/drive/root/children",
+        max_concurrency=1,
+    )
+
+    assert graph_client.requested == []
+    assert next(items)["id"] == "a"
+    assert graph_client.requested == ["/me/drive/root/children"]
+
+
+def test_iter_folder_tree_stops_expanding_at_max_depth() -> None:
+    graph_client = FakeFolderClient(
+        {
+            "/me/drive/root/children": [_folder("a"), _file("b")],
+            "/me/drive/items/a/children": [_folder("a1"), _file("a2")],
+        }
+    )
+    walk = _FolderTreeWalk()
+
+    items = list(
+        _iter_folder_tree(
+            graph_client,
+            ListItemsParams(max_depth=2),
+            _asset(),
+            "/me/drive/root/children",
+            max_concurrency=2,
+            max_depth=2,
+            walk=walk,
+        )
+    )
+
+    assert [item["id"] for item in items] == ["a", "b", "a1", "a2"]
+    assert "/me/drive/items/a1/children" not in graph_client.requested
+    assert walk.truncated
+
+
+def test_iter_folder_tree_is_not_truncated_by_empty_folders() -> None:
+    empty_folder = {"id": "a", "name": "a", "folder": {"childCount": 0}}
+    graph_client = FakeFolderClient({"/me/drive/root/children": [empty_folder]})
+    walk = _FolderTreeWalk()
+
+    list(
+        _iter_folder_tree(
+            graph_client,
+            ListItemsParams(max_depth=1),
+            _asset(),
+            "/me/drive/root/children",
+            max_concurrency=1,
+            max_depth=1,
+            walk=walk,
+        )
+    )
+
+    assert not walk.truncated
+
+
+def test_list_items_stops_listing_at_max_items(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    graph_client = FakeFolderClient(
+        {
+            "/me/drive/root/children": [_folder("a"), _file("b"), _file("c")],
+            "/me/drive/items/a/children": [_file("a1")],
+        }
+    )
+    monkeypatch.setattr(
+        importlib.import_module("src.actions.list_items"),
+        "get_graph_client",
+        lambda *_args, **_kwargs: contextlib.nullcontext(graph_client),
+    )
+    summaries: list[Any] = []
+    soar = SimpleNamespace(
+        get_asset_id=lambda: "asset-id",
+        set_summary=summaries.append,
+    )
+
+    outputs = list_items(ListItemsParams(max_items=2), soar, _asset())
+
+    assert [output.id for output in outputs] == ["a", "b"]
+    assert graph_client.requested == ["/me/drive/root/children"]
+    assert summaries[0].total_items == 2
+    assert summaries[0].truncated
+
+
+@pytest.mark.parametrize(
+    ("params", "message"),
+    [
+        (ListItemsParams(max_depth=0), "Max Depth must be greater"),
+        (ListItemsParams(max_items=-1), "Max Items must be greater"),
+        (
+            ListItemsParams(use_delta_query=True, max_items=10),
+            "cannot be used with delta queries",
+        ),
+        (
+            ListItemsParams(use_delta_query=True, folder_id="folder-id"),
+            "only supported on the drive root",
+        ),
+        (
+            ListItemsParams(use_delta_query=True, folder_path="/Reports/"),
+            "only supported on the drive root",
+        ),
+    ],
+)
+def test_validate_list_limits_rejects_invalid_limits(
+    params: ListItemsParams, message: str
+) -> None:
+    with pytest.raises(ActionFailure, match=message):
+        _validate_list_limits(params)
+
+
+def test_iter_list_items_outputs_normalizes_each_item() -> None:
+    params = ListItemsParams(drive_id="drive-id", folder_path="Reports")
+    item = {
+        "id": "file-id",
+        "name": "report.txt",
+        "parentReference": {"driveId": "drive-id", "path": "/drive/root:/Reports"},
+    }
+
+    (output,) = _iter_list_items_outputs(iter([item]), params)
+
+    assert output.drive_id == "drive-id"
+    assert output.folder_path == "Reports"
+    assert output.parentReference.folderPath == "Reports"
+    assert output.parentReference.drivePath == "/drive/root:/"
+
+
+def test_list_items_caps_max_concurrency() -> None:
+    assert _get_max_concurrency(ListItemsParams(max_concurrency=100)) == 16
+
+
+def test_list_items_rejects_invalid_max_concurrency() -> None:
+    with pytest.raises(ActionFailure, match="Max Concurrency must be greater"):
+        _get_max_concurrency(ListItemsParams(max_concurrency=0))
+
+
+class FakeDeltaClient:
+    def __init__(self, responses: dict[str, tuple[int, dict[str, Any]]]) -> None:
+        self.responses = responses
+        self.requested: list[str] = []
+
+    def get(self, url: httpx.URL) -> httpx.Response:
+        endpoint = url.path
+        self.requested.append(endpoint)
+        status_code, payload = self.responses[endpoint]
+        return httpx.Response(
+            status_code,
+            json=payload,
+            request=httpx.Request("GET", f"https://graph.example{endpoint}"),
+        )
+
+
+@pytest.mark.parametrize(
+    ("endpoint", "expected_endpoint"),
+    [
+        ("/me/drive/root/children", "/me/drive/root/delta"),
+        ("/drives/drive-id/root/children", "/drives/drive-id/root/delta"),
+        (
+            "/users/user@example.com/drive/root/children",
+            "/users/user@example.com/drive/root/delta",
+        ),
+    ],
+)
+def test_get_delta_endpoint_uses_the_drive_root_delta(
+    endpoint: str, expected_endpoint: str
+) -> None:
+    assert _get_delta_endpoint(endpoint) == expected_endpoint
+
+
+def test_list_delta_changes_persists_and_resumes_delta_link() -> None:
+    asset = SimpleNamespace(cache_state={})
+    graph_client = FakeDeltaClient(
+        {
+            "/me/drive/root/delta": (
+                200,
+                {
+                    "value": [{"id": "root", "root": {}}, _file("a")],
+                    "@odata.nextLink": "/page-2",
+                },
+            ),
+            "/page-2": (
+                200,
+                {"value": [_file("b")], "@odata.deltaLink": "/delta-1"},
+            ),
+            "/delta-1": (
+                200,
+                {"value": [_file("b")], "@odata.deltaLink": "/delta-2"},
+            ),
+        }
+    )
+
+    first_run = _list_delta_changes(graph_client, asset, "/me/drive/root/children")
+    second_run = _list_delta_changes(graph_client, asset, "/me/drive/root/children")
+
+    assert [item["id"] for item in first_run] == ["a", "b"]
+    assert [item["id"] for item in second_run] == ["b"]
+    assert asset.cache_state[LIST_ITEMS_DELTA_LINKS_STATE_KEY] == {
+        "/me/drive/root/children": "/delta-2"
+    }
+
+
+def test_list_delta_changes_sends_the_token_of_the_stored_delta_link() -> None:
+    delta_link = "https://graph.example/v1.0/me/drive/root/delta?token=stored-token"
+    asset = SimpleNamespace(
+        cache_state={
+            LIST_ITEMS_DELTA_LINKS_STATE_KEY: {"/me/drive/root/children": delta_link}
+        }
+    )
+    requested: list[httpx.URL] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url)
+        return httpx.Response(
+            200,
+            json={
+                "value": [_file("a")],
+                "@odata.deltaLink": (
+                    "https://graph.example/v1.0/me/drive/root/delta?token=next-token"
+                ),
+            },
+        )
+
+    graph_client = httpx.Client(
+        base_url="https://graph.example/v1.0",
+        transport=httpx.MockTransport(handler),
+    )
+
+    items = _list_delta_changes(graph_client, asset, "/me/drive/root/children")
+
+    assert [item["id"] for item in items] == ["a"]
+    assert [url.params.get("token") for url in requested] == ["stored-token"]
+    assert asset.cache_state[LIST_ITEMS_DELTA_LINKS_STATE_KEY] == {
+        "/me/drive/root/children": (
+            "https://graph.example/v1.0/me/drive/root/delta?token=next-token"
+        )
+    }
+
+
+def test_list_delta_changes_resyncs_when_delta_link_expires() -> None:
+    asset = SimpleNamespace(
+        cache_state={
+            LIST_ITEMS_DELTA_LINKS_STATE_KEY: {"/me/drive/root/children": "/expired"}
+        }
+    )
+    graph_client = FakeDeltaClient(
+        {
+            "/expired": (410, {}),
+            "/me/drive/root/delta": (
+                200,
+                {"value": [_file("a")], "@odata.deltaLink": "/fresh"},
+            ),
+        }
+    )
+
+    items = _list_delta_changes(graph_client, asset, "/me/drive/root/children")
+
+    assert [item["id"] for item in items] == ["a"]
+    assert asset.cache_state[LIST_ITEMS_DELTA_LINKS_STATE_KEY] == {
+        "/me/drive/root/children": "/fresh"
+    }
+
+
+def test_list_items_select_adds_delta_facets_only_in_delta_mode() -> None:
+    select = _get_list_items_select(ListItemsParams(extra_fields="shared")).split(",")
+    delta_params = ListItemsParams(use_delta_query=True)
+    delta_select = _get_list_items_select(delta_params).split(",")
+
+    assert "shared" in select
+    assert "deleted" not in select
+    assert {"deleted", "root"} <= set(delta_select)
@@ -0,0 +1,66 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import base64
+import os
+
+import pytest
+
+from src.quickxorhash import QuickXorHash
+
+
+def _reference_quick_xor_hash(data: bytes) -> str:
+    """Byte-at-a-time port of Microsoft's QuickXorHash reference code."""
+    cells = [0, 0, 0]
+    shift = 0
+    for byte in data:
+        index, offset = divmod(shift, 64)
+        cell_bits = 32 if index == 2 else 64
+        cells[index] ^= (byte << offset) & 0xFFFFFFFFFFFFFFFF
+        if offset > cell_bits - 8:
+            cells[(index + 1) % 3] ^= byte >> (cell_bits - offset)
+        shift = (shift + 11) % 160
+
+    digest = bytearray(
+        cells[0].to_bytes(8, "little")
+        + cells[1].to_bytes(8, "little")
+        + (cells[2] & 0xFFFFFFFF).to_bytes(4, "little")
+    )
+    for index, length_byte in enumerate(len(data).to_bytes(8, "little")):
+        digest[12 + index] ^= length_byte
+    return base64.b64encode(bytes(digest)).decode("ascii")
+
+
+@pytest.mark.parametrize("size", [0, 1, 19, 159, 160, 161, 1000, 4099])
+def test_quick_xor_hash_matches_reference(size: int) -> None:
+    data = os.urandom(size)
+    quick_xor_hash = QuickXorHash()
+
+    quick_xor_hash.update(data[: size // 3])
+    quick_xor_hash.update(data[size // 3 :])
+
+    assert quick_xor_hash.b64digest() == _reference_quick_xor_hash(data)
+
+
+def test_quick_xor_hash_accepts_chunks_out_of_order() -> None:
+    data = os.urandom(1000)
+    quick_xor_hash = QuickXorHash()
+
+    for start, end in ((700, 1000), (0, 161), (333, 700), (161, 333)):
+        quick_xor_hash.update(data[start:end], start)
+
+    assert quick_xor_hash.b64digest() == _reference_quick_xor_hash(data)
+
+
+def test_quick_xor_hash_of_empty_input_is_zero() -> None:
+    assert QuickXorHash().digest() == bytes(20)
@@ -0,0 +1,177 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src import graph, rate_limit
+from src.consts import AUTH_METHOD_CLIENT_CREDENTIALS, AUTH_METHOD_DELEGATED
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake_clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", fake_clock.time)
+    monkeypatch.setattr(rate_limit.time, "time", fake_clock.time)
+    monkeypatch.setattr(rate_limit.time, "sleep", fake_clock.sleep)
+    return fake_clock
+
+
+@pytest.fixture(autouse=True)
+def _reset_rate_limiters() -> Iterator[None]:
+    rate_limit.invalidate_rate_limiters()
+    yield
+    rate_limit.invalidate_rate_limiters()
+
+
+def _asset(**overrides: object) -> SimpleNamespace:
+    values = {
+        "auth_method": AUTH_METHOD_CLIENT_CREDENTIALS,
+        "tenant_id": "contoso.onmicrosoft.com",
+        "target_user_id": "user@example.com",
+        "rate_limit_requests_per_second": 2.0,
+        "rate_limit_concurrent_requests": None,
+        "rate_limit_across_processes": False,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_token_bucket_allows_a_burst_then_paces_requests(clock: FakeClock) -> None:
+    bucket = rate_limit.TokenBucket(2.0)
+
+    for _ in range(4):
+        bucket.acquire()
+
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_file_token_bucket_shares_tokens_between_instances(
+    clock: FakeClock, tmp_path: Path
+) -> None:
+    state_path = tmp_path / "rate.json"
+    first = rate_limit.FileTokenBucket(1.0, state_path)
+    second = rate_limit.FileTokenBucket(1.0, state_path)
+
+    first.acquire()
+    second.acquire()
+    first.acquire()
+
+    assert clock.sleeps == [1.0, 1.0]
+
+
+def test_rate_limiter_caps_concurrent_requests() -> None:
+    limiter = rate_limit.RateLimiter(max_concurrent_requests=1)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold_slot() -> None:
+        with limiter.request_slot():
+            entered.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_slot)
+    holder.start()
+    entered.wait()
+
+    assert limiter._semaphore.acquire(blocking=False) is False
+
+    release.set()
+    holder.join()
+    assert limiter._semaphore.acquire(blocking=False) is True
+
+
+def test_get_rate_limiter_is_shared_per_key_and_disabled_without_limits() -> None:
+    first = rate_limit.get_rate_limiter("tenant|user", requests_per_second=5)
+    other = rate_limit.get_rate_limiter("tenant|other", requests_per_second=5)
+
+    assert rate_limit.get_rate_limiter("tenant|user", requests_per_second=5) is first
+    assert other is not None
+    assert other is not first
+    assert rate_limit.get_rate_limiter("tenant|user") is None
+    assert rate_limit.get_rate_limiter("tenant|user", requests_per_second=0) is None
+
+
+def test_graph_rate_limiter_is_keyed_by_tenant_and_target_user() -> None:
+    limiter = graph.get_graph_rate_limiter(_asset(), "1")
+
+    assert graph.get_graph_rate_limiter(_asset(), "2") is limiter
+    assert (
+        graph.get_graph_rate_limiter(_asset(target_user_id="other@example.com"), "1")
+        is not limiter
+    )
+    assert (
+        graph.get_graph_rate_limiter(_asset(auth_method=AUTH_METHOD_DELEGATED), "1")
+        is not limiter
+    )
+    assert (
+        graph.get_graph_rate_limiter(_asset(rate_limit_requests_per_second=None), "1")
+        is None
+    )
+
+
+def test_rate_limited_transport_waits_for_a_token_before_each_request(
+    clock: FakeClock,
+) -> None:
+    limiter = rate_limit.RateLimiter(rate_limit.TokenBucket(1.0))
+    transport = graph._RateLimitedTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200)), limiter
+    )
+    client = httpx.Client(base_url="https://graph.example", transport=transport)
+
+    assert client.get("/me/drive").status_code == 200
+    assert client.get("/me/drive").status_code == 200
+    assert clock.sleeps == [1.0]
+
+
+def test_rate_limited_transport_holds_the_slot_until_the_body_is_closed() -> None:
+    limiter = rate_limit.RateLimiter(max_concurrent_requests=1)
+    transport = graph._RateLimitedTransport(
+        httpx.MockTransport(
+            lambda request: httpx.Response(200, stream=httpx.ByteStream(b"body"))
+        ),
+        limiter,
+    )
+    client = httpx.Client(base_url="https://graph.example", transport=transport)
+    second_started = threading.Event()
+
+    def request_again() -> None:
+        client.get("/me/drive")
+        second_started.set()
+
+    with client.stream("GET", "/me/drive/items/file-id/content") as response:
+        thread = threading.Thread(target=request_again)
+        thread.start()
+        assert not second_started.wait(0.1)
+        assert response.read() == b"body"
+
+    assert second_started.wait(1.0)
+    thread.join()
@@ -318,11 +318,14 @@ def test_delegated_actions_ignore_target_user_override(
         "create_folder",
         "delete_file",
         "delete_folder",
+        "delete_items",
         "get_file",
+        "get_files",
         "list_drive",
         "list_items",
         "search_file",
         "upload_file",
+        "upload_files",
     ],
 )
 def test_user_routed_actions_expose_optional_target_user_id(action_name: str) -> None:
@@ -11,10 +11,19 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from collections.abc import Iterable
 import importlib
 import io
+from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
 
+import httpx
+import pytest
+
+from src.consts import UPLOAD_SESSIONS_STATE_KEY
+from src.quickxorhash import QuickXorHash
+
 
 class UploadResponse:
     def __init__(
@@ -35,45 +44,50 @@ class UploadResponse:
         return self.payload
 
 
-def test_upload_file_chunks_streams_file_and_uses_next_expected_ranges(
-    monkeypatch,
-) -> None:
-    upload_file = importlib.import_module("src.actions.upload_file")
-    calls: list[dict[str, Any]] = []
-    responses = [
-        UploadResponse({"nextExpectedRanges": ["2-"]}),
-        UploadResponse({"id": "uploaded-file-id", "name": "uploaded.txt"}),
-    ]
+class FakeUploadClient:
+    def __init__(self, responses: list[UploadResponse]) -> None:
+        self.responses = responses
+        self.calls: list[dict[str, Any]] = []
 
-    def fake_put(
+    def put(
+        self,
         url: str,
         *,
         headers: dict[str, str],
-        content: bytes,
-        timeout: float,
+        content: bytes | Iterable[bytes],
+        params: dict[str, str] | None = None,
     ) -> UploadResponse:
-        calls.append(
-            {
-                "url": url,
-                "headers": headers,
-                "content": content,
-                "timeout": timeout,
-            }
+        if not isinstance(content, bytes):
+            content = b"".join(content)
+        self.calls.append(
+            {"url": url, "headers": headers, "content": content, "params": params}
         )
-        return responses.pop(0)
+        return self.responses.pop(0)
+
+
+def test_upload_file_chunks_streams_file_and_uses_next_expected_ranges(
+    monkeypatch,
+) -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+    upload_client = FakeUploadClient(
+        [
+            UploadResponse({"nextExpectedRanges": ["2-"]}),
+            UploadResponse({"id": "uploaded-file-id", "name": "uploaded.txt"}),
+        ]
+    )
 
     monkeypatch.setattr(upload_file, "CHUNK_SIZE", 4)
-    monkeypatch.setattr(upload_file.httpx, "put", fake_put)
 
     result = upload_file._upload_file_chunks(
+        upload_client,
         "https://upload.example/session",
         io.BytesIO(b"abcdef"),
         6,
     )
 
     assert result == {"id": "uploaded-file-id", "name": "uploaded.txt"}
-    assert [call["content"] for call in calls] == [b"abcd", b"cdef"]
-    assert [call["headers"]["Content-Range"] for call in calls] == [
+    assert [call["content"] for call in upload_client.calls] == [b"abcd", b"cdef"]
+    assert [call["headers"]["Content-Range"] for call in upload_client.calls] == [
         "bytes 0-3/6",
         "bytes 2-5/6",
     ]
@@ -83,41 +97,389 @@ def test_upload_file_chunks_retries_transient_upload_failure(
     monkeypatch,
 ) -> None:
     upload_file = importlib.import_module("src.actions.upload_file")
-    calls: list[dict[str, Any]] = []
-    responses = [
-        UploadResponse({}, status_code=503, headers={"Retry-After": "0"}),
-        UploadResponse({"id": "uploaded-file-id", "name": "uploaded.txt"}),
-    ]
-
-    def fake_put(
-        url: str,
-        *,
-        headers: dict[str, str],
-        content: bytes,
-        timeout: float,
-    ) -> UploadResponse:
-        calls.append(
-            {
-                "url": url,
-                "headers": headers,
-                "content": content,
-                "timeout": timeout,
-            }
-        )
-        return responses.pop(0)
+    upload_client = FakeUploadClient(
+        [
+            UploadResponse({}, status_code=503, headers={"Retry-After": "0"}),
+            UploadResponse({"id": "uploaded-file-id", "name": "uploaded.txt"}),
+        ]
+    )
 
     monkeypatch.setattr(upload_file, "CHUNK_SIZE", 4)
-    monkeypatch.setattr(upload_file.httpx, "put", fake_put)
 
     result = upload_file._upload_file_chunks(
+        upload_client,
         "https://upload.example/session",
         io.BytesIO(b"abcd"),
         4,
     )
 
     assert result == {"id": "uploaded-file-id", "name": "uploaded.txt"}
-    assert [call["content"] for call in calls] == [b"abcd", b"abcd"]
-    assert [call["headers"]["Content-Range"] for call in calls] == [
+    assert [call["content"] for call in upload_client.calls] == [b"abcd", b"abcd"]
+    assert [call["headers"]["Content-Range"] for call in upload_client.calls] == [
         "bytes 0-3/4",
         "bytes 0-3/4",
     ]
+
+
+def test_upload_file_chunks_reuses_one_client_for_every_chunk(monkeypatch) -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+    upload_client = FakeUploadClient(
+        [
+            UploadResponse({"nextExpectedRanges": ["2-"]}),
+            UploadResponse({"nextExpectedRanges": ["4-"]}),
+            UploadResponse({"id": "uploaded-file-id"}),
+        ]
+    )
+
+    monkeypatch.setattr(upload_file, "CHUNK_SIZE", 2)
+    monkeypatch.setattr(
+        upload_file.httpx,
+        "put",
+        lambda *args, **kwargs: pytest.fail("module-level httpx.put was used"),
+    )
+
+    upload_file._upload_file_chunks(
+        upload_client,
+        "https://upload.example/session",
+        io.BytesIO(b"abcdef"),
+        6,
+    )
+
+    assert len(upload_client.calls) == 3
+
+
+def test_get_simple_upload_endpoint_replaces_upload_session_suffix() -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+
+    assert (
+        upload_file._get_simple_upload_endpoint(
+            "/me/drive/root:/reports/report.txt:/createUploadSession"
+        )
+        == "/me/drive/root:/reports/report.txt:/content"
+    )
+
+
+@pytest.mark.parametrize(
+    ("auto_rename", "conflict_behavior"),
+    [(True, "rename"), (False, "fail")],
+)
+def test_upload_small_file_puts_content_without_upload_session(
+    auto_rename: bool,
+    conflict_behavior: str,
+) -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+    graph_client = FakeUploadClient(
+        [UploadResponse({"id": "uploaded-file-id"}, status_code=201)]
+    )
+    params = upload_file.UploadFileParams(
+        vault_id="vault-id",
+        file_path="report.txt",
+        auto_rename=auto_rename,
+    )
+
+    result = upload_file._upload_small_file(
+        graph_client,
+        "/me/drive/root:/report.txt:/createUploadSession",
+        params,
+        io.BytesIO(b"abcdef"),
+    )
+
+    assert result == {"id": "uploaded-file-id"}
+    assert graph_client.calls == [
+        {
+            "url": "/me/drive/root:/report.txt:/content",
+            "headers": {"Content-Type": "application/octet-stream"},
+            "content": b"abcdef",
+            "params": {"@microsoft.graph.conflictBehavior": conflict_behavior},
+        }
+    ]
+
+
+def test_upload_file_chunks_streams_memory_mapped_file_in_small_buffers(
+    monkeypatch,
+    tmp_path: Path,
+) -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+    upload_client = FakeUploadClient(
+        [
+            UploadResponse({"nextExpectedRanges": ["5-"]}),
+            UploadResponse({"id": "uploaded-file-id"}),
+        ]
+    )
+    file_path = tmp_path / "upload.bin"
+    file_path.write_bytes(b"abcdefghij")
+
+    monkeypatch.setattr(upload_file, "CHUNK_SIZE", 5)
+    monkeypatch.setattr(upload_file, "UPLOAD_STREAM_BUFFER_SIZE", 2)
+
+    with file_path.open("rb") as file_obj:
+        with upload_file._open_upload_source(file_obj) as (source, size):
+            assert isinstance(source, upload_file.mmap.mmap)
+            assert size == 10
+            assert list(upload_file._UploadChunkContent(source, 5, 5)) == [
+                b"fg",
+                b"hi",
+                b"j",
+            ]
+
+        result = upload_file._upload_file_chunks(
+            upload_client,
+            "https://upload.example/session",
+            file_obj,
+            10,
+        )
+
+    assert result == {"id": "uploaded-file-id"}
+    assert [call["content"] for call in upload_client.calls] == [b"abcde", b"fghij"]
+    assert [call["headers"]["Content-Length"] for call in upload_client.calls] == [
+        "5",
+        "5",
+    ]
+
+
+def test_upload_file_chunks_fails_when_vault_file_is_shorter_than_reported() -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+    upload_client = FakeUploadClient([UploadResponse({"nextExpectedRanges": ["4-"]})])
+
+    with pytest.raises(
+        upload_file.ActionFailure,
+        match=upload_file.ERROR_READING_VAULT_FILE_MESSAGE,
+    ):
+        upload_file._upload_file_chunks(
+            upload_client,
+            "https://upload.example/session",
+            io.BytesIO(b"abcd"),
+            8,
+        )
+
+
+def test_upload_chunk_sizer_grows_healthy_chunks_within_graph_limits() -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+    chunk_sizer = upload_file._UploadChunkSizer()
+
+    assert chunk_sizer.size == upload_file.INITIAL_UPLOAD_CHUNK_SIZE
+    for _ in range(4):
+        chunk_sizer.record(
+            upload_file._ChunkTiming(
+                start=0,
+                size=chunk_sizer.size,
+                elapsed_seconds=0.5,
+            )
+        )
+
+    assert chunk_sizer.size == upload_file.CHUNK_SIZE
+    assert chunk_sizer.size % upload_file.UPLOAD_CHUNK_SIZE_MULTIPLE == 0
+
+
+def test_upload_chunk_sizer_shrinks_slow_and_retried_chunks() -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+    chunk_sizer = upload_file._UploadChunkSizer()
+
+    chunk_sizer.record(
+        upload_file._ChunkTiming(start=0, size=10_485_760, elapsed_seconds=20.0)
+    )
+    assert chunk_sizer.size == 5_242_880
+
+    chunk_sizer.record(
+        upload_file._ChunkTiming(
+            start=0,
+            size=5_242_880,
+            elapsed_seconds=1.0,
+            attempts=2,
+        )
+    )
+    assert chunk_sizer.size == upload_file.MIN_UPLOAD_CHUNK_SIZE
+    assert chunk_sizer.size % upload_file.UPLOAD_CHUNK_SIZE_MULTIPLE == 0
+
+
+def test_upload_session_state_tracks_ranges_and_drops_expired_sessions() -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+    asset = SimpleNamespace(
+        cache_state={
+            UPLOAD_SESSIONS_STATE_KEY: {
+                "expired-vault-id|/me/drive/root:/old.txt:/createUploadSession": {
+                    "uploadUrl": "https://upload.example/expired",
+                    "expirationDateTime": "2000-01-01T00:00:00Z",
+                    "nextExpectedRanges": ["0-"],
+                }
+            }
+        }
+    )
+    session_state = upload_file._UploadSessionState(asset, "vault-id|endpoint")
+
+    session_state.save(
+        {
+            "uploadUrl": "https://upload.example/session",
+            "expirationDateTime": "2999-01-01T00:00:00Z",
+        }
+    )
+    session_state.save_next_expected_ranges(["4-"])
+
+    assert asset.cache_state[UPLOAD_SESSIONS_STATE_KEY] == {
+        "vault-id|endpoint": {
+            "uploadUrl": "https://upload.example/session",
+            "expirationDateTime": "2999-01-01T00:00:00Z",
+            "nextExpectedRanges": ["4-"],
+        }
+    }
+    assert session_state.load() == {
+        "uploadUrl": "https://upload.example/session",
+        "expirationDateTime": "2999-01-01T00:00:00Z",
+        "nextExpectedRanges": ["4-"],
+    }
+
+    session_state.clear()
+
+    assert asset.cache_state[UPLOAD_SESSIONS_STATE_KEY] == {}
+    assert session_state.load() is None
+
+
+def test_upload_large_file_resumes_stored_upload_session(monkeypatch) -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+    endpoint = "/me/drive/root:/report.txt:/createUploadSession"
+    asset = SimpleNamespace(
+        cache_state={
+            UPLOAD_SESSIONS_STATE_KEY: {
+                f"vault-id|{endpoint}": {
+                    "uploadUrl": "https://upload.example/session",
+                    "expirationDateTime": "2999-01-01T00:00:00Z",
+                    "nextExpectedRanges": ["2-"],
+                }
+            }
+        }
+    )
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.method == "GET":
+            return httpx.Response(200, json={"nextExpectedRanges": ["4-"]})
+        return httpx.Response(201, json={"id": "uploaded-file-id"})
+
+    monkeypatch.setattr(
+        upload_file,
+        "_create_upload_session",
+        lambda *args: pytest.fail("a new upload session was created"),
+    )
+
+    result = upload_file._upload_large_file(
+        SimpleNamespace(),
+        httpx.Client(transport=httpx.MockTransport(handler)),
+        upload_file.UploadFileParams(vault_id="vault-id", file_path="report.txt"),
+        asset,
+        endpoint,
+        io.BytesIO(b"abcdef"),
+        6,
+    )
+
+    assert result == {"id": "uploaded-file-id"}
+    assert [request.method for request in requests] == ["GET", "PUT"]
+    assert requests[1].headers["Content-Range"] == "bytes 4-5/6"
+    assert requests[1].content == b"ef"
+    assert asset.cache_state[UPLOAD_SESSIONS_STATE_KEY] == {}
+
+
+def test_resume_upload_session_drops_session_that_is_gone() -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+    asset = SimpleNamespace(
+        cache_state={
+            UPLOAD_SESSIONS_STATE_KEY: {
+                "vault-id|endpoint": {
+                    "uploadUrl": "https://upload.example/session",
+                    "expirationDateTime": None,
+                    "nextExpectedRanges": ["2-"],
+                }
+            }
+        }
+    )
+    session_state = upload_file._UploadSessionState(asset, "vault-id|endpoint")
+    upload_client = httpx.Client(
+        transport=httpx.MockTransport(lambda request: httpx.Response(404))
+    )
+
+    assert upload_file._resume_upload_session(upload_client, session_state) is None
+    assert asset.cache_state[UPLOAD_SESSIONS_STATE_KEY] == {}
+
+
+def _destination_client(
+    item: dict[str, Any] | None, requested: list[str]
+) -> httpx.Client:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        if item is None:
+            return httpx.Response(404, json={"error": {"code": "itemNotFound"}})
+        return httpx.Response(200, json=item)
+
+    return httpx.Client(
+        base_url="https://graph.example",
+        transport=httpx.MockTransport(handler),
+    )
+
+
+@pytest.mark.parametrize(
+    ("hashes", "size", "identical"),
+    [
+        ({"sha1Hash": "ABCDEF"}, 6, True),
+        ({"sha1Hash": "012345"}, 6, False),
+        ({"quickXorHash": QuickXorHash().b64digest()}, 6, False),
+        ({}, 6, False),
+        ({"sha1Hash": "ABCDEF"}, 7, False),
+    ],
+)
+def test_get_identical_item_compares_size_and_reported_hashes(
+    hashes: dict[str, str],
+    size: int,
+    identical: bool,
+) -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+    item = {"id": "existing-id", "size": size, "file": {"hashes": hashes}}
+    requested: list[str] = []
+
+    result = upload_file._get_identical_item(
+        _destination_client(item, requested),
+        "/me/drive/root:/report.txt:/createUploadSession",
+        "abcdef",
+        io.BytesIO(b"abcdef"),
+        6,
+    )
+
+    assert (result == item) is identical
+    assert requested == ["/me/drive/root:/report.txt"]
+
+
+def test_get_identical_item_computes_quick_xor_hash_of_vault_file() -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+    expected_hash = QuickXorHash()
+    expected_hash.update(b"abcdef")
+    item = {
+        "id": "existing-id",
+        "size": 6,
+        "file": {"hashes": {"quickXorHash": expected_hash.b64digest()}},
+    }
+    file_obj = io.BytesIO(b"abcdef")
+
+    result = upload_file._get_identical_item(
+        _destination_client(item, []),
+        "/me/drive/root:/report.txt:/createUploadSession",
+        "vault-id",
+        file_obj,
+        6,
+    )
+
+    assert result == item
+    assert file_obj.tell() == 0
+
+
+def test_get_identical_item_returns_none_for_missing_destination() -> None:
+    upload_file = importlib.import_module("src.actions.upload_file")
+
+    assert (
+        upload_file._get_identical_item(
+            _destination_client(None, []),
+            "/me/drive/root:/report.txt:/createUploadSession",
+            "vault-id",
+            io.BytesIO(b"abcdef"),
+            6,
+        )
+        is None
+    )
@@ -0,0 +1,178 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import contextlib
+import importlib
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+import pytest
+from soar_sdk.exceptions import ActionFailure
+
+from src.actions.upload_files import UploadFilesParams, upload_files
+from src.app import app
+from src.consts import AUTH_METHOD_DELEGATED
+
+
+# src.actions re-exports upload_files, which shadows the module of the same name.
+upload_files_module = importlib.import_module("src.actions.upload_files")
+
+
+def _asset() -> SimpleNamespace:
+    return SimpleNamespace(
+        auth_method=AUTH_METHOD_DELEGATED, target_user_id=None, cache_state={}
+    )
+
+
+def _attachment(tmp_path: Path, name: str, content: bytes) -> SimpleNamespace:
+    path = tmp_path / name
+    path.write_bytes(content)
+    return SimpleNamespace(
+        name=name,
+        path=str(path),
+        size=len(content),
+        open=path.open,
+    )
+
+
+def _soar(attachments: dict[str, SimpleNamespace]) -> SimpleNamespace:
+    return SimpleNamespace(
+        get_asset_id=lambda: "asset-id",
+        set_summary=lambda _summary: None,
+        set_message=lambda _message: None,
+        vault=SimpleNamespace(
+            get_attachment=lambda *, vault_id: (
+                [attachments[vault_id]] if vault_id in attachments else []
+            ),
+        ),
+    )
+
+
+@pytest.fixture
+def uploaded_endpoints(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Replace the upload engine, recording the endpoint of every upload."""
+    endpoints: list[str] = []
+
+    def upload_vault_file(
+        _graph_client: Any,
+        _upload_client: Any,
+        params: Any,
+        _asset: Any,
+        endpoint: str,
+        file_obj: Any,
+        file_size: int,
+        **_kwargs: Any,
+    ) -> dict[str, Any]:
+        endpoints.append(endpoint)
+        if params.vault_id == "conflict-vault-id":
+            request = httpx.Request("POST", f"https://graph.example{endpoint}")
+            raise httpx.HTTPStatusError(
+                "Name already exists",
+                request=request,
+                response=httpx.Response(409, request=request),
+            )
+        assert len(file_obj.read()) == file_size
+        return {
+            "id": f"{params.vault_id}-item",
+            "name": params.file_path.rsplit("/", 1)[-1],
+            "size": file_size,
+        }
+
+    monkeypatch.setattr(upload_files_module, "_upload_vault_file", upload_vault_file)
+    monkeypatch.setattr(
+        upload_files_module,
+        "get_graph_client",
+        lambda *_args, **_kwargs: contextlib.nullcontext(SimpleNamespace()),
+    )
+    return endpoints
+
+
+def test_upload_files_registers_table_action() -> None:
+    action = app.actions_manager.get_action("upload_files")
+
+    assert action.meta.render_as == "table"
+    assert action.meta.summary_type is not None
+
+
+def test_upload_files_requires_vault_ids() -> None:
+    with pytest.raises(ActionFailure, match="Vault IDs is mandatory"):
+        upload_files(UploadFilesParams(vault_ids=" , "), SimpleNamespace(), _asset())
+
+
+def test_upload_files_rejects_non_positive_bandwidth() -> None:
+    with pytest.raises(ActionFailure, match="Max Bandwidth must be greater"):
+        upload_files(
+            UploadFilesParams(vault_ids="vault-id", max_bandwidth=0),
+            SimpleNamespace(),
+            _asset(),
+        )
+
+
+def test_upload_files_reports_each_file_outcome(
+    tmp_path: Path, uploaded_endpoints: list[str]
+) -> None:
+    soar = _soar(
+        {
+            "report-vault-id": _attachment(tmp_path, "report.txt", b"report"),
+            "conflict-vault-id": _attachment(tmp_path, "notes.txt", b"notes"),
+        }
+    )
+
+    outputs = upload_files(
+        UploadFilesParams(
+            vault_ids="report-vault-id,missing-vault-id,conflict-vault-id",
+            folder_path="/Evidence/INC-1/",
+            max_concurrency=2,
+        ),
+        soar,
+        _asset(),
+    )
+
+    assert [(output.vault_id, output.status) for output in outputs] == [
+        ("report-vault-id", "success"),
+        ("missing-vault-id", "failed"),
+        ("conflict-vault-id", "failed"),
+    ]
+    assert outputs[0].file_path == "Evidence/INC-1/report.txt"
+    assert outputs[0].id == "report-vault-id-item"
+    assert outputs[0].size == 6
+    assert outputs[1].message == "Unable to retrieve vault item details"
+    assert outputs[2].file_path == "Evidence/INC-1/notes.txt"
+    assert outputs[2].message.startswith("Name already exists")
+    assert sorted(uploaded_endpoints) == [
+        "/me/drive/root:/Evidence/INC-1/notes.txt:/createUploadSession",
+        "/me/drive/root:/Evidence/INC-1/report.txt:/createUploadSession",
+    ]
+
+
+def test_bandwidth_limiter_paces_combined_bytes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    clock = [100.0]
+    sleeps: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(upload_files_module.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(upload_files_module.time, "sleep", sleep)
+
+    limiter = upload_files_module._BandwidthLimiter(1024)
+    limiter(512)
+    limiter(1024)
+    limiter(512)
+
+    assert sleeps == [0.5, 1.0]
@@ -0,0 +1,73 @@
+# Copyright (c) 2026 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from types import SimpleNamespace
+
+import pytest
+
+from src import vault_index
+
+
+def _attachment(name: str, size: int, vault_id: str) -> SimpleNamespace:
+    return SimpleNamespace(name=name, size=size, vault_id=vault_id)
+
+
+class FakeVault:
+    def __init__(self, attachments: list[SimpleNamespace]) -> None:
+        self.attachments = attachments
+        self.lookups = 0
+
+    def get_attachment(self, *, container_id: int) -> list[SimpleNamespace]:
+        self.lookups += 1
+        return self.attachments
+
+
+def test_vault_index_finds_by_name_and_size_or_sha1() -> None:
+    index = vault_index.VaultIndex.from_attachments(
+        [_attachment("report.txt", 4, "abc123"), _attachment("b.txt", 2, "def456")]
+    )
+
+    assert index.find(file_name="report.txt", file_size=4) == "abc123"
+    assert index.find(file_name="report.txt", file_size=5) is None
+    assert index.find(file_name="renamed.txt", file_size=2, sha1="DEF456") == "def456"
+
+
+def test_get_vault_index_is_cached_until_invalidated() -> None:
+    vault_index.invalidate_vault_index()
+    vault = FakeVault([_attachment("report.txt", 4, "abc123")])
+    soar = SimpleNamespace(vault=vault)
+
+    vault_index.get_vault_index(soar, 1)
+    vault_index.get_vault_index(soar, 1)
+    assert vault.lookups == 1
+
+    vault_index.invalidate_vault_index(1)
+    vault.attachments.append(_attachment("new.txt", 3, "fed321"))
+
+    index = vault_index.get_vault_index(soar, 1)
+    assert vault.lookups == 2
+    assert index.find(file_name="new.txt", file_size=3) == "fed321"
+    vault_index.invalidate_vault_index()
+
+
+def test_get_vault_index_expires(monkeypatch: pytest.MonkeyPatch) -> None:
+    vault_index.invalidate_vault_index()
+    monkeypatch.setattr(vault_index, "VAULT_INDEX_TTL_SECONDS", -1.0)
+    vault = FakeVault([])
+    soar = SimpleNamespace(vault=vault)
+
+    vault_index.get_vault_index(soar, 1)
+    vault_index.get_vault_index(soar, 1)
+
+    assert vault.lookups == 2
+    vault_index.invalidate_vault_index()